@@ -6,6 +6,8 @@ CDMS module-level API
 from .error import CDMSError  # noqa
 from lazy_object_proxy import Proxy
 from . import dataset
+from . import variable
+from . import metacache
 from . import selectors
 from . import avariable
 from . import tvariable
@@ -25,7 +27,7 @@ __all__ = ["cdmsobj", "axis", "coord", "grid", "hgrid", "avariable",
            "sliceut", "error", "variable", "fvariable", "tvariable", "dataset",
            "database", "cache", "selectors", "MV2", "convention", "bindex",
            "auxcoord", "gengrid", "gsHost", "gsStaticVariable", "gsTimeVariable",
-           "mvBaseWriter", "mvSphereMesh", "mvVsWriter", "mvCdmsRegrid"]
+           "mvBaseWriter", "mvSphereMesh", "mvVsWriter", "mvCdmsRegrid", "metacache"]
 
 
 # CDMS datatypes
@@ -53,6 +55,8 @@ createUniformLatitudeAxis = Proxy(lambda: axis.createUniformLatitudeAxis)
 createUniformLongitudeAxis = Proxy(lambda: axis.createUniformLongitudeAxis)
 setAutoBounds = Proxy(lambda: axis.setAutoBounds)
 getAutoBounds = Proxy(lambda: axis.getAutoBounds)
+setMapIntervalCacheSize = Proxy(lambda: axis.setMapIntervalCacheSize)
+getMapIntervalCacheSize = Proxy(lambda: axis.getMapIntervalCacheSize)
 
 # Grid functions
 createGenericGrid = Proxy(lambda: grid.createGenericGrid)
@@ -82,6 +86,12 @@ getNetcdfDeflateFlag = Proxy(lambda: dataset.getNetcdfDeflateFlag)
 getNetcdfDeflateLevelFlag = Proxy(lambda: dataset.getNetcdfDeflateLevelFlag)
 getNetcdfUseNCSwitchModeFlag = Proxy(lambda: dataset.getNetcdfUseNCSwitchModeFlag)
 
+setLazyOpenFlag = Proxy(lambda: dataset.setLazyOpenFlag)
+getLazyOpenFlag = Proxy(lambda: dataset.getLazyOpenFlag)
+
+setMetadataCache = Proxy(lambda: metacache.setMetadataCache)
+getMetadataCache = Proxy(lambda: metacache.getMetadataCache)
+
 setCompressionWarnings = Proxy(lambda: dataset.setCompressionWarnings)
 
 setNetcdf4Flag = Proxy(lambda: dataset.setNetcdf4Flag)
@@ -90,6 +100,13 @@ getNetcdf4Flag = Proxy(lambda: dataset.getNetcdf4Flag)
 setNetcdfUseParallelFlag = Proxy(lambda: dataset.setNetcdfUseParallelFlag)
 getNetcdfUseParallelFlag = Proxy(lambda: dataset.getNetcdfUseParallelFlag)
 
+setReadWorkers = Proxy(lambda: variable.setReadWorkers)
+getReadWorkers = Proxy(lambda: variable.getReadWorkers)
+
+setFileHandlePoolSize = Proxy(lambda: dataset.setFileHandlePoolSize)
+getFileHandlePoolSize = Proxy(lambda: dataset.getFileHandlePoolSize)
+clearFileHandlePool = Proxy(lambda: dataset.clearFileHandlePool)
+
 getMpiRank = Proxy(lambda: dataset.getMpiRank)
 getMpiSize = Proxy(lambda: dataset.getMpiSize)
 
@@ -111,12 +128,19 @@ order2index = Proxy(lambda: avariable.order2index)
 orderparse = Proxy(lambda: avariable.orderparse)
 setNumericCompatibility = Proxy(lambda: avariable.setNumericCompatibility)
 getNumericCompatibility = Proxy(lambda: avariable.getNumericCompatibility)
+setRegridderCacheSize = Proxy(lambda: avariable.setRegridderCacheSize)
+getRegridderCacheSize = Proxy(lambda: avariable.getRegridderCacheSize)
+clearRegridderCache = Proxy(lambda: avariable.clearRegridderCache)
+setRegridWeightsDirectory = Proxy(lambda: avariable.setRegridWeightsDirectory)
+getRegridWeightsDirectory = Proxy(lambda: avariable.getRegridWeightsDirectory)
+regridVariables = Proxy(lambda: avariable.regridVariables)
 
 # TV
 asVariable = Proxy(lambda: tvariable.asVariable)
 createVariable = Proxy(lambda: tvariable.createVariable)
 isVariable = Proxy(lambda: tvariable.isVariable)
 fromJSON = Proxy(lambda: tvariable.fromJSON)
+loads_binary = Proxy(lambda: tvariable.loads_binary)
 
 SphereMesh = Proxy(lambda: mvSphereMesh.SphereMesh)
 BaseWriter = Proxy(lambda: mvBaseWriter.BaseWriter)
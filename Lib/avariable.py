@@ -2,10 +2,13 @@
 # Further modified to be pure new numpy June 24th 2008
 
 "CDMS Variable objects, abstract interface"
+import os
 import numpy
 import string
 import re
 import warnings
+import hashlib
+from collections import OrderedDict
 from .cdmsobj import CdmsObj
 import cdms2
 from .slabinterface import Slab
@@ -114,6 +117,204 @@ Could not find all the horizontal axes for order = %s in getMinHorizontalMask
     return None
 
 
+# LRU cache of the regridders built by AbstractVariable.regrid, keyed by
+# the source and destination grid fingerprints and the regrid options.
+_regridderCache = OrderedDict()
+_regridderCacheSize = 0               # 0: no caching
+
+
+def setRegridderCacheSize(n):
+    """Set the maximum number of regridders kept by AbstractVariable.regrid.
+
+    Repeated regrids between the same pair of grids, with the same tool,
+    method and options, then reuse the regridder and its weights.
+
+    Parameters
+    ----------
+    n : maximum number of cached regridders, 0 (the default) disables the cache.
+    """
+    global _regridderCacheSize
+    if not isinstance(n, int) or isinstance(n, bool) or n < 0:
+        raise CDMSError("Regridder cache size must be an integer >= 0")
+    _regridderCacheSize = n
+    while len(_regridderCache) > n:
+        _regridderCache.popitem(last=False)
+
+
+def getRegridderCacheSize():
+    return _regridderCacheSize
+
+
+def clearRegridderCache():
+    """Remove all the regridders kept by AbstractVariable.regrid."""
+    _regridderCache.clear()
+
+
+# Directory of the weights files written and read by AbstractVariable.regrid
+_regridWeightsDirectory = None        # None: weights are not saved
+
+
+def setRegridWeightsDirectory(directory):
+    """Set the directory where AbstractVariable.regrid saves the regridding weights.
+
+    The weights of each pair of grids, tool, method and options are written
+    to a SCRIP mapping file named after their hash, and read back instead of
+    being recomputed, by this or any other process sharing the directory.
+    The files can also be read with regrid2.readRegridder.
+
+    Parameters
+    ----------
+    directory : directory of the weights files, created if necessary.
+                None (the default) disables saving the weights.
+    """
+    global _regridWeightsDirectory
+    if directory is not None:
+        directory = os.path.abspath(os.path.expanduser(directory))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+    _regridWeightsDirectory = directory
+
+
+def getRegridWeightsDirectory():
+    return _regridWeightsDirectory
+
+
+def _weightsFile(key):
+    """Path of the weights file of a regridder key, or None if weights are not saved."""
+    if _regridWeightsDirectory is None or key is None:
+        return None
+    name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + '.nc'
+    return os.path.join(_regridWeightsDirectory, name)
+
+
+def _gridFingerprint(grid):
+    """Hash of the type, order, coordinates, bounds and mask of a horizontal grid."""
+    h = hashlib.sha1()
+    h.update(type(grid).__name__.encode('utf-8'))
+    if hasattr(grid, 'getOrder'):
+        h.update(str(grid.getOrder()).encode('utf-8'))
+    arrays = []
+    for coord in grid.getLatitude(), grid.getLongitude():
+        arrays.append(coord[:])
+        arrays.append(coord.getBounds())
+    arrays.append(grid.getMask())
+    for ar in arrays:
+        if ar is None:
+            h.update(b'None')
+            continue
+        ar = numpy.ascontiguousarray(numpy.ma.filled(ar))
+        h.update(("%s%s" % (ar.dtype.str, ar.shape)).encode('utf-8'))
+        h.update(ar.tobytes())
+    return h.hexdigest()
+
+
+def _cachedRegridder(key, factory):
+    """Return the cached regridder for key, or make it with factory() and cache it.
+
+    Nothing is cached if the cache is disabled or key is None."""
+    if _regridderCacheSize <= 0 or key is None:
+        return factory()
+    regridder = _regridderCache.pop(key, None)
+    if regridder is None:
+        regridder = factory()
+    _regridderCache[key] = regridder
+    while len(_regridderCache) > _regridderCacheSize:
+        _regridderCache.popitem(last=False)
+    return regridder
+
+
+def _regridderKey(fromgrid, togrid, *options, **keywords):
+    """Cache key of a regridder, or None if the options cannot be hashed."""
+    if _regridderCacheSize <= 0 and _regridWeightsDirectory is None:
+        return None
+    key = (_gridFingerprint(fromgrid), _gridFingerprint(togrid), options,
+           tuple(sorted(keywords.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def regridVariables(variables, togrid, missing=None, mask=None, **keywords):
+    """Regrid several variables defined on the same horizontal grid.
+
+    The variables are stacked along a single leading dimension, grouped by
+    data type, and each group is regridded with one call of
+    AbstractVariable.regrid, so the weights are computed once and the masks,
+    orders and metadata are handled once for all the variables. Variables
+    whose grid dimensions are not the last ones are regridded one by one.
+
+    Parameters
+    ----------
+    variables : list of variables sharing the same horizontal grid.
+    togrid : destination grid.
+    missing : fill value of the regridded variables. By default each regridded variable
+              keeps the missing value of its variable (1.e20 if it has none), as with
+              AbstractVariable.regrid.
+    mask : None or a 2-D mask of the source grid (1 for invalid cells).
+    keywords : regrid options, as for AbstractVariable.regrid.
+
+    Returns
+    -------
+    List of the regridded variables, in the order of variables.
+    """
+    variables = list(variables)
+    if len(variables) == 0:
+        return []
+    fromgrid = variables[0].getGrid()
+    if fromgrid is None:
+        raise CDMSError("regridVariables: the variables have no horizontal grid")
+    fingerprint = _gridFingerprint(fromgrid)
+    rank = len(fromgrid.shape)
+    gridAxisIds = [fromgrid.getAxis(i).id for i in range(rank)]
+    fill = 1.e20 if missing is None else missing
+
+    results = [None] * len(variables)
+    groups = OrderedDict()
+    for i, var in enumerate(variables):
+        grid = var.getGrid()
+        if grid is None or (grid is not fromgrid and _gridFingerprint(grid) != fingerprint):
+            raise CDMSError("regridVariables: variable %s is not on the grid of %s" %
+                            (var.id, variables[0].id))
+        if [ax.id for ax in var.getAxisList()[-rank:]] != gridAxisIds:
+            results[i] = var.regrid(togrid, missing=missing, mask=mask, **keywords)
+            continue
+        groups.setdefault(numpy.dtype(var.dtype).str, []).append(i)
+
+    order = None
+    if isinstance(fromgrid, AbstractRectGrid):
+        order = 't' + fromgrid.getOrder()
+    for indices in groups.values():
+        datas = [numpy.ma.asarray(variables[i][...]) for i in indices]
+        block = numpy.ma.concatenate([numpy.ma.reshape(data, (-1,) + fromgrid.shape) for data in datas])
+        stackAxis = cdms2.createAxis(numpy.arange(block.shape[0], dtype=numpy.float64), id='stack')
+        stacked = cdms2.createVariable(block, axes=[stackAxis] + variables[indices[0]].getAxisList()[-rank:],
+                                       grid=fromgrid, fill_value=fill, id='stack')
+        regridded = stacked.regrid(togrid, missing=missing, order=order, mask=mask, **keywords)
+        outAxes = regridded.getAxisList()[1:]
+        values = regridded.asma()
+        start = 0
+        for i, data in zip(indices, datas):
+            var = variables[i]
+            lead = var.shape[:-rank]
+            count = int(numpy.prod(lead))
+            result = numpy.ma.reshape(values[start:start + count], lead + values.shape[1:])
+            start += count
+            axes = [ax.clone() for ax in var.getAxisList()[:-rank]] + outAxes
+            resultFill = missing
+            if resultFill is None:
+                resultFill = var.getMissing()
+                if resultFill is None:
+                    resultFill = 1.e20
+            results[i] = cdms2.createVariable(result, axes=axes, grid=regridded.getGrid(),
+                                              fill_value=resultFill, attributes=copy.copy(var.attributes),
+                                              id=var.id)
+            # the copied missing_value and _FillValue attributes must not override it
+            results[i].setMissing(resultFill)
+    return results
+
+
 def setNumericCompatibility(mode):
     global _numeric_compatibility
     if mode is True or mode == 'on':
@@ -1325,7 +1526,10 @@ avariable.regrid: We chose regridMethod = %s for you among the following choices
                     keywords['diag']['regridTool'] = 'regrid'
 
                 # the original cdms2 regridder
-                regridf = Horizontal(fromgrid, togrid)
+                key = _regridderKey(fromgrid, togrid, 'regrid2')
+                regridf = _cachedRegridder(
+                    key, lambda: Horizontal(fromgrid, togrid,
+                                            weightsFile=_weightsFile(key)))
                 return regridf(self, missing=missing, order=order,
                                mask=mask, **keywords)
 
@@ -1336,16 +1540,21 @@ avariable.regrid: We chose regridMethod = %s for you among the following choices
 #            if numpy.any(self.mask == True):
 #                srcGridMask = getMinHorizontalMask(self)
 
-            # compute the interpolation weights
-            ro = CdmsRegrid(fromgrid, togrid,
-                            dtype=self.dtype,
-                            regridMethod=regridMethod,
-                            regridTool=regridTool,
-                            srcGridMask=srcGridMask,
-                            srcGridAreas=None,
-                            dstGridMask=None,
-                            dstGridAreas=None,
-                            **keywords)
+            # compute the interpolation weights, unless a regridder with
+            # the same grids and options is cached
+            key = _regridderKey(fromgrid, togrid, regridTool, regridMethod,
+                                str(self.dtype), srcGridMask, **keywords)
+            ro = _cachedRegridder(
+                key, lambda: CdmsRegrid(fromgrid, togrid,
+                                        dtype=self.dtype,
+                                        regridMethod=regridMethod,
+                                        regridTool=regridTool,
+                                        srcGridMask=srcGridMask,
+                                        srcGridAreas=None,
+                                        dstGridMask=None,
+                                        dstGridAreas=None,
+                                        weightsFile=_weightsFile(key),
+                                        **keywords))
             # now interpolate
             return ro(self, **keywords)
 
@@ -15,10 +15,11 @@ from .cdmsobj import CdmsObj, Max32int
 from .sliceut import reverseSlice, splitSlice, splitSliceExt
 from .error import CDMSError
 from . import forecast
+from . import timearray
 # import warnings
 from six import string_types
 standard_library.install_aliases()
-from collections import UserList  # noqa
+from collections import UserList, OrderedDict  # noqa
 _debug = 0
 std_axis_attributes = ['name', 'units', 'length', 'values', 'bounds']
 
@@ -119,6 +120,30 @@ def setAutoBounds(mode):
 def getAutoBounds():
     return _autobounds
 
+
+_mapIntervalCacheSize = 128             # Results of mapIntervalExt memoized per axis, 0 disables
+
+
+def setMapIntervalCacheSize(n):
+    """Set the number of coordinate interval lookups memoized on each axis.
+
+    Repeated getRegion or selector calls with the same coordinate interval
+    on an axis then reuse the index interval found the first time.
+
+    Parameters
+    ----------
+    n : maximum number of memoized intervals per axis, 0 disables the memo.
+    """
+    global _mapIntervalCacheSize
+    if n < 0:
+        raise CDMSError("Map interval cache size must be >= 0")
+    _mapIntervalCacheSize = n
+
+
+def getMapIntervalCacheSize():
+    """Get the number of coordinate interval lookups memoized on each axis."""
+    return _mapIntervalCacheSize
+
 # Create a transient axis
 
 
@@ -357,7 +382,7 @@ def mapLinearExt(axis, bounds, interval, indicator='ccn',
     # The intersection is nonempty; use searchsorted to get left/right limits
     # for testing
 
-    ii, jj = numpy.searchsorted(ar, (x, y))
+    ii, jj = ar.searchsorted((x, y))
 
     #
     #  find index range for left (iStart,iEnd) and right (jStart,jEnd)
@@ -723,6 +748,382 @@ def allclose(ax1, ax2, rtol=1.e-5, atol=1.e-8):
     return ((ax1 is ax2) or numpy.ma.allclose(
         ax1[:], ax2[:], rtol=rtol, atol=atol))
 
+
+def _indexArray(key, length):
+    """Get the indices selected by an integer, slice or integer array key in
+    a vector of the given length, as (index array, True if key is an integer)."""
+    if isinstance(key, (int, numpy.integer)):
+        if key >= length or key < -length:
+            raise IndexError('index out of bounds')
+        return numpy.array(key + length if key < 0 else key, numpy.int64), True
+    if isinstance(key, slice):
+        return numpy.array(range(length)[key], numpy.int64), False
+    index = numpy.asarray(key)
+    if index.dtype.kind not in 'iu':
+        raise IndexError('index must be an integer or slice: %s' % repr(key))
+    if numpy.any((index >= length) | (index < -length)):
+        raise IndexError('index out of bounds')
+    return numpy.where(index < 0, index + length, index), (index.ndim == 0)
+
+
+class LinearAxisValues(object):
+    """Values start + i * delta, i = 0..length-1, of a linear axis, computed on demand.
+
+    The values are those of LinearDataNode.toVector, that is of
+    numpy.arange(start, stop, delta, dtype), without holding the array.
+
+    Parameters
+    ----------
+    start, delta : first value and increment.
+
+    length : number of values.
+
+    dtype : numpy float type of the values.
+
+    isReversed : if true, the values are in reverse order.
+    """
+
+    def __init__(self, start, delta, length, dtype=numpy.float64, isReversed=False):
+        self.start = start
+        self.delta = delta
+        self.length = length
+        self.dtype = numpy.dtype(dtype)
+        self.isReversed = isReversed
+        # As numpy.arange: the first two values, and their difference as increment
+        self._first = self.dtype.type(start)
+        self._second = self.dtype.type(start + delta)
+        self._delta = self.dtype.type(self._second - self._first)
+        self.shape = (length,)
+
+    def __len__(self):
+        return self.length
+
+    def _values(self, index):
+        "Values at an array of indices in the non-reversed order."
+        values = self._first + index.astype(self.dtype) * self._delta
+        return numpy.where(index == 1, self._second, values)
+
+    def __getitem__(self, key):
+        index, isScalar = _indexArray(key, self.length)
+        if self.isReversed:
+            index = self.length - 1 - index
+        values = self._values(index)
+        return values[()] if isScalar else values
+
+    def reversed(self):
+        "Get the values in reverse order."
+        return LinearAxisValues(self.start, self.delta, self.length, self.dtype, not self.isReversed)
+
+    def searchsorted(self, v):
+        "numpy.searchsorted for non-decreasing values."
+        v = numpy.asarray(v, numpy.float64)
+        n = self.length
+        first = float(self[0])
+        step = (float(self[-1]) - first) / (n - 1) if n > 1 else 1.0
+        if step > 0:
+            index = numpy.clip(numpy.ceil((v - first) / step), 0, n).astype(numpy.int64)
+        else:
+            index = numpy.zeros(v.shape, numpy.int64)
+        # Correct the rounding of the estimate
+        while True:
+            down = (index > 0) & (self[numpy.maximum(index - 1, 0)] >= v)
+            up = (index < n) & (self[numpy.minimum(index, n - 1)] < v)
+            if not (down.any() or up.any()):
+                break
+            index = index - down + up
+        return index
+
+    def toArray(self):
+        "Get the values as an array."
+        return self[:]
+
+
+class LinearAxisBounds(object):
+    """Generic bounds of a linear axis, as AbstractAxis.genGenericBounds, computed on demand.
+
+    Parameters
+    ----------
+    values : LinearAxisValues of the axis, of length > 1.
+
+    ends : array of shape (2, 2), the first and last bounds, possibly adjusted
+           by the longitude and latitude rules of genGenericBounds.
+
+    isReversed, isSwapped : if true, the bounds are in reverse order, and
+                            their two columns are exchanged.
+    """
+
+    def __init__(self, values, ends, isReversed=False, isSwapped=False):
+        self.values = values
+        self.ends = ends
+        self.isReversed = isReversed
+        self.isSwapped = isSwapped
+        self.shape = (len(values), 2)
+
+    def __len__(self):
+        return self.shape[0]
+
+    @staticmethod
+    def midpoints(values, index):
+        """Bounds at an array of indices from the midpoints of values, without the
+        adjustment of the end bounds."""
+        n = len(values)
+        ar = values[numpy.array([0, 1, n - 2, n - 1])]
+        leftPoint = numpy.array([1.5 * ar[0] - 0.5 * ar[1]])
+        rightPoint = numpy.array([1.5 * ar[-1] - 0.5 * ar[-2]])
+        ar = values[index]
+        bounds = numpy.zeros(index.shape + (2,), numpy.float64)
+        bounds[..., 0] = (values[numpy.maximum(index - 1, 0)] + ar) / 2.0
+        bounds[..., 1] = (ar + values[numpy.minimum(index + 1, n - 1)]) / 2.0
+        bounds[index == 0, 0] = leftPoint
+        bounds[index == n - 1, 1] = rightPoint
+        return bounds
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            key, column = key
+        else:
+            column = slice(None)
+        n = self.shape[0]
+        index = _indexArray(key, n)[0]
+        if self.isReversed:
+            index = n - 1 - index
+        values = self.values
+        ar = values[index]
+        bounds = numpy.zeros(index.shape + (2,), numpy.float64)
+        bounds[..., 0] = (values[numpy.maximum(index - 1, 0)] + ar) / 2.0
+        bounds[..., 1] = (ar + values[numpy.minimum(index + 1, n - 1)]) / 2.0
+        bounds[index == 0] = self.ends[0]
+        bounds[index == n - 1] = self.ends[-1]
+        if self.isSwapped:
+            bounds = bounds[..., ::-1]
+        bounds = bounds[..., column]
+        return bounds[()] if bounds.ndim == 0 else bounds
+
+    def reversed(self):
+        "Get the bounds in reverse order."
+        return LinearAxisBounds(self.values, self.ends, not self.isReversed, self.isSwapped)
+
+    def swapped(self):
+        "Get the bounds with the two columns exchanged."
+        return LinearAxisBounds(self.values, self.ends, self.isReversed, not self.isSwapped)
+
+    def toArray(self):
+        "Get the bounds as an array of shape (n, 2)."
+        return self[:]
+
+
+def _ascendingSearchArrays(ar, bd):
+    """Get non-decreasing contiguous copies of axis values and bounds.
+
+    Returns
+    -------
+    (ar, bd, reversed) such that mapLinearExt on the copies gives the result
+    on the original arrays, mirrored if reversed is true. None if the first
+    cell of the copies has zero width, mapLinearExt then needs the originals.
+    Linear values and bounds are reversed without copy.
+    """
+    isLinear = isinstance(ar, LinearAxisValues) and isinstance(bd, LinearAxisBounds)
+    if ar[0] > ar[-1]:
+        sar = ar.reversed() if isLinear else ar[::-1]
+        if bd[0, 0] < bd[0, 1]:
+            sbd = bd.reversed() if isLinear else bd[::-1]
+        else:
+            sbd = bd.reversed().swapped() if isLinear else bd[::-1, ::-1]
+        isReversed = True
+    else:
+        sar = ar
+        if bd[0, 0] < bd[0, 1]:
+            sbd = bd
+        else:
+            sbd = bd.swapped() if isLinear else bd[:, ::-1]
+        isReversed = False
+    if not sbd[0, 0] < sbd[0, 1]:
+        return None
+    if isLinear:
+        return sar, sbd, isReversed
+    return numpy.ascontiguousarray(sar), numpy.ascontiguousarray(sbd), isReversed
+
+
+class _AxisSearchIndex(object):
+    """Search data of an axis precomputed for mapIntervalExt.
+
+    Holds the axis values, their direction and range, the circularity and
+    cycle, the bounds and the cycle-extended values of circular axes, as
+    non-decreasing contiguous arrays, and a LRU memo of the mapped intervals.
+    """
+
+    def __init__(self, axis, state):
+        self.state = state
+        ar = axis._getSearchValues()
+        self.data = ar
+        self.length = len(ar)
+        self.increasing = bool(ar[0] <= ar[-1])
+        self.armin = min(ar[0], ar[-1])
+        self.armax = max(ar[0], ar[-1])
+        self.circular = axis.isCircular()
+        self.cycle = axis.getModulo() if self.circular else None
+        self.results = OrderedDict()
+        self._search = None
+        self._extended = {}
+
+    def _searchArrays(self, ar, bd):
+        if isinstance(ar, LinearAxisValues) and not isinstance(bd, LinearAxisBounds):
+            ar = ar.toArray()
+        arrays = _ascendingSearchArrays(ar, bd)
+        if arrays is None:
+            if isinstance(bd, LinearAxisBounds):
+                ar, bd = ar.toArray(), bd.toArray()
+            return ar, bd, False
+        return arrays
+
+    def search(self, axis):
+        "Get (values, bounds, reversed) of the axis for mapLinearExt."
+        if self._search is None:
+            bd = axis._getSearchBounds()
+            if bd is None:              # In case autobounds is off
+                if isinstance(self.data, LinearAxisValues) and self.length > 1:
+                    bd = axis._genLinearGenericBounds(self.data)
+                else:
+                    bd = axis.genGenericBounds()
+            self._search = self._searchArrays(self.data, bd)
+        return self._search
+
+    def extended(self, nCycle, cycle):
+        "Get (values, bounds, reversed) of the axis extended to nCycle cycles."
+        key = (nCycle, cycle)
+        result = self._extended.get(key)
+        if result is None:
+            ar = self.data[:]
+            bigar = numpy.concatenate([ar + k * cycle for k in range(max(nCycle, 2))])
+            # create axis to get the bounds array
+            bigarAxis = createAxis(bigar)
+            bd = bigarAxis.getBounds()
+            if bd is None:              # In case autobounds is off
+                bd = bigarAxis.genGenericBounds()
+            result = self._searchArrays(bigar, bd)
+            self._extended[key] = result
+        return result
+
+
+def _mapSearchArrays(arrays, interval, indicator):
+    "mapLinearExt on the arrays of _AxisSearchIndex.search or extended."
+    ar, bd, isReversed = arrays
+    retval = mapLinearExt(ar, bd, interval, indicator)
+    if retval is not None and isReversed:
+        i, j = retval
+        retval = (len(ar) - j, len(ar) - i)
+    return retval
+
+
+def _checkIndicator(indicator):
+    "Check an interval/intersection indicator, return it as 3 lower case characters."
+    indicator = indicator.lower()
+    if len(indicator) == 2:
+        indicator += 'n'
+
+    if((len(indicator) != 3) or
+       ((indicator[0] != 'c' and indicator[0] != 'o') or
+        (indicator[1] != 'c' and indicator[1] != 'o') or
+        (indicator[2] != 'n' and indicator[2] != 'b' and indicator[2] != 's' and
+         indicator[2] != 'e')
+        )
+       ):
+        raise CDMSError(
+            "EEE: 3-character interval/intersection indicator incomplete or incorrect = " +
+            indicator)
+    return indicator
+
+
+def _mapLinearArrays(ar, bd, x, y, xclosed, yclosed, iind):
+    """Array version of mapLinearExt, for the 'n', 'b' and 's' intersections.
+
+    Parameters
+    ----------
+    ar : non-decreasing axis values, of length > 1.
+
+    bd : bounds of ar, with bd[0, 0] < bd[0, 1].
+
+    x, y : arrays of interval end points.
+
+    xclosed, yclosed : boolean arrays, true where the interval is closed on the left, right.
+
+    iind : intersection indicator, 'n', 'b' or 's'.
+
+    Returns
+    -------
+    (i, j, found) arrays. [i, j) is the index interval where found is true,
+    mapLinearExt returns None elsewhere.
+    """
+    length = len(ar)
+    swap = x > y
+    x, y = numpy.where(swap, y, x), numpy.where(swap, x, y)
+    xclosed, yclosed = numpy.where(swap, yclosed, xclosed), numpy.where(swap, xclosed, yclosed)
+
+    epsilon = 1.0e-5 * min(abs(ar[1] - ar[0]), abs(ar[-1] - ar[-2]))
+    aMinusEps = x - epsilon
+    aPlusEps = x + epsilon
+    bMinusEps = y - epsilon
+    bPlusEps = y + epsilon
+
+    # out-of-bounds requests and empty intersections
+    if iind == 'n':
+        found = ~((bPlusEps < ar[0]) | (aMinusEps > ar[-1]))
+        found &= ~numpy.where(xclosed, aMinusEps >= ar[-1], aPlusEps > ar[-1])
+        found &= ~numpy.where(yclosed, bPlusEps <= ar[0], bMinusEps < ar[0])
+    else:
+        found = ~((bPlusEps < bd[0, 0]) | (aMinusEps > bd[-1, 1]))
+        bdMaxRight = max(bd[-1][0], bd[-1][1])
+        bdMinLeft = min(bd[0][0], bd[0][1])
+        found &= ~numpy.where(xclosed, aMinusEps >= bdMaxRight, aMinusEps > bdMaxRight)
+        found &= ~numpy.where(yclosed, bPlusEps <= bdMinLeft, bPlusEps < bdMinLeft)
+
+    def intersects(index):
+        # mapLinearIntersection at the axis indices index
+        if iind == 'n':
+            left = right = ar[index]
+        elif iind == 'b':
+            left, right = bd[index, 1], bd[index, 0]
+        else:
+            left, right = bd[index, 0], bd[index, 1]
+        testLeft = numpy.where(xclosed, aMinusEps <= left, aPlusEps < left)
+        testRight = numpy.where(yclosed, right <= bPlusEps, right < bMinusEps)
+        return testLeft & testRight
+
+    # the intersection is searched in windows of 4 points around the end points
+    ii = ar.searchsorted(x)
+    jj = ar.searchsorted(y)
+    iStart = numpy.maximum(ii - 1, 0)
+    iEnd = numpy.minimum(ii + 2, length - 1)
+    jStart = numpy.maximum(jj - 1, 0)
+    jEnd = numpy.minimum(jj + 2, length - 1)
+
+    iInterval = numpy.full(x.shape, -1, numpy.int64)
+    for offset in range(3, -1, -1):
+        i = iStart + offset
+        test = (i <= iEnd) & intersects(numpy.minimum(i, length - 1))
+        iInterval = numpy.where(test, i, iInterval)
+
+    jInterval = numpy.full(x.shape, -1, numpy.int64)
+    for offset in range(4):
+        j = jStart + offset
+        active = (j <= jEnd)
+        test = intersects(numpy.minimum(j, length - 1))
+        jInterval = numpy.where(active & (jInterval == -1) & (iInterval != -1) & ~test, j - 1, jInterval)
+        jInterval = numpy.where(active & (j == length - 1) & test, j, jInterval)
+
+    # windows reduced to one point, or with no overlap
+    single = (iStart == jStart) & (iStart == iEnd) & (jStart == jEnd)
+    iInterval = numpy.where(single, iStart, iInterval)
+    jInterval = numpy.where(single, iStart, jInterval)
+    skip = ~single & (jEnd < iEnd)
+    iInterval[skip] = -1
+    jInterval[skip] = -1
+
+    found &= ~((jInterval < 0) & (iInterval < 0))
+    jInterval = numpy.maximum(jInterval, iInterval)
+    return iInterval, jInterval + 1, found
+
+
 # AbstractAxis defines the common axis interface.
 # Concrete axis classes are derived from this class.
 
@@ -738,6 +1139,8 @@ class AbstractAxis(CdmsObj):
         self._data_ = None
         # Cached wraparound values for circular axes
         self._doubledata_ = None
+        # Cached search index and results of mapIntervalExt
+        self._mapIndex_ = None
 
     def __str__(self):
         return "\n".join(self.listall()) + "\n"
@@ -931,6 +1334,24 @@ class AbstractAxis(CdmsObj):
     def isForecastTime(self):
         return self.isForecast()
 
+    def asComponentTimeArray(self, calendar=None):
+        """
+        Array version of cdtime tocomp.
+
+        Parameters
+        ----------
+        calendar : cdtime calendar, defaults to the calendar of the axis.
+
+        Returns
+        -------
+        Structured array with fields year, month, day, hour, minute and second (see cdms2.timearray).
+        """
+        if not hasattr(self, 'units'):
+            raise CDMSError("No time units defined")
+        if calendar is None:
+            calendar = self.getCalendar()
+        return timearray.reltocomp(self[:], self.units, calendar)
+
     def asComponentTime(self, calendar=None):
         "Array version of cdtime tocomp. Returns a list of component times."
         if not hasattr(self, 'units'):
@@ -940,9 +1361,7 @@ class AbstractAxis(CdmsObj):
         if self.isForecast():
             result = [forecast.comptime(t) for t in self[:]]
         else:
-            result = []
-            for val in self[:]:
-                result.append(cdtime.reltime(val, self.units).tocomp(calendar))
+            result = timearray.tocomptimes(self.asComponentTimeArray(calendar))
         return result
 
     #
@@ -950,43 +1369,18 @@ class AbstractAxis(CdmsObj):
     #
     def asDTGTime(self, calendar=None):
         "Array version of cdtime tocomp. Returns a list of component times in DTG format."
-        if not hasattr(self, 'units'):
-            raise CDMSError("No time units defined")
-        result = []
-        if calendar is None:
-            calendar = self.getCalendar()
-        for val in self[:]:
-            comptime = cdtime.reltime(val, self.units).tocomp(calendar)
-            s = repr(comptime)
-            tt = str.split(s, ' ')
-
-            ttt = str.split(tt[0], '-')
-            yr = int(ttt[0])
-            mo = int(ttt[1])
-            da = int(ttt[2])
-
-            ttt = str.split(tt[1], ':')
-            hr = int(ttt[0])
-            dtg = "%04d%02d%02d%02d" % (yr, mo, da, hr)
-            result.append(dtg)
-
-        return result
+        comp = self.asComponentTimeArray(calendar)
+        return ["%04d%02d%02d%02d" % (c['year'], c['month'], c['day'], c['hour']) for c in comp]
 
     def asdatetime(self, calendar=None):
         "Array version of cdtime tocomp. Returns a list of datetime objects."
         import datetime
-        if not hasattr(self, 'units'):
-            raise CDMSError("No time units defined")
-        result = []
-        if calendar is None:
-            calendar = self.getCalendar()
-        for val in self[:]:
-            c = cdtime.reltime(val, self.units).tocomp(calendar)
-            dtg = datetime.datetime(
-                c.year, c.month, c.day, c.hour, c.minute, int(c.second),
-                int((c.second - int(c.second)) * 1000))
-            result.append(dtg)
-        return result
+        comp = self.asComponentTimeArray(calendar)
+        seconds = comp['second'].astype(int)
+        fractions = ((comp['second'] - seconds) * 1000).astype(int)
+        return [datetime.datetime(int(c['year']), int(c['month']), int(c['day']), int(c['hour']),
+                                  int(c['minute']), int(sec), int(frac))
+                for c, sec, frac in zip(comp, seconds, fractions)]
 
     def asRelativeTime(self, units=None):
         "Array version of cdtime torel. Returns a list of relative times."
@@ -999,44 +1393,24 @@ class AbstractAxis(CdmsObj):
             result = [forecast.comptime(t).torel(units) for t in self[:]]
         else:
             cal = self.getCalendar()
-            result = [
-                cdtime.reltime(
-                    t,
-                    sunits).torel(
-                    units,
-                    cal) for t in self[:]]
+            values = timearray.reltorel(self[:], sunits, units, cal)
+            result = [cdtime.reltime(t, units) for t in values]
         return result
 
     def toRelativeTime(self, units, calendar=None):
         "Convert time axis values to another unit possibly in another calendar"
         if not hasattr(self, 'units'):
             raise CDMSError("No time units defined")
-        n = len(self[:])
         b = self.getBounds()
         scal = self.getCalendar()
         if calendar is None:
             calendar = scal
         else:
             self.setCalendar(calendar)
-        for i in range(n):
-            tmp = cdtime.reltime(self[i], self.units).tocomp(scal)
-            tmp2 = numpy.array(
-                float(
-                    tmp.torel(
-                        units,
-                        calendar).value)).astype(
-                self[:].dtype.char)
-            # if i==1 : print
-            # self[:].dtype.char,'tmp2:',tmp2,tmp2.astype('f'),self[i],self[i].astype('f')
-            self[i] = tmp2
-            if b is not None:
-                tmp = cdtime.reltime(b[i, 0], self.units).tocomp(scal)
-                b[i, 0] = numpy.array(
-                    float(tmp.torel(units, calendar).value)).astype(b.dtype.char)
-                tmp = cdtime.reltime(b[i, 1], self.units).tocomp(scal)
-                b[i, 1] = numpy.array(
-                    float(tmp.torel(units, calendar).value)).astype(b.dtype.char)
+        values = self[:]
+        self[:] = timearray.reltorel(values, self.units, units, scal, calendar).astype(values.dtype.char)
         if b is not None:
+            b = timearray.reltorel(b, self.units, units, scal, calendar).astype(b.dtype.char)
             self.setBounds(b)
         self.units = units
         return
@@ -1303,22 +1677,9 @@ class AbstractAxis(CdmsObj):
         # check length of indicator if overridden by user
         #
 
-        indicator = indicator.lower()
-        if len(indicator) == 2:
-            indicator += 'n'
-
-        if((len(indicator) != 3) or
-           ((indicator[0] != 'c' and indicator[0] != 'o') or
-            (indicator[1] != 'c' and indicator[1] != 'o') or
-            (indicator[2] != 'n' and indicator[2] != 'b' and indicator[2] != 's' and
-             indicator[2] != 'e')
-            )
-           ):
-            raise CDMSError(
-                "EEE: 3-character interval/intersection indicator incomplete or incorrect = " +
-                indicator)
+        indicator = _checkIndicator(indicator)
 
-        if self._data_ is None:
+        if self._data_ is None and self._linearValues() is None:
             self._data_ = self.getData()
 
         # ttttttttttttttttttttttttttttttttttttttttttttttttttttttttttttttttttttttttttttttt
@@ -1328,9 +1689,156 @@ class AbstractAxis(CdmsObj):
                 interval[0]), self._time2value(
                 interval[1]))
 
+        index = self._getMapIndex()
+        key = (interval[0], interval[1], indicator)
+        try:
+            retval = index.results.pop(key)
+        except KeyError:
+            retval = self._mapIntervalIndexed(index, interval, indicator, nCycleMax)
+        except TypeError:               # unhashable interval
+            return self._mapIntervalIndexed(index, interval, indicator, nCycleMax)
+        if _mapIntervalCacheSize > 0 and index.state is not None:
+            index.results[key] = retval
+            while len(index.results) > _mapIntervalCacheSize:
+                index.results.popitem(last=False)
+        return retval
+
+    def _getMapIndex(self):
+        """Get the search index of mapIntervalExt, rebuilt when the axis changed."""
+        state = self._mapIndexState()
+        index = getattr(self, '_mapIndex_', None)
+        if index is None or state is None or index.state != state:
+            index = _AxisSearchIndex(self, state)
+            self.__dict__['_mapIndex_'] = index if state is not None else None
+        return index
+
+    def _mapIndexState(self):
+        """Get the values which the search index of mapIntervalExt depends on,
+        or None if the index cannot be kept."""
+        linear = self._linearValues()
+        if linear is not None:
+            state = (linear.start, linear.delta, len(linear), linear.dtype)
+        else:
+            data = self._data_
+            if data is None or len(data) == 0:
+                return None
+            state = (id(data), len(data), data[0], data[-1])
+        return state + (getattr(self, 'units', None), getattr(self, 'calendar', None),
+                        getattr(self, 'topology', None), self.getModuloCycle(), getAutoBounds())
+
+    def _linearValues(self):
+        """Get the LinearAxisValues of an axis with a linear representation, or None."""
+        return None
+
+    def _getSearchValues(self):
+        "Get the values searched by mapIntervalExt, as an array or LinearAxisValues."
+        linear = self._linearValues()
+        if linear is not None:
+            return linear
+        return self[:]
+
+    def _getSearchBounds(self, isGeneric=None):
+        """Get the bounds searched by mapIntervalExt and sliced by subaxis, as
+        getBounds, or LinearAxisBounds for the generic bounds of a linear axis."""
+        linear = self._linearValues()
+        if linear is not None and len(linear) > 1 and self.getExplicitBounds() is None:
+            abopt = getAutoBounds()
+            if abopt == 1 or (abopt == 2 and (self.isLatitude() or self.isLongitude())):
+                if (isGeneric):
+                    isGeneric[0] = True
+                return self._genLinearGenericBounds(linear)
+        return self.getBounds(isGeneric)
+
+    def _genLinearGenericBounds(self, linear):
+        "genGenericBounds of a linear axis, as LinearAxisBounds."
+        n = len(linear)
+        ends = LinearAxisBounds.midpoints(linear, numpy.array([0, n - 1]))
+        self._adjustGenericBounds(ends)
+        return LinearAxisBounds(linear, ends)
+
+    def _invalidateMapIndex(self):
+        "Discard the search index of mapIntervalExt after a change of the values or bounds."
+        self.__dict__['_mapIndex_'] = None
+
+    def mapIntervals(self, intervals, indicator='ccn'):
+        """Map an array of coordinate intervals to index intervals.
+
+        Parameters
+        ----------
+        intervals : sequence or array of shape (n, 2) of (x, y) coordinate intervals.
+                    Time values may be component or relative times, or strings.
+
+        indicator : interval/intersection indicator, as for mapInterval.
+
+        Returns
+        -------
+        (i, j, k) integer arrays of shape (n,), the index intervals returned
+        by mapIntervalExt for each coordinate interval. k is 0 where the
+        intersection is empty, and j is -1 where mapIntervalExt returns
+        None as the end of a reversed slice, i.e. slice(i, None, -1).
+
+        Notes
+        -----
+        The intervals within the axis range are mapped with one vectorized
+        search of the values and bounds. The intervals wrapping around a
+        circular axis, and the 'e' intersection, are mapped one by one.
+        """
+        indicator = _checkIndicator(indicator)
+        intervals = numpy.asarray(intervals)
+        if intervals.dtype.kind not in 'iuf':
+            intervals = numpy.array([(self._time2value(x), self._time2value(y)) for (x, y) in intervals],
+                                    numpy.float64)
+        intervals = intervals.reshape((-1, 2))
+        x = intervals[:, 0]
+        y = intervals[:, 1]
+        n = len(intervals)
+        ri = numpy.zeros(n, numpy.int64)
+        rj = numpy.zeros(n, numpy.int64)
+        rk = numpy.zeros(n, numpy.int64)
+
+        if self._data_ is None and self._linearValues() is None:
+            self._data_ = self.getData()
+        index = self._getMapIndex()
+
         # If the interval is reversed wrt self, reverse the interval and
         # set the stride to -1
-        if (interval[0] <= interval[1]) == (self[0] <= self[-1]):
+        reversedInterval = ((x <= y) != index.increasing)
+        x, y = numpy.where(reversedInterval, y, x), numpy.where(reversedInterval, x, y)
+        xclosed = numpy.where(reversedInterval, indicator[1] == 'c', indicator[0] == 'c')
+        yclosed = numpy.where(reversedInterval, indicator[0] == 'c', indicator[1] == 'c')
+
+        ar, bd, isReversed = index.search(self)
+        scalar = ~((index.armin <= x) & (x <= index.armax) & (index.armin <= y) & (y <= index.armax))
+        if indicator[2] == 'e' or index.length < 2 or ar[0] > ar[-1]:
+            scalar[:] = True
+        elif not index.circular:
+            scalar[:] = False
+
+        vector = ~scalar
+        if vector.any():
+            i, j, found = _mapLinearArrays(ar, bd, x[vector], y[vector], xclosed[vector], yclosed[vector],
+                                           indicator[2])
+            if isReversed:
+                i, j = index.length - j, index.length - i
+            stride = numpy.where(reversedInterval[vector], -1, 1)
+            # mapIntervalExt for negative strides
+            i, j = numpy.where(stride == -1, j - 1, i), numpy.where(stride == -1, i - 1, j)
+            ri[vector] = numpy.where(found, i, 0)
+            rj[vector] = numpy.where(found, j, 0)
+            rk[vector] = numpy.where(found, stride, 0)
+
+        for m in numpy.nonzero(scalar)[0]:
+            retval = self.mapIntervalExt((intervals[m, 0], intervals[m, 1]), indicator)
+            if retval is not None:
+                i, j, k = retval
+                ri[m], rj[m], rk[m] = i, (-1 if j is None else j), k
+        return ri, rj, rk
+
+    def _mapIntervalIndexed(self, index, interval, indicator, nCycleMax):
+        """mapIntervalExt of a coordinate interval (x,y) with a checked indicator."""
+        # If the interval is reversed wrt self, reverse the interval and
+        # set the stride to -1
+        if (interval[0] <= interval[1]) == index.increasing:
             stride = 1
         else:
             stride = -1
@@ -1345,15 +1853,13 @@ class AbstractAxis(CdmsObj):
 
         xi, yi = interval
 
-        length = len(self)
-        ar = self[:]
-        ar0 = ar[0]
-        arn = ar[-1]
-        armin = min(ar0, arn)
-        armax = max(ar0, arn)
+        length = index.length
+        ar = index.data
+        armin = index.armin
+        armax = index.armax
 
         # Wrapped if circular and at least one value is outside the axis range.
-        wraptest1 = self.isCircular()
+        wraptest1 = index.circular
         wraptest2 = not ((armin <= xi <= armax) and (armin <= yi <= armax))
 
         if (wraptest1 and wraptest2):
@@ -1362,13 +1868,11 @@ class AbstractAxis(CdmsObj):
             #  find cycle and calc # of cycles in the interval
             #
 
-            cycle = self.getModulo()
+            cycle = index.cycle
 
             intervalLength = yi - xi
             intervalCycles = intervalLength / cycle
 
-            bd = self.getBounds()
-
             nPointsCycle = len(ar)
 
             ar0 = ar[0]
@@ -1411,26 +1915,15 @@ class AbstractAxis(CdmsObj):
             if(nCycle >= nCycleMax):
                 raise CDMSError(InvalidNCycles + repr(nCycle))
 
-            self._doubledata_ = numpy.concatenate((ar, ar + cycle))
-            k = 2
-            while(k < nCycle):
-                self._doubledata_ = numpy.concatenate(
-                    (self._doubledata_, ar + k * cycle))
-                k = k + 1
-
-            # Map the canonical coordinate interval (xp,yp) in the 'extended' data array
-            # create axis to get the bounds array
+            # Map the canonical coordinate interval (xp,yp) in the 'extended' data array,
+            # the extended values and bounds are cached in the search index
 
-            bigar = self._doubledata_
-            bigarAxis = createAxis(bigar)
-            bd = bigarAxis.getBounds()
-            if bd is None:              # In case autobounds is off
-                bd = bigarAxis.genGenericBounds()
+            extended = index.extended(int(nCycle), cycle)
+            self._doubledata_ = extended[0][::-1] if extended[2] else extended[0]
 
             # run the more general mapLinearExt to get the indices
 
-            indexInterval = mapLinearExt(
-                bigar, bd, (xp, yp), indicator, wrapped=1)
+            indexInterval = _mapSearchArrays(extended, (xp, yp), indicator)
 
             #
             # check to make sure we got an interval
@@ -1457,10 +1950,7 @@ class AbstractAxis(CdmsObj):
             retval = (i, j)
 
         else:
-            bd = self.getBounds()
-            if bd is None:              # In case autobounds is off
-                bd = self.genGenericBounds()
-            retval = mapLinearExt(ar, bd, interval, indicator)
+            retval = _mapSearchArrays(index.search(self), interval, indicator)
 
         if retval is not None:
             i, j = retval
@@ -1482,7 +1972,7 @@ class AbstractAxis(CdmsObj):
         supported for longitude dimensions or those with a modulus attribute.
         """
         isGeneric = [False]
-        fullBounds = self.getBounds(isGeneric)
+        fullBounds = self._getSearchBounds(isGeneric)
         _debug = 0
 
         # Handle wraparound
@@ -1639,6 +2129,9 @@ class AbstractAxis(CdmsObj):
     # Generate bounds from midpoints. width is the width of the zone if the
     # axis has one value.
     def genGenericBounds(self, width=1.0):
+        linear = self._linearValues()
+        if linear is not None and len(linear) > 1:
+            return self._genLinearGenericBounds(linear).toArray()
         if self._data_ is None:
             self._data_ = self.getData()
         ar = self._data_
@@ -1655,6 +2148,12 @@ class AbstractAxis(CdmsObj):
         retbnds = numpy.zeros((ar.shape + (2,)), numpy.float64)
         retbnds[..., 0] = bnds[:-1]
         retbnds[..., 1] = bnds[1:]
+        self._adjustGenericBounds(retbnds)
+        return retbnds
+
+    def _adjustGenericBounds(self, retbnds):
+        """Adjust in place the first and last generic bounds of longitude and latitude axes.
+        Only retbnds[0] and retbnds[-1] are used."""
         # To avoid floating point error on bound limits
 
         if(self.isLongitude() and hasattr(self, 'units') and
@@ -1704,7 +2203,7 @@ class AbstractAxis(CdmsObj):
             mycopy = createAxis(self[:])
         mycopy.id = self.id
         mydict = self.__dict__
-        newdict = {k: mydict[k] for k in mydict if k not in ['_data_']}
+        newdict = {k: mydict[k] for k in mydict if k not in ['_data_', '_mapIndex_']}
         mycopy.__dict__.update(newdict)
         mycopy._obj_ = None  # Erase Cdfile object if exist
         try:
@@ -1809,10 +2308,17 @@ class Axis(AbstractAxis):
                 # value
                 return node.data[key % length]
         elif isinstance(key, slice):  # x[i:j:k]
+            linear = self._linearValues()
+            if linear is not None:
+                # Only compute the values of the slice
+                return linear[key]
             if self._data_ is None:
                 self._data_ = node.getData()
             return self._data_[key.start:key.stop:key.step]
         elif isinstance(key, type(Ellipsis)):  # x[...]
+            linear = self._linearValues()
+            if linear is not None:
+                return linear.toArray()
             if self._data_ is None:
                 self._data_ = node.getData()
             return self._data_
@@ -1827,6 +2333,9 @@ class Axis(AbstractAxis):
 
     # Handle slices of the form x[i:j]
     def __getslice__(self, low, high):
+        linear = self._linearValues()
+        if linear is not None:
+            return linear[low:high]
         if self._data_ is None:
             self._data_ = self.getData()
         return self._data_[low:high]
@@ -1838,6 +2347,20 @@ class Axis(AbstractAxis):
     def isLinear(self):
         return self._node_.dataRepresent == cdmsNode.CdLinear
 
+    # Linear floating point axes are not held as arrays: their values and
+    # generic bounds are computed on demand.
+    def _linearValues(self):
+        if self._data_ is not None or not self.isLinear():
+            return None
+        linear = self._node_.data
+        numericType = cdmsNode.CdToNumericType.get(self._node_.datatype)
+        numbers = (int, float, numpy.integer, numpy.floating)
+        if numericType is None or numpy.dtype(numericType).kind != 'f' or \
+                not isinstance(linear.start, numbers) or not isinstance(linear.delta, numbers) or \
+                linear.delta == 0 or linear.length < 1:
+            return None
+        return LinearAxisValues(linear.start, linear.delta, linear.length, numericType)
+
     # Return the bounds array, or generate a default if autoBounds mode is on
     def getBounds(self, isGeneric=None):
         '''
@@ -1943,9 +2466,11 @@ class TransientAxis(AbstractAxis):
 
     def __setitem__(self, index, value):
         self._data_[index] = numpy.ma.filled(value)
+        self._invalidateMapIndex()
 
     def __setslice__(self, low, high, value):
         self._data_[low:high] = numpy.ma.filled(value)
+        self._invalidateMapIndex()
 
     def __len__(self):
         return len(self._data_)
@@ -1980,6 +2505,7 @@ class TransientAxis(AbstractAxis):
     # a file
     def setBounds(self, bounds, persistent=0, validate=0,
                   index=None, boundsid=None, isGeneric=False):
+        self._invalidateMapIndex()
         if bounds is not None:
             if isinstance(bounds, numpy.ma.MaskedArray):
                 bounds = numpy.ma.filled(bounds)
@@ -2055,6 +2581,7 @@ class TransientVirtualAxis(TransientAxis):
     def setBounds(self, bounds, isGeneric=False):
         "No boundaries on virtual axes"
         self._bounds_ = None
+        self._invalidateMapIndex()
 
     def __getitem__(self, key):
         return self.getData()[key]
@@ -2283,6 +2810,13 @@ class FileAxis(AbstractAxis):
     def isLinear(self):
         return False                        # All file axes are vector representation
 
+    def _mapIndexState(self):
+        # Values of a writable file are read on each access, do not keep an index
+        if (self._obj_ is not None) and (self.parent._mode_ != 'r') and not (
+                hasattr(self.parent, 'format') and self.parent.format == "DRS"):
+            return None
+        return AbstractAxis._mapIndexState(self)
+
     # Return the bounds array, or generate a default if autobounds mode is set
     # If isGeneric is a list with one element, we set its element to True if the
     # bounds were generated and False if bounds were read from the file.
@@ -2330,6 +2864,7 @@ class FileAxis(AbstractAxis):
     # isGeneric is only used for TransientAxis
     def setBounds(self, bounds, persistent=0, validate=0,
                   index=None, boundsid=None, isGeneric=False):
+        self._invalidateMapIndex()
         if persistent:
             if index is None:
                 if validate:
@@ -1,15 +1,15 @@
 """
 CDMS cache management and file movement objects
 """
-import cdurllib
+from . import cdurllib
 import urllib.parse
 import tempfile
 import os
 import time
-import cdmsobj
+from . import cdmsobj
 import sys
 import errno
-import shelve
+import sqlite3
 from .error import CDMSError
 MethodNotImplemented = "Method not yet implemented"
 SchemeNotSupported = "Scheme not supported: "
@@ -21,6 +21,7 @@ RequestManagerNotSupported = "Request manager interface not supported (module re
 _lock_max_tries = 10                    # Number of tries for a lock
 _lock_naptime = 1                       # Seconds between lock tries
 _cache_tempdir = None                   # Default temporary directory
+_index_timeout = 60                     # Seconds to wait for a busy cache index
 
 
 def lock(filename):
@@ -273,31 +274,50 @@ def copyFile(fromURL, toURL, callback=None,
 class Cache:
 
     indexpath = None                    # Path of data cache index
+    maxbytes = None                     # Size budget of the cache files, None if unbounded
 
     def __init__(self):
+        self._conn = None
+        self._connpid = None
+        # Per-process statistics, see getStats
+        self.hits = 0
+        self.misses = 0
+        self.bytesTransferred = 0
+        self.evictions = 0
         if self.indexpath is None:
-            self.indexpath = lockpath(".index")
-            # This is a kluge to handle the very real possibility that
-            # a lock was left over from an aborted process. Unfortunately,
-            # this might also screw up a transfer in progress ...
-            try:
-                unlock("index_lock")
-            except BaseException:
-                pass
-            lock("index_lock")
-            self.index = shelve.open(self.indexpath)  # Persistent cache index
+            self.indexpath = lockpath(".index.db")
+            self._connect()
             try:
                 # Make index file world writeable
                 os.chmod(self.indexpath, 0o666)
             except BaseException:
                 pass
-            self.index.close()
-            unlock("index_lock")
             # Clean up pending read notifications in the cache. This will also
             # mess up tranfers in progress...
             self.clean()
             self.direc = os.path.dirname(self.indexpath)  # Cache directory
 
+    def _connect(self):
+        """
+        Get the connection to the index database, opening it if necessary.
+
+        The index is a sqlite database in WAL mode, with one row per cache file,
+        so that concurrent processes only contend on the rows they update.
+        """
+        # sqlite connections must not be shared across a fork
+        if self._conn is None or self._connpid != os.getpid():
+            conn = sqlite3.connect(self.indexpath, timeout=_index_timeout,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_index ("
+                         "filekey TEXT PRIMARY KEY, "
+                         "path TEXT NOT NULL, "
+                         "size INTEGER NOT NULL DEFAULT 0, "
+                         "atime REAL NOT NULL)")
+            self._conn = conn
+            self._connpid = os.getpid()
+        return self._conn
+
     def get(self, filekey):
         """
         Get the path associated with <filekey>, or None if not present.
@@ -307,19 +327,15 @@ class Cache:
         <filekey> : filekey for cache
         """
         filekey = str(filekey)
-        lock("index_lock")
-        try:
-            self.index = shelve.open(self.indexpath)
-            value = self.index[filekey]
-        except KeyError:
-            value = None
-        except BaseException:
-            self.index.close()
-            unlock("index_lock")
-            raise
-        self.index.close()
-        unlock("index_lock")
-        return value
+        conn = self._connect()
+        row = conn.execute("SELECT path FROM cache_index WHERE filekey = ?",
+                           (filekey,)).fetchone()
+        if row is None:
+            return None
+        # Record the access, for LRU eviction
+        conn.execute("UPDATE cache_index SET atime = ? WHERE filekey = ?",
+                     (time.time(), filekey))
+        return row[0]
 
     def put(self, filekey, path):
         """
@@ -331,22 +347,17 @@ class Cache:
         """
 
         filekey = str(filekey)
-
-        # Create a semaphore
-        lock("index_lock")
+        if cdmsobj._debug:
+            print(
+                'Process %d: Adding cache file %s,\n   key %s' %
+                (os.getpid(), path, filekey))
         try:
-            if cdmsobj._debug:
-                print(
-                    'Process %d: Adding cache file %s,\n   key %s' %
-                    (os.getpid(), path, filekey))
-            self.index = shelve.open(self.indexpath)
-            self.index[filekey] = path
-        except BaseException:
-            self.index.close()
-            unlock("index_lock")
-            raise
-        self.index.close()
-        unlock("index_lock")
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        # A single statement, so the entry is replaced atomically
+        self._connect().execute("INSERT OR REPLACE INTO cache_index (filekey, path, size, atime) "
+                                "VALUES (?, ?, ?, ?)", (filekey, path, size, time.time()))
 
     def deleteEntry(self, filekey):
         """
@@ -357,15 +368,7 @@ class Cache:
         <filekey> : filekey for cache
         """
         filekey = str(filekey)
-
-        # Create a semaphore
-        lock("index_lock")
-        self.index = shelve.open(self.indexpath)
-        try:
-            del self.index[filekey]
-        except BaseException:
-            pass
-        unlock("index_lock")
+        self._connect().execute("DELETE FROM cache_index WHERE filekey = ?", (filekey,))
 
     def copyFile(self, fromURL, filekey, lcpath=None,
                  userid=None, useReplica=None):
@@ -412,6 +415,12 @@ class Cache:
 
         # Add to the cache index
         self.put(filekey, toPath)
+        self.misses += 1
+        self.bytesTransferred += os.path.getsize(toPath)
+
+        # Keep the cache within its size budget
+        if self.maxbytes is not None:
+            self.evict(self.maxbytes, keep=filekey)
 
         return toPath
 
@@ -491,13 +500,25 @@ class Cache:
                 # The read is finished.
                 else:
                     fpath = tempname
+                    self.hits += 1
                     success = 1
                     break
             if not success:
                 raise CDMSError(TimeOutError + repr(filekey))
 
+        # The file was evicted by another process since the lookup
+        elif not os.path.isfile(tempname):
+            self.deleteEntry(filekey)
+            fpath = self.copyFile(
+                fromURL,
+                filekey,
+                lcpath=lcpath,
+                userid=userid,
+                useReplica=useReplica)
+
         else:
             fpath = tempname
+            self.hits += 1
 
         if cdmsobj._debug:
             print(
@@ -510,35 +531,86 @@ class Cache:
         Delete the cache.
         """
         if self.indexpath is not None:
-            lock("index_lock")
-            self.index = shelve.open(self.indexpath)
-            for key in list(self.index.keys()):
-                path = self.index[key]
+            conn = self._connect()
+            rows = conn.execute("SELECT filekey, path FROM cache_index").fetchall()
+            for key, path in rows:
                 if path == "__READ_PENDING__":
                     continue  # Don't remove read-pending notifications
-                try:
-                    if cdmsobj._debug:
-                        print(
-                            'Process %d: Deleting cache file %s' %
-                            (os.getpid(), path))
-                    os.unlink(path)
-                except BaseException:
-                    pass
-
-                del self.index[key]
-            self.index.close()
-            unlock("index_lock")
+                self._removeEntry(key, path)
+            self._conn.close()
+            self._conn = None
             self.indexpath = None
 
-    def clean(self):
+    def clean(self, maxbytes=None):
+        """
+        Clean pending read notifications, and evict files beyond a size budget.
+
+        Parameters
+        ----------
+        maxbytes : if not None, delete the least recently used cache files until
+                   the cache holds at most maxbytes bytes.
+        """
+        conn = self._connect()
+        conn.execute("DELETE FROM cache_index WHERE path = ?", ("__READ_PENDING__",))
+        if maxbytes is not None:
+            self.evict(maxbytes)
+
+    def evict(self, maxbytes, keep=None):
+        """
+        Delete the least recently used cache files until the cache holds at most maxbytes bytes.
+
+        Parameters
+        ----------
+        maxbytes : size budget of the cache files.
+
+        keep : filekey of an entry which must not be evicted, or None.
         """
-        Clean pending read notifications.
+        conn = self._connect()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_index").fetchone()[0]
+        if total <= maxbytes:
+            return
+        rows = conn.execute("SELECT filekey, path, size FROM cache_index "
+                            "WHERE path != ? ORDER BY atime", ("__READ_PENDING__",)).fetchall()
+        if keep is not None:
+            keep = str(keep)
+        for key, path, size in rows:
+            if total <= maxbytes:
+                break
+            if key == keep:
+                continue
+            self._removeEntry(key, path)
+            self.evictions += 1
+            total -= size
+
+    def getStats(self):
+        """
+        Get the cache statistics of this process.
+
+        Returns
+        -------
+        dictionary with the number of cache hits and misses, the number of bytes
+        transferred into the cache, the number of evicted files, and the current
+        total size of the cache files in bytes.
+        """
+        size = self._connect().execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache_index").fetchone()[0]
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'bytes_transferred': self.bytesTransferred,
+                'evictions': self.evictions,
+                'size': size}
+
+    def _removeEntry(self, filekey, path):
         """
-        lock("index_lock")
-        self.index = shelve.open(self.indexpath)
-        for key in list(self.index.keys()):
-            path = self.index[key]
-            if path == "__READ_PENDING__":
-                del self.index[key]
-        self.index.close()
-        unlock("index_lock")
+        Delete a cache file and its index entry.
+        """
+        try:
+            if cdmsobj._debug:
+                print(
+                    'Process %d: Deleting cache file %s' %
+                    (os.getpid(), path))
+            os.unlink(path)
+        except BaseException:
+            pass
+        self._connect().execute("DELETE FROM cache_index WHERE filekey = ? AND path = ?",
+                                (filekey, path))
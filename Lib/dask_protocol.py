@@ -1,4 +1,5 @@
 import zlib
+import numpy
 from . import tvariable
 from . import fvariable
 from cdms2 import open
@@ -11,14 +12,24 @@ createVariable = tvariable.createVariable
 
 
 def serialize_TV(tv):
-    state = zlib.compress(tv.dumps().encode("utf-8"))
-    return {"TV": state}, []
+    """Serialize a TransientVariable as a small header and raw buffer frames.
+
+    The frames are the data, the mask if any, then the values and explicit
+    bounds of each axis. Compression of the frames is left to dask.
+    """
+    if numpy.ma.getdata(tv).dtype.hasobject:
+        # No raw buffer for object arrays, fall back on JSON
+        state = zlib.compress(tv.dumps().encode("utf-8"))
+        return {"TV": state}, []
+    return tvariable.toBuffers(tv)
 
 
 def deserialize_TV(header, frames):
-    TV = header['TV']
-    newvar = createVariable(TV, fromJSON=True)
-    return newvar
+    if 'TV' in header:
+        TV = header['TV']
+        newvar = createVariable(TV, fromJSON=True)
+        return newvar
+    return tvariable.fromBuffers(header, frames)
 
 
 def serialize_FV(fv):
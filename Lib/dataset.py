@@ -10,6 +10,7 @@ import numpy
 from . import cdmsNode
 import os
 import string
+import threading
 try:
     from urllib.parse import urlparse, urlunparse
     from urllib.request import urlopen
@@ -31,8 +32,13 @@ from .fvariable import FileVariable
 from .tvariable import asVariable
 from .cdmsNode import CdDatatypes
 from . import convention
+from . import metacache
 import warnings
 from collections import OrderedDict
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
 from six import string_types
 
 # Default is serial mode until setNetcdfUseParallelFlag(1) is called
@@ -402,6 +408,251 @@ def useNetcdf3():
     setNetcdfDeflateLevelFlag(0)
     setNetcdf4Flag(0)
 
+
+class _PooledFile(object):
+    """Cdunif file lent by the file handle pool.
+
+    Behaves like the underlying Cdunif file, except that close() hands
+    the file back to the pool instead of closing it.
+    """
+
+    def __init__(self, pool, key, stamp, cufile):
+        self._pool = pool
+        self._key = key
+        self._stamp = stamp
+        self._cufile = cufile
+
+    def __getattr__(self, name):
+        if self._cufile is None:
+            raise CDMSError(FileWasClosed + self._key[0])
+        return getattr(self._cufile, name)
+
+    def close(self):
+        if self._cufile is not None:
+            self._pool.release(self._key, self._stamp, self._cufile)
+            self._cufile = None
+
+
+class _FileHandlePool(object):
+    """Process-wide LRU pool of open read-only Cdunif files.
+
+    Files are keyed by (path, mode) and stamped with the device, inode, size
+    and modification time of the file; a pooled file whose stamp no longer
+    matches the file on disk is closed rather than reused. Each file is lent
+    to one caller at a time, so the pool is safe for concurrent reads.
+    """
+
+    def __init__(self, maxfiles=0):
+        self.maxfiles = maxfiles
+        self._idle = []                 # [(key, stamp, cufile)], least recently used first
+        self._lock = threading.Lock()
+
+    def open(self, path, mode):
+        if self.maxfiles <= 0 or mode != 'r':
+            return Cdunif.CdunifFile(path, mode)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return Cdunif.CdunifFile(path, mode)
+        stamp = (st.st_dev, st.st_ino, st.st_size, st.st_mtime)
+        key = (path, mode)
+
+        cufile = None
+        stale = []
+        with self._lock:
+            for i in range(len(self._idle) - 1, -1, -1):
+                if self._idle[i][0] == key:
+                    (ikey, istamp, ifile) = self._idle.pop(i)
+                    if istamp == stamp:
+                        cufile = ifile
+                        break
+                    stale.append(ifile)
+        self._closeAll(stale)
+
+        if cufile is None:
+            cufile = Cdunif.CdunifFile(path, mode)
+        return _PooledFile(self, key, stamp, cufile)
+
+    def release(self, key, stamp, cufile):
+        evicted = []
+        with self._lock:
+            self._idle.append((key, stamp, cufile))
+            while len(self._idle) > self.maxfiles:
+                evicted.append(self._idle.pop(0)[2])
+        self._closeAll(evicted)
+
+    def resize(self, maxfiles):
+        evicted = []
+        with self._lock:
+            self.maxfiles = maxfiles
+            while len(self._idle) > max(maxfiles, 0):
+                evicted.append(self._idle.pop(0)[2])
+        self._closeAll(evicted)
+
+    def clear(self):
+        with self._lock:
+            idle = [item[2] for item in self._idle]
+            self._idle = []
+        self._closeAll(idle)
+
+    def _closeAll(self, cufiles):
+        for cufile in cufiles:
+            try:
+                cufile.close()
+            except BaseException:
+                pass
+
+
+_filePool = _FileHandlePool()
+
+
+def setFileHandlePoolSize(value):
+    """Set the maximum number of idle files kept open for reading dataset (CDML) variables.
+
+       Files read by multi-file datasets are kept open in a process-wide LRU
+       pool and reused by later reads, instead of being reopened every time.
+       A file which changed on disk since it was pooled is reopened.
+
+       Parameters
+       ----------
+       value : maximum number of open files, 0 (the default) disables the pool.
+
+       Returns
+       -------
+       No return value.
+    """
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise CDMSError("Error file handle pool size must be an integer >= 0")
+    _filePool.resize(value)
+
+
+def getFileHandlePoolSize():
+    """Get the maximum number of idle files kept open for reading dataset variables.
+
+       Returns
+       -------
+       File handle pool size.
+    """
+    return _filePool.maxfiles
+
+
+def clearFileHandlePool():
+    """Close all idle files held by the file handle pool.
+
+       Returns
+       -------
+       No return value.
+    """
+    _filePool.clear()
+
+
+_lazyOpen = False
+
+
+def setLazyOpenFlag(value):
+    """Enable/Disable lazy open of files in read mode.
+
+       In lazy mode the variables, axes and grids of a file are only built
+       when first accessed through file.variables, file.axes and file.grids,
+       so opening a file with many variables costs about the same as opening
+       a file with one. Accessing file.grids builds all variables. Grid ids
+       follow the order in which gridded variables are first accessed.
+
+       Parameters
+       ----------
+       value : 0/1, False/True.
+
+       Returns
+       -------
+       No return value.
+    """
+    global _lazyOpen
+    if value not in [True, False, 0, 1]:
+        raise CDMSError("Error lazy open flag must be 1/0 or true/False")
+    _lazyOpen = value in [1, True]
+
+
+def getLazyOpenFlag():
+    """Get lazy open flag value.
+
+       Returns
+       -------
+       Lazy open flag value.
+    """
+    return _lazyOpen
+
+
+class _LazyObjectMap(MutableMapping):
+    """Mapping of file objects which are built on first access.
+
+    Parameters
+    ----------
+    names : keys of the objects, in order.
+
+    factory : function (name) -> object, building the object for a key.
+
+    finish : optional function (object), called once the built object is in the mapping.
+
+    prepare : optional function, called once before the first access of the mapping.
+    """
+
+    _Unbuilt = object()
+
+    def __init__(self, names, factory, finish=None, prepare=None):
+        self._data = OrderedDict((name, self._Unbuilt) for name in names)
+        self._factory = factory
+        self._finish = finish
+        self._prepare = prepare
+
+    def _ready(self):
+        if self._prepare is not None:
+            prepare = self._prepare
+            self._prepare = None
+            prepare()
+
+    def __getitem__(self, key):
+        self._ready()
+        value = self._data[key]
+        if value is self._Unbuilt:
+            value = self._factory(key)
+            self._data[key] = value
+            if self._finish is not None:
+                self._finish(value)
+        return value
+
+    def __setitem__(self, key, value):
+        self._ready()
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        self._ready()
+        del self._data[key]
+
+    def __contains__(self, key):
+        self._ready()
+        return key in self._data
+
+    def __iter__(self):
+        self._ready()
+        return iter(list(self._data.keys()))
+
+    def __len__(self):
+        self._ready()
+        return len(self._data)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def insert(self, key, value):
+        """Add a built object, without preparing the mapping."""
+        self._data[key] = value
+
+    def loaded(self):
+        """Return a dictionary of the objects built so far."""
+        return OrderedDict((key, value) for key, value in self._data.items()
+                           if value is not self._Unbuilt)
+
+
 # Create a tree from a file path.
 # Returns the parse tree root node.
 
@@ -453,6 +704,30 @@ def createDataset(path, template=None):
     return openDataset(path, 'w', template)
 
 
+def _probeGlobalAttribute(path, name):
+    """Read one global attribute of a file, without the axis, variable and grid
+       discovery done by CdmsFile.
+
+       Parameters
+       ----------
+       path : file path.
+
+       name : global attribute name.
+
+       Returns
+       -------
+       The attribute value, or None if the attribute is missing or the file cannot be read.
+    """
+    try:
+        f = Cdunif.CdunifFile(path, "r")
+    except BaseException:
+        return None
+    try:
+        return getattr(f, name, None)
+    finally:
+        f.close()
+
+
 # Open an existing dataset
 # 'uri' is a Uniform Resource Identifier, referring to a cdunif file, XML file,
 #   or LDAP URL of a catalog dataset entry.
@@ -502,27 +777,15 @@ def openDataset(uri, mode='r', template=None,
                     pass
                 return CdmsFile(path, mode, mpiBarrier=CdMpi)
 
-            # The file exists
-            file1 = CdmsFile(path, "r")
+            # The file exists. Probe the libcf file type without building
+            # the CdmsFile, so that the metadata is only scanned once.
             if libcf is not None:
-                if hasattr(file1, libcf.CF_FILETYPE):
-                    if getattr(
-                            file1, libcf.CF_FILETYPE) == libcf.CF_GLATT_FILETYPE_HOST:
-                        file = gsHost.open(path, mode)
-                    elif mode == 'r' and hostObj is None:
-                        # helps performance on machines where file open (in
-                        # CdmsFile) is costly
-                        file = file1
-                    else:
-                        file = CdmsFile(path, mode, hostObj=hostObj)
-                    file1.close()
-                else:
-                    file1.close()
-                    file = CdmsFile(path, mode)
-                return file
-            else:
-                file1.close()
-                return CdmsFile(path, mode)
+                filetype = _probeGlobalAttribute(path, libcf.CF_FILETYPE)
+                if filetype == libcf.CF_GLATT_FILETYPE_HOST:
+                    return gsHost.open(path, mode)
+                elif filetype is not None:
+                    return CdmsFile(path, mode, hostObj=hostObj)
+            return CdmsFile(path, mode)
     elif scheme in ['http', 'gridftp', 'https']:
 
         if (dods):
@@ -1094,7 +1357,7 @@ class Dataset(CdmsObj, cuDataset):
             if cdmsobj._debug == 1:
                 sys.stdout.write(path + '\n')
                 sys.stdout.flush()
-            f = Cdunif.CdunifFile(path, mode)
+            f = _filePool.open(path, mode)
             return f
 
         # Opened via a database
@@ -1123,7 +1386,7 @@ class Dataset(CdmsObj, cuDataset):
                     if cdmsobj._debug == 1:
                         sys.stdout.write(fileurl + '\n')
                         sys.stdout.flush()
-                    f = Cdunif.CdunifFile(path, mode)
+                    f = _filePool.open(path, mode)
                     return f
 
             # See if request manager is being used for file transfer
@@ -1276,6 +1539,7 @@ class CdmsFile(CdmsObj, cuDataset):
         except Exception as err:
             raise CDMSError('Cannot open file %s (%s)' % (path, err))
         self._file_ = _fileobj_   # Cdunif file object
+        self._lazy_ = (_lazyOpen and mode == 'r')
         self.variables = {}
         self.axes = {}
         self.grids = {}
@@ -1309,44 +1573,53 @@ class CdmsFile(CdmsObj, cuDataset):
                                     hostObj.gridVars[coord][0], mode)
                                 self._file_.variables[coord] = cdunifvar.variables[coord]
 
-            # Get lists of 1D and auxiliary coordinate axes
-            coords1d = self._convention_.getAxisIds(self._file_.variables)
-            coordsaux = self._convention_.getAxisAuxIds(
-                self._file_.variables, coords1d)
-
-            # Build variable list
-            for name in list(self._file_.variables.keys()):
-                if name not in coords1d:
-                    cdunifvar = self._file_.variables[name]
-                    if name in coordsaux:
-                        # Put auxiliary coordinate axes with variables, since there may be
-                        # a dimension with the same name.
-                        if len(cdunifvar.shape) == 2:
-                            self.variables[name] = FileAxis2D(
-                                self, name, cdunifvar)
-                        else:
-                            self.variables[name] = FileAuxAxis1D(
-                                self, name, cdunifvar)
-                    else:
-                        self.variables[name] = FileVariable(
-                            self, name, cdunifvar)
-
-            # Build axis list
-            for name in sorted(self._file_.dimensions.keys()):
-                if name in coords1d:
-                    cdunifvar = self._file_.variables[name]
-                elif name in coordsaux:
-                    cdunifvar = self._file_.variables[name]
-                else:
-                    cdunifvar = None
-                self.axes[name] = FileAxis(self, name, cdunifvar)
-            self.axes = OrderedDict(sorted(self.axes.items()))
+            # Reuse the structure found by a previous open of the file, if cached
+            metadata = None
+            cache = metacache.getMetadataCache()
+            if cache is not None and mode == 'r' and hostObj is None and "://" not in path:
+                metadata = cache.get(path)
+            else:
+                cache = None
 
-            # Attach boundary variables
-            for name in coordsaux:
-                var = self.variables[name]
-                bounds = self._convention_.getVariableBounds(self, var)
-                var.setBounds(bounds)
+            if metadata is not None:
+                coords1d = metadata['coords1d']
+                coordsaux = metadata['coordsaux']
+                self._gridkeys_ = metadata['gridkeys']
+            else:
+                # Get lists of 1D and auxiliary coordinate axes
+                coords1d = self._convention_.getAxisIds(self._file_.variables)
+                coordsaux = self._convention_.getAxisAuxIds(
+                    self._file_.variables, coords1d)
+                self._gridkeys_ = {}
+            self._coords1d_ = coords1d
+            self._coordsaux_ = coordsaux
+
+            varnames = [name for name in list(self._file_.variables.keys())
+                        if name not in coords1d]
+            axisnames = sorted(self._file_.dimensions.keys())
+
+            if self._lazy_:
+                # Variables, axes and grids are built on first access
+                self.variables = _LazyObjectMap(
+                    varnames, self._loadVariable, finish=self._buildGrid)
+                self.axes = _LazyObjectMap(axisnames, self._newAxis)
+                self.grids = _LazyObjectMap(
+                    [], None, prepare=self._loadAllVariables)
+            else:
+                # Build variable list
+                for name in varnames:
+                    self.variables[name] = self._newVariable(name)
+
+                # Build axis list
+                for name in axisnames:
+                    self.axes[name] = self._newAxis(name)
+                self.axes = OrderedDict(sorted(self.axes.items()))
+
+                # Attach boundary variables
+                for name in coordsaux:
+                    var = self.variables[name]
+                    bounds = self._convention_.getVariableBounds(self, var)
+                    var.setBounds(bounds)
 
             self.dictdict = {
                 'variable': self.variables,
@@ -1355,96 +1628,183 @@ class CdmsFile(CdmsObj, cuDataset):
                 'curveGrid': self.grids,
                 'genericGrid': self.grids}
 
-            # Initialize variable domains
-            for var in list(self.variables.values()):
-                var.initDomain(self.axes)
+            if not self._lazy_:
+                # Initialize variable domains
+                for var in list(self.variables.values()):
+                    var.initDomain(self.axes)
 
-            # Build grids
-            for var in list(self.variables.values()):
-                # Get grid information for the variable. gridkey has the form
-                # (latname,lonname,order,maskname, abstract_class).
-                gridkey, lat, lon = var.generateGridkey(
-                    self._convention_, self.variables)
+                # Build grids
+                for var in list(self.variables.values()):
+                    self._buildGrid(var)
 
-                # If the variable is gridded, lookup the grid. If no such grid exists,
-                # create a unique gridname, create the grid, and add to the
-                # gridmap.
-                if gridkey is None:
-                    grid = None
+                if cache is not None and metadata is None and self._gridkeys_ is not None:
+                    cache.put(path, {'coords1d': coords1d,
+                                     'coordsaux': coordsaux,
+                                     'gridkeys': self._gridkeys_})
+        except BaseException:
+            self.close()
+            raise
+
+    def _newVariable(self, name):
+        """Create the variable or auxiliary coordinate axis object for a file variable."""
+        cdunifvar = self._file_.variables[name]
+        if name in self._coordsaux_:
+            # Put auxiliary coordinate axes with variables, since there may be
+            # a dimension with the same name.
+            if len(cdunifvar.shape) == 2:
+                return FileAxis2D(self, name, cdunifvar)
+            else:
+                return FileAuxAxis1D(self, name, cdunifvar)
+        return FileVariable(self, name, cdunifvar)
+
+    def _newAxis(self, name):
+        """Create the axis object for a file dimension."""
+        if name in self._coords1d_ or name in self._coordsaux_:
+            cdunifvar = self._file_.variables[name]
+        else:
+            cdunifvar = None
+        return FileAxis(self, name, cdunifvar)
+
+    def _loadVariable(self, name):
+        """Create a variable with its domain and bounds, for lazy open mode."""
+        var = self._newVariable(name)
+        var.initDomain(self.axes)
+        if name in self._coordsaux_:
+            var.setBounds(self._convention_.getVariableBounds(self, var))
+        return var
+
+    def _loadAllVariables(self):
+        """Build all variables, and so all grids, for lazy open mode."""
+        for name in list(self.variables.keys()):
+            self.variables[name]
+
+    def _generateGridkey(self, var):
+        """Get the grid key of a variable, reusing the metadata cache entry if any.
+
+        The grid keys are recorded in self._gridkeys_ as
+        {varname: None or [gridkey, [latkind, latid], [lonkind, lonid]]},
+        where kind is 'axis' or 'variable'. self._gridkeys_ is set to None
+        if a grid key cannot be recorded.
+        """
+        gridkeys = self._gridkeys_
+        if gridkeys is not None and var.id in gridkeys:
+            entry = gridkeys[var.id]
+            if entry is None:
+                return None, None, None
+            gridkey, (latkind, latid), (lonkind, lonid) = entry
+            return (tuple(gridkey), self.dictdict[latkind][latid],
+                    self.dictdict[lonkind][lonid])
+
+        gridkey, lat, lon = var.generateGridkey(
+            self._convention_, self.variables)
+        if gridkeys is not None:
+            if gridkey is None:
+                gridkeys[var.id] = None
+            else:
+                entry = [list(gridkey)]
+                for coord in (lat, lon):
+                    if self.axes.get(coord.id) is coord:
+                        entry.append(['axis', coord.id])
+                    elif self.variables.get(coord.id) is coord:
+                        entry.append(['variable', coord.id])
+                    else:
+                        self._gridkeys_ = None
+                        break
                 else:
-                    grid = self._gridmap_.get(gridkey)
-                    if grid is None:
+                    gridkeys[var.id] = entry
+        return gridkey, lat, lon
+
+    def _buildGrid(self, var):
+        """Lookup or create the grid of a variable, and set it."""
+        if self._lazy_:
+            # Don't let the grid lookup build all variables
+            grids = self.grids.loaded()
+        else:
+            grids = self.grids
 
-                        if hasattr(var, 'grid_type'):
-                            gridtype = var.grid_type
-                        else:
-                            gridtype = "generic"
+        # Get grid information for the variable. gridkey has the form
+        # (latname,lonname,order,maskname, abstract_class).
+        gridkey, lat, lon = self._generateGridkey(var)
 
-                        candidateBasename = None
-                        if gridkey[4] == 'rectGrid':
-                            gridshape = (len(lat), len(lon))
-                        elif gridkey[4] == 'curveGrid':
-                            gridshape = lat.shape
-                        elif gridkey[4] == 'genericGrid':
-                            gridshape = lat.shape
-                            candidateBasename = 'grid_%d' % gridshape
-                        else:
-                            gridshape = (len(lat), len(lon))
+        # If the variable is gridded, lookup the grid. If no such grid exists,
+        # create a unique gridname, create the grid, and add to the
+        # gridmap.
+        if gridkey is None:
+            grid = None
+        else:
+            grid = self._gridmap_.get(gridkey)
+            if grid is None:
 
-                        if candidateBasename is None:
-                            candidateBasename = 'grid_%dx%d' % gridshape
-                        if candidateBasename not in self.grids:
-                            gridname = candidateBasename
-                        else:
-                            foundname = 0
-                            for i in range(97, 123):  # Lower-case letters
-                                candidateName = candidateBasename + \
-                                    '_' + chr(i)
-                                if candidateName not in self.grids:
-                                    gridname = candidateName
-                                    foundname = 1
-                                    break
+                if hasattr(var, 'grid_type'):
+                    gridtype = var.grid_type
+                else:
+                    gridtype = "generic"
+
+                candidateBasename = None
+                if gridkey[4] == 'rectGrid':
+                    gridshape = (len(lat), len(lon))
+                elif gridkey[4] == 'curveGrid':
+                    gridshape = lat.shape
+                elif gridkey[4] == 'genericGrid':
+                    gridshape = lat.shape
+                    candidateBasename = 'grid_%d' % gridshape
+                else:
+                    gridshape = (len(lat), len(lon))
 
-                            if not foundname:
-                                print(
-                                    'Warning: cannot generate a grid for variable', var.id)
-                                continue
+                if candidateBasename is None:
+                    candidateBasename = 'grid_%dx%d' % gridshape
+                if candidateBasename not in grids:
+                    gridname = candidateBasename
+                else:
+                    foundname = 0
+                    for i in range(97, 123):  # Lower-case letters
+                        candidateName = candidateBasename + \
+                            '_' + chr(i)
+                        if candidateName not in grids:
+                            gridname = candidateName
+                            foundname = 1
+                            break
 
-                        # Create the grid
-                        if gridkey[4] == 'rectGrid':
-                            grid = FileRectGrid(
-                                self, gridname, lat, lon, gridkey[2], gridtype)
-                        else:
-                            if gridkey[3] != '':
-                                if gridkey[3] in self.variables:
-                                    maskvar = self.variables[gridkey[3]]
-                                else:
-                                    print(
-                                        'Warning: mask variable %s not found' %
-                                        gridkey[3])
-                                    maskvar = None
-                            else:
-                                maskvar = None
-                            if gridkey[4] == 'curveGrid':
-                                grid = FileCurveGrid(
-                                    lat, lon, gridname, parent=self, maskvar=maskvar)
-                            else:
-                                try:
-                                    grid = FileGenericGrid(
-                                        lat, lon, gridname, parent=self, maskvar=maskvar)
-                                except BaseException:
-                                    if(lat.rank() == 1 and lon.rank() == 1):
-                                        grid = FileRectGrid(
-                                            self, gridname, lat, lon, gridkey[2], gridtype)
+                    if not foundname:
+                        print(
+                            'Warning: cannot generate a grid for variable', var.id)
+                        return
 
-                        self.grids[grid.id] = grid
-                        self._gridmap_[gridkey] = grid
+                # Create the grid
+                if gridkey[4] == 'rectGrid':
+                    grid = FileRectGrid(
+                        self, gridname, lat, lon, gridkey[2], gridtype)
+                else:
+                    if gridkey[3] != '':
+                        if gridkey[3] in self.variables:
+                            maskvar = self.variables[gridkey[3]]
+                        else:
+                            print(
+                                'Warning: mask variable %s not found' %
+                                gridkey[3])
+                            maskvar = None
+                    else:
+                        maskvar = None
+                    if gridkey[4] == 'curveGrid':
+                        grid = FileCurveGrid(
+                            lat, lon, gridname, parent=self, maskvar=maskvar)
+                    else:
+                        try:
+                            grid = FileGenericGrid(
+                                lat, lon, gridname, parent=self, maskvar=maskvar)
+                        except BaseException:
+                            if(lat.rank() == 1 and lon.rank() == 1):
+                                grid = FileRectGrid(
+                                    self, gridname, lat, lon, gridkey[2], gridtype)
+
+                if self._lazy_:
+                    self.grids.insert(grid.id, grid)
+                else:
+                    self.grids[grid.id] = grid
+                self._gridmap_[gridkey] = grid
 
-                # Set the variable grid
-                var.setGrid(grid)
-        except BaseException:
-            self.close()
-            raise
+        # Set the variable grid
+        var.setGrid(grid)
 
     def __enter__(self):
         return self
@@ -1501,6 +1861,9 @@ class CdmsFile(CdmsObj, cuDataset):
             return
         if hasattr(self, 'dictdict'):
             for dict in list(self.dictdict.values()):
+                if isinstance(dict, _LazyObjectMap):
+                    # Only the objects built so far need to be released
+                    dict = dict.loaded()
                 for obj in list(dict.values()):
                     obj.parent = None
                     del obj
@@ -0,0 +1,166 @@
+"""
+CDMS persistent file metadata cache
+"""
+import hashlib
+import json
+import os
+import tempfile
+from .error import CDMSError
+
+_version = 1                            # Format version of the cache entries
+_cache = None                           # Current MetadataCache, None if disabled
+
+
+class MetadataCache:
+    """
+    On-disk cache of the structure discovered when opening a file.
+
+    Parameters
+    ----------
+    directory : directory holding the cache entries, created if necessary.
+
+    maxentries : maximum number of entries. The least recently used entries
+                 are removed once the cache is full.
+
+    Notes
+    -----
+    Entries are keyed by the absolute path, size and modification time of the
+    file, so an entry is never used for a file which changed since it was cached.
+    Each entry is a small JSON file, written atomically, so the cache can be
+    shared by concurrent processes.
+    """
+
+    def __init__(self, directory, maxentries=1000):
+        if maxentries < 1:
+            raise CDMSError("Metadata cache size must be >= 1")
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.maxentries = maxentries
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def entrypath(self, path):
+        """
+        Get the path of the cache entry of a file, or None if the file cannot be stat'ed.
+
+        Parameters
+        ----------
+        path : file path
+        """
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = "%s\0%d\0%r" % (path, st.st_size, st.st_mtime)
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json'
+        return os.path.join(self.directory, name)
+
+    def get(self, path):
+        """
+        Get the cached metadata of a file, or None if not present.
+
+        Parameters
+        ----------
+        path : file path
+        """
+        entry = self.entrypath(path)
+        if entry is None:
+            return None
+        try:
+            with open(entry) as f:
+                value = json.load(f)
+            # Mark the entry as recently used
+            os.utime(entry, None)
+        except (IOError, OSError, ValueError):
+            return None
+        if value.get('version') != _version:
+            return None
+        return value
+
+    def put(self, path, value):
+        """
+        Cache the metadata of a file.
+
+        Parameters
+        ----------
+        path : file path
+
+        value : JSON-serializable dictionary
+        """
+        entry = self.entrypath(path)
+        if entry is None:
+            return
+        value = dict(value, version=_version)
+        fd, temppath = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(value, f)
+            os.replace(temppath, entry)
+        except BaseException:
+            if os.path.isfile(temppath):
+                os.unlink(temppath)
+            raise
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries beyond maxentries.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            entry = os.path.join(self.directory, name)
+            try:
+                entries.append((os.path.getmtime(entry), entry))
+            except OSError:
+                pass
+        entries.sort()
+        for mtime, entry in entries[:max(len(entries) - self.maxentries, 0)]:
+            try:
+                os.unlink(entry)
+            except OSError:
+                pass
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        for name in os.listdir(self.directory):
+            if name.endswith('.json') or name.endswith('.tmp'):
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+def setMetadataCache(directory, maxentries=1000):
+    """
+    Enable or disable the persistent metadata cache for files opened read-only.
+
+    Parameters
+    ----------
+    directory : directory of the cache, or None to disable the cache (the default).
+
+    maxentries : maximum number of cached files.
+
+    Returns
+    -------
+    No return value.
+    """
+    global _cache
+    if directory is None:
+        _cache = None
+    else:
+        _cache = MetadataCache(directory, maxentries)
+
+
+def getMetadataCache():
+    """
+    Get the persistent metadata cache.
+
+    Returns
+    -------
+    The MetadataCache object, or None if the cache is disabled.
+    """
+    return _cache
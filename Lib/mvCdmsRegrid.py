@@ -8,6 +8,7 @@ Cdms2 interface to multiple regridders
 """
 from __future__ import print_function
 import operator
+import os
 import re
 import numpy
 import cdms2
@@ -419,6 +420,11 @@ Parameters
 
          dstGridAreas
              array destination cell areas, only needed for conservative regridding
+
+         weightsFile
+             path of a weights file. If the file exists, the weights are read from it
+             (ESMF, or libcf which then applies them with NumPy), otherwise they are
+             computed and written to it (see writeWeights).
          **args
              additional, tool dependent arguments
     """
@@ -427,7 +433,7 @@ Parameters
                  regridMethod='linear', regridTool='libCF',
                  srcGridMask=None, srcGridAreas=None,
                  dstGridMask=None, dstGridAreas=None,
-                 **args):
+                 weightsFile=None, **args):
         """
 
         """
@@ -512,7 +518,38 @@ coordMin = %7.2f, boundMin = %7.2f, coordMax = %7.2f, boundMax = %7.2f
                                                dstBounds=dstBounds,
                                                dstGridAreas=dstGridAreas,
                                                **args)
-        self.regridObj.computeWeights(**args)
+        if weightsFile is not None and os.path.isfile(weightsFile):
+            try:
+                self.regridObj.readWeights(weightsFile)
+            except regrid2.RegridError:
+                # the weights do not fit the grids, compute them
+                self.regridObj.computeWeights(**args)
+        elif weightsFile is not None:
+            self.regridObj.computeWeights(**dict(args, factors=True))
+            self.writeWeights(weightsFile)
+        else:
+            self.regridObj.computeWeights(**args)
+
+    def writeWeights(self, path):
+        """
+        Write the weights to a SCRIP mapping file, which regrid2.readRegridder and
+        ESMF can read. With ESMF the weights must have been computed with factors=True.
+
+        Parameters
+        ----------
+
+             path
+                 path of the file
+        """
+        weights, srcAddress, dstAddress = self.regridObj.getWeights()
+        mapMethod = 'bilinear'
+        if re.search('conserv', self.regridMethod.lower()):
+            mapMethod = 'conservative'
+        elif re.search('patch', self.regridMethod.lower()):
+            mapMethod = 'patch'
+        regrid2.scrip.writeWeights(path, self.srcGrid, self.dstGrid,
+                                   weights, srcAddress, dstAddress,
+                                   mapMethod=mapMethod)
 
     def __call__(self, srcVar, **args):
         """
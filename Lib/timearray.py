@@ -0,0 +1,297 @@
+"""
+Array conversions between relative and component times
+"""
+import numpy
+import cdtime
+
+# Component times, as returned by reltocomp
+compTimeDtype = numpy.dtype([('year', numpy.int64),
+                             ('month', numpy.int32),
+                             ('day', numpy.int32),
+                             ('hour', numpy.int32),
+                             ('minute', numpy.int32),
+                             ('second', numpy.float64)])
+
+# Length in seconds of the relative time units with a fixed length
+_unitSeconds = {}
+for _names, _seconds in ((('seconds', 'second', 'secs', 'sec', 's'), 1.),
+                         (('minutes', 'minute', 'mins', 'min', 'mn'), 60.),
+                         (('hours', 'hour', 'hrs', 'hr', 'h'), 3600.),
+                         (('days', 'day', 'd'), 86400.),
+                         (('weeks', 'week', 'wks', 'wk'), 604800.)):
+    for _name in _names:
+        _unitSeconds[_name] = _seconds
+
+# Calendars handled by the array conversions, the others go through cdtime
+_calendarKinds = {
+    cdtime.StandardCalendar: 'standard',
+    cdtime.GregorianCalendar: 'standard',
+    cdtime.MixedCalendar: 'mixed',
+    cdtime.JulianCalendar: 'julian',
+    cdtime.NoLeapCalendar: 'noleap',
+    cdtime.Calendar360: '360',
+}
+
+# First day of each month in a year without leap day
+_monthStart = numpy.array([0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334])
+
+_baseCache = {}                         # (units, calendar): (day number, seconds) of the base time
+
+
+def _gregorianDays(year, month, day):
+    """Day number of proleptic Gregorian dates, 0 on 1970-01-01."""
+    year = year - (month <= 2)
+    era = numpy.floor_divide(year, 400)
+    yoe = year - era * 400
+    doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _gregorianDate(days):
+    """Proleptic Gregorian (year, month, day) of day numbers."""
+    days = days + 719468
+    era = numpy.floor_divide(days, 146097)
+    doe = days - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = numpy.where(mp < 10, mp + 3, mp - 9)
+    return yoe + era * 400 + (month <= 2), month, day
+
+
+def _julianDays(year, month, day):
+    """Day number of Julian dates, on the same scale as _gregorianDays."""
+    year = year - (month <= 2)
+    era = numpy.floor_divide(year, 4)
+    doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    return era * 1461 + (year - era * 4) * 365 + doy + _julianOffset
+
+
+def _julianDate(days):
+    """Julian (year, month, day) of day numbers."""
+    days = days - _julianOffset
+    era = numpy.floor_divide(days, 1461)
+    doe = days - era * 1461
+    yoe = numpy.minimum(doe // 365, 3)
+    doy = doe - 365 * yoe
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = numpy.where(mp < 10, mp + 3, mp - 9)
+    return yoe + era * 4 + (month <= 2), month, day
+
+
+# Julian 1582-10-05 and Gregorian 1582-10-15 are the same day
+_julianOffset = 0
+_julianOffset = int(_gregorianDays(1582, 10, 15) - _julianDays(1582, 10, 5))
+_reformDay = int(_gregorianDays(1582, 10, 15))
+
+
+def _dayNumber(year, month, day, kind):
+    """Day number of dates in a calendar."""
+    year = numpy.asarray(year, numpy.int64)
+    month = numpy.asarray(month, numpy.int64)
+    day = numpy.asarray(day, numpy.int64)
+    if kind == 'standard':
+        return _gregorianDays(year, month, day)
+    elif kind == 'julian':
+        return _julianDays(year, month, day)
+    elif kind == 'mixed':
+        gregorian = (year * 10000 + month * 100 + day) >= 15821015
+        return numpy.where(gregorian, _gregorianDays(year, month, day), _julianDays(year, month, day))
+    elif kind == 'noleap':
+        return year * 365 + _monthStart[month - 1] + day - 1
+    return year * 360 + (month - 1) * 30 + day - 1
+
+
+def _date(days, kind):
+    """(year, month, day) of day numbers in a calendar."""
+    if kind == 'standard':
+        return _gregorianDate(days)
+    elif kind == 'julian':
+        return _julianDate(days)
+    elif kind == 'mixed':
+        gregorian = (days >= _reformDay)
+        return tuple(numpy.where(gregorian, g, j) for g, j in zip(_gregorianDate(days), _julianDate(days)))
+    elif kind == 'noleap':
+        year = numpy.floor_divide(days, 365)
+        doy = days - year * 365
+        month = numpy.searchsorted(_monthStart, doy, side='right')
+        return year, month, doy - _monthStart[month - 1] + 1
+    year = numpy.floor_divide(days, 360)
+    doy = days - year * 360
+    return year, doy // 30 + 1, doy % 30 + 1
+
+
+def _parseUnits(units, calendar):
+    """
+    Parse relative time units.
+
+    Returns
+    -------
+    (seconds per unit, base day number, base seconds into the day), or None if
+    the units or the calendar are not handled by the array conversions.
+    """
+    kind = _calendarKinds.get(calendar)
+    if kind is None:
+        return None
+    sp = units.split('since')
+    if len(sp) != 2:
+        return None
+    seconds = _unitSeconds.get(sp[0].strip().lower())
+    if seconds is None:
+        # months and years do not have a fixed length
+        return None
+    key = (units, calendar)
+    base = _baseCache.get(key)
+    if base is None:
+        c = cdtime.reltime(0, units).tocomp(calendar)
+        base = (int(_dayNumber(c.year, c.month, c.day, kind)),
+                c.hour * 3600. + c.minute * 60. + c.second)
+        _baseCache[key] = base
+    return seconds, base[0], base[1]
+
+
+def reltocomp(values, units, calendar=cdtime.DefaultCalendar):
+    """
+    Array version of cdtime reltime(value, units).tocomp(calendar).
+
+    Parameters
+    ----------
+    values : array of relative times.
+
+    units : relative time units, e.g. "hours since 1850-1-1".
+
+    calendar : cdtime calendar.
+
+    Returns
+    -------
+    Structured array of dtype compTimeDtype, with fields year, month, day, hour, minute, second.
+
+    Notes
+    -----
+    Units in seconds, minutes, hours, days or weeks in the standard, gregorian,
+    julian, noleap and 360 day calendars are converted with array arithmetic.
+    Month and year units and the other calendars are converted by cdtime, element by element.
+    """
+    values = numpy.asarray(values, numpy.float64)
+    result = numpy.zeros(values.shape, compTimeDtype)
+    parsed = _parseUnits(units, calendar)
+    if parsed is None:
+        for index in numpy.ndindex(*values.shape):
+            c = cdtime.reltime(values[index], units).tocomp(calendar)
+            result[index] = (c.year, c.month, c.day, c.hour, c.minute, c.second)
+        return result
+
+    seconds, baseDay, baseSeconds = parsed
+    kind = _calendarKinds[calendar]
+    # seconds since the start of the base day, rounded to the microsecond
+    total = numpy.round((baseSeconds + values * seconds) * 1.e6) / 1.e6
+    days = numpy.floor(total / 86400.)
+    rest = total - days * 86400.
+    # guard against the rounding of total / 86400.
+    days = numpy.where(rest >= 86400., days + 1, numpy.where(rest < 0., days - 1, days))
+    rest = total - days * 86400.
+    year, month, day = _date(days.astype(numpy.int64) + baseDay, kind)
+    hour = (rest // 3600.).astype(numpy.int32)
+    rest = rest - hour * 3600.
+    minute = (rest // 60.).astype(numpy.int32)
+    result['year'] = year
+    result['month'] = month
+    result['day'] = day
+    result['hour'] = hour
+    result['minute'] = minute
+    result['second'] = rest - minute * 60.
+    return result
+
+
+def comptorel(comp, units, calendar=cdtime.DefaultCalendar):
+    """
+    Array version of cdtime comptime.torel(units, calendar).value.
+
+    Parameters
+    ----------
+    comp : structured array of component times, see reltocomp.
+
+    units : relative time units.
+
+    calendar : cdtime calendar.
+
+    Returns
+    -------
+    Array of relative times.
+    """
+    comp = numpy.asarray(comp, compTimeDtype)
+    parsed = _parseUnits(units, calendar)
+    if parsed is None:
+        result = numpy.zeros(comp.shape, numpy.float64)
+        for index in numpy.ndindex(*comp.shape):
+            c = comp[index]
+            result[index] = cdtime.comptime(int(c['year']), int(c['month']), int(c['day']), int(c['hour']),
+                                            int(c['minute']), float(c['second'])).torel(units, calendar).value
+        return result
+
+    seconds, baseDay, baseSeconds = parsed
+    kind = _calendarKinds[calendar]
+    days = _dayNumber(comp['year'], comp['month'], comp['day'], kind) - baseDay
+    total = days * 86400. + comp['hour'] * 3600. + comp['minute'] * 60. + comp['second'] - baseSeconds
+    return total / seconds
+
+
+def _offsetAndScale(units, newunits, calendar):
+    """
+    Get (offset, scale) such that values in units are values * scale + offset in newunits,
+    or None if units or newunits do not have a fixed length or the calendar is not handled.
+    """
+    parsed = _parseUnits(units, calendar)
+    newparsed = _parseUnits(newunits, calendar)
+    if parsed is None or newparsed is None:
+        return None
+    seconds, baseDay, baseSeconds = parsed
+    newseconds, newBaseDay, newBaseSeconds = newparsed
+    offset = ((baseDay - newBaseDay) * 86400. + baseSeconds - newBaseSeconds) / newseconds
+    return offset, seconds / newseconds
+
+
+def reltorel(values, units, newunits, calendar=cdtime.DefaultCalendar, newcalendar=None):
+    """
+    Array version of cdtime reltime(value, units).tocomp(calendar).torel(newunits, newcalendar).value.
+
+    Parameters
+    ----------
+    values : array of relative times.
+
+    units : relative time units of values.
+
+    newunits : relative time units of the result.
+
+    calendar : cdtime calendar of values.
+
+    newcalendar : cdtime calendar of the result, defaults to calendar.
+
+    Returns
+    -------
+    Array of relative times in newunits.
+
+    Notes
+    -----
+    Within one calendar, units of a fixed length are rebased with a single offset and scale.
+    Month and year units, or a change of calendar, go through component times.
+    """
+    if newcalendar is None:
+        newcalendar = calendar
+    if _calendarKinds.get(newcalendar, newcalendar) == _calendarKinds.get(calendar, calendar):
+        offsetAndScale = _offsetAndScale(units, newunits, calendar)
+        if offsetAndScale is not None:
+            offset, scale = offsetAndScale
+            return numpy.asarray(values, numpy.float64) * scale + offset
+    return comptorel(reltocomp(values, units, calendar), newunits, newcalendar)
+
+
+def tocomptimes(comp):
+    """
+    Get a list of cdtime component times from a structured array of component times.
+    """
+    return [cdtime.comptime(int(c['year']), int(c['month']), int(c['day']), int(c['hour']),
+                            int(c['minute']), float(c['second'])) for c in numpy.ravel(comp)]
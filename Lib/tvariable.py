@@ -68,6 +68,9 @@ def convertJSON(jsn):
 
 def fromJSON(jsn):
     """ Recreate a TV from a dumped jsn object from dumps()"""
+    if isinstance(jsn, (bytes, bytearray)) and jsn[:len(_binaryMagic)] == _binaryMagic:
+        # Pickled state from __getstate__
+        return loads_binary(jsn)
     try:
         jsn = zlib.decompress(jsn)
     except BaseException:
@@ -79,6 +82,125 @@ def fromJSON(jsn):
     return V
 
 
+_binaryMagic = b"CDMSTV\x01"          # Prefix and version of dumps_binary blobs
+_binaryAlign = 16                       # Alignment of the arrays in a blob
+
+
+def _bufferValue(value):
+    """Convert an attribute value to plain Python types, recursively, for buffer headers.
+
+    Other values are returned as is, so that json.dumps raises if it cannot encode them."""
+    if isinstance(value, numpy.ndarray):
+        value = value.tolist()
+    elif isinstance(value, numpy.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_bufferValue(v) for v in value]
+    elif isinstance(value, dict):
+        return {_bufferValue(k): _bufferValue(v) for k, v in value.items()}
+    return value
+
+
+def _toBuffer(ar):
+    """Raw bytes of an array, without a copy if the array is contiguous."""
+    ar = numpy.ascontiguousarray(ar)
+    return memoryview(ar.reshape(-1).view(numpy.uint8))
+
+
+def _fromBuffer(buf, dtype, shape):
+    """Array viewing the bytes of a buffer, copied only if the buffer is read-only."""
+    ar = numpy.frombuffer(buf, dtype=dtype).reshape(shape)
+    if not ar.flags.writeable:
+        ar = ar.copy()
+    return ar
+
+
+def toBuffers(tv):
+    """ Split a TV into a header of plain Python types and a list of raw buffers.
+
+    The buffers are the data, the mask if any, then the values and explicit
+    bounds of each axis. Contiguous arrays are not copied."""
+    data = numpy.ma.getdata(tv)
+    if data.dtype.hasobject:
+        raise CDMSError("Cannot convert an object array to buffers: " + str(tv.id))
+    mask = numpy.ma.getmask(tv)
+    buffers = [_toBuffer(data)]
+    if mask is not numpy.ma.nomask:
+        buffers.append(_toBuffer(mask))
+
+    axes = []
+    for a in tv.getAxisList():
+        values = numpy.ma.filled(a[:])
+        bounds = a.getExplicitBounds()
+        buffers.append(_toBuffer(values))
+        if bounds is not None:
+            bounds = numpy.asarray(bounds)
+            buffers.append(_toBuffer(bounds))
+        axes.append({'id': a.id,
+                     'dtype': values.dtype.str,
+                     'shape': list(values.shape),
+                     'bounds': None if bounds is None else [bounds.dtype.str, list(bounds.shape)],
+                     'attributes': {k: _bufferValue(v) for k, v in a.attributes.items()}})
+
+    attributes = {k: _bufferValue(v) for k, v in tv.attributes.items()
+                  if k not in ["autoApiInfo", "id"]}
+    header = {'id': tv.id,
+              'dtype': data.dtype.str,
+              'shape': list(data.shape),
+              'masked': mask is not numpy.ma.nomask,
+              'fill_value': _bufferValue(numpy.asarray(tv.fill_value)),
+              'attributes': attributes,
+              'axes': axes}
+    return header, buffers
+
+
+def fromBuffers(header, buffers):
+    """ Recreate a TV from the header and buffers of toBuffers()"""
+    buffers = list(buffers)
+    data = _fromBuffer(buffers.pop(0), header['dtype'], header['shape'])
+    if header['masked']:
+        mask = _fromBuffer(buffers.pop(0), numpy.uint8, header['shape']).view(numpy.ma.MaskType)
+    else:
+        mask = numpy.ma.nomask
+
+    axes = []
+    for ax in header['axes']:
+        values = _fromBuffer(buffers.pop(0), ax['dtype'], ax['shape'])
+        if ax['bounds'] is not None:
+            bounds = _fromBuffer(buffers.pop(0), ax['bounds'][0], ax['bounds'][1])
+        else:
+            bounds = None
+        axis = createAxis(values, bounds=bounds, id=ax['id'])
+        for k, v in ax['attributes'].items():
+            if k != 'id':
+                setattr(axis, k, v)
+        axes.append(axis)
+
+    return createVariable(data, mask=mask, axes=axes, id=header['id'],
+                          fill_value=header['fill_value'], attributes=header['attributes'], copy=0)
+
+
+def _binaryStart(nheader):
+    """Offset of the arrays in a dumps_binary blob with a JSON header of nheader bytes."""
+    start = len(_binaryMagic) + 8 + nheader
+    return start + (-start % _binaryAlign)
+
+
+def loads_binary(blob):
+    """ Recreate a TV from a blob made by dumps_binary()
+
+    The arrays of the TV share the memory of the blob if it is writable."""
+    blob = memoryview(blob)
+    nmagic = len(_binaryMagic)
+    if blob[:nmagic].tobytes() != _binaryMagic:
+        raise CDMSError("Not a binary TransientVariable")
+    nheader = int(numpy.frombuffer(blob[nmagic:nmagic + 8], dtype='<u8')[0])
+    header = json.loads(blob[nmagic + 8:nmagic + 8 + nheader].tobytes().decode("utf-8"))
+    start = _binaryStart(nheader)
+    buffers = [blob[start + offset:start + offset + length] for offset, length in header['_buffers']]
+    return fromBuffers(header, buffers)
+
+
 class TransientVariable(AbstractVariable, numpy.ma.MaskedArray):
     "An in-memory variable."
     variable_count = 0
@@ -291,23 +413,31 @@ class TransientVariable(AbstractVariable, numpy.ma.MaskedArray):
         purposes.
 
         """
-        myjson = self.dumps().encode("utf-8")
-        state = zlib.compress(myjson)
-        return(state)
-        # return(self.dumps().encode("utf-8"))
+        if numpy.ma.getdata(self).dtype.hasobject:
+            myjson = self.dumps().encode("utf-8")
+            return zlib.compress(myjson)
+        return self.dumps_binary()
 
     def __setstate__(self, state):
         """Restore the internal state of the tvariable, for
         pickling purposes.  ``state`` is typically the output of the
-        ``__getstate__`` output, and is a 5-tuple:
+        ``__getstate__`` output, and is either:
 
-        - json file from dumps()
+        - a blob from dumps_binary()
+        - zlib compressed json from dumps()
 
         """
-        state2 = zlib.decompress(state)
-        (D, axes, attrs) = convertJSON(state2)
-        newvar = createVariable(D["_values"], id=D["id"], typecode=D["_dtype"],
-                                mask=D["_msk"], axes=axes, fill_value=D["_fill_value"], attributes=attrs)
+        if bytes(state[:len(_binaryMagic)]) == _binaryMagic:
+            newvar = loads_binary(state)
+            msk = numpy.ma.getmaskarray(newvar)
+            fill_value = newvar.fill_value
+        else:
+            state2 = zlib.decompress(state)
+            (D, axes, attrs) = convertJSON(state2)
+            newvar = createVariable(D["_values"], id=D["id"], typecode=D["_dtype"],
+                                    mask=D["_msk"], axes=axes, fill_value=D["_fill_value"], attributes=attrs)
+            msk = D["_msk"]
+            fill_value = D["_fill_value"]
 
         #
         # Pickle has already create an empty variable by calling __new__()
@@ -315,7 +445,7 @@ class TransientVariable(AbstractVariable, numpy.ma.MaskedArray):
         #
         (_, shp, typ, isf, raw) = newvar.data.__reduce__()[2]
         state = (_, shp, typ, isf, raw,
-                 D["_msk"].tobytes('C'), D["_fill_value"])
+                 msk.tobytes('C'), fill_value)
         super(TransientVariable, self).__setstate__(state)
 
         self.__dict__.update(newvar.__dict__)
@@ -669,12 +799,35 @@ class TransientVariable(AbstractVariable, numpy.ma.MaskedArray):
         J["_axes"] = axes
         J["_values"] = self[:].filled(self.fill_value).tolist()
         J["_msk"] = list(numpy.ma.getmaskarray(self).tobytes('C'))
-        J["_mask"] = numpy.array(self._mask).tolist()
         J["_fill_value"] = float(self.fill_value)
         J["_dtype"] = self.typecode()
         J["_grid"] = None  # self.getGrid()
         return json.dumps(J, *args, **kargs)
 
+    def dumps_binary(self):
+        """ Dumps Variable to a binary blob (bytearray) holding data, mask, axes, bounds and attributes.
+
+        The blob is a JSON header followed by the raw arrays, see loads_binary."""
+        header, buffers = toBuffers(self)
+        offset = 0
+        layout = []
+        for buf in buffers:
+            offset += -offset % _binaryAlign
+            layout.append([offset, buf.nbytes])
+            offset += buf.nbytes
+        header['_buffers'] = layout
+        jheader = json.dumps(header).encode("utf-8")
+
+        nprefix = len(_binaryMagic) + 8
+        start = _binaryStart(len(jheader))
+        blob = bytearray(start + offset)
+        blob[:len(_binaryMagic)] = _binaryMagic
+        blob[len(_binaryMagic):nprefix] = numpy.array(len(jheader), dtype='<u8').tobytes()
+        blob[nprefix:nprefix + len(jheader)] = jheader
+        for (bufoffset, length), buf in zip(layout, buffers):
+            blob[start + bufoffset:start + bufoffset + length] = buf
+        return blob
+
     def isEncoded(self):
         "Transient variables are not encoded"
         return 0
@@ -8,6 +8,7 @@ import numpy
 from . import cdmsNode
 import cdtime
 import copy
+from concurrent.futures import ThreadPoolExecutor
 # import os
 import string
 # import sys
@@ -26,6 +27,47 @@ TooManyPartitions = "Variable has too many partitioned axes, max is two: "
 WriteNotImplemented = "Dataset write operation not implemented"
 FileClosed = "Cannot read from closed file or dataset, variable: "
 
+# Number of threads used to read the files of a partitioned dataset variable.
+# 1: read the files serially. The netCDF calls themselves stay serialized by
+# the Cdunif lock, only the Python-side work of the reads overlaps.
+_readWorkers = 1
+
+
+def setReadWorkers(n):
+    """Set the number of threads used to read multi-file (partitioned) dataset variables.
+
+    Parameters
+    ----------
+    n : number of threads reading the files, 1 (the default) reads the files serially.
+
+    Returns
+    -------
+    No return value.
+
+    Notes
+    -----
+    Cdunif is not thread-safe, so every file open and data read of the Cdunif module
+    goes through a single process-wide lock (Cdunif_lock). The reads of the threads
+    therefore still reach the file system one after another: there is no concurrent
+    I/O, and no speedup from a parallel file system. Only the Python-side work of each
+    read (slicing, masking, copying into the result) overlaps with the reads of the
+    other threads.
+    """
+    global _readWorkers
+    if not isinstance(n, int) or isinstance(n, bool) or n < 1:
+        raise CDMSError("Error number of read workers must be an integer >= 1")
+    _readWorkers = n
+
+
+def getReadWorkers():
+    """Get the number of threads used to read multi-file dataset variables.
+
+    Returns
+    -------
+    Number of read workers.
+    """
+    return _readWorkers
+
 
 def timeindex(value, units, basetime, delta, delunits, calendar):
     """ Calculate (t - basetime)/delu
@@ -507,6 +549,124 @@ class DatasetVariable(AbstractVariable):
 
         return result
 
+    def _chunkRegions(self, npart, idims, partitionSlices):
+        """Compute the shape of the result of expertSlice, and where each file chunk goes in it.
+
+        Parameters
+        ----------
+
+        npart, idims, partitionSlices : are as returned by expertPaths, with npart = 1 or 2.
+
+        Returns
+        -------
+        a 2-tuple (shape, chunks)
+
+        Where
+        shape : is the shape of the assembled result.
+        chunks : is the list of (filename, slicelist, region), region being the tuple of slices
+                 of the result which holds the data read from filename.
+
+        Note: This works because slicelist is the same length as the domain,
+        and var.getitem returns a chunk with singleton dimensions included.
+        """
+        if npart == 1:
+            filelists = [partitionSlices]
+            idims = (None,) + tuple(idims)
+        else:
+            filelists = partitionSlices
+        npart1, npart2 = idims
+
+        chunks = []
+        offset1 = 0
+        for filelist in filelists:
+            offset2 = 0
+            for filename, slicelist in filelist:
+                region = [slice(None)] * len(slicelist)
+                if npart1 is not None:
+                    len1 = lenSlice(slicelist[npart1])
+                    region[npart1] = slice(offset1, offset1 + len1)
+                len2 = lenSlice(slicelist[npart2])
+                region[npart2] = slice(offset2, offset2 + len2)
+                offset2 += len2
+                chunks.append((filename, slicelist, tuple(region)))
+            if npart1 is not None:
+                offset1 += lenSlice(filelist[0][1][npart1])
+
+        shape = list(map(lenSlice, filelists[0][0][1]))
+        shape[npart2] = offset2
+        if npart1 is not None:
+            shape[npart1] = offset1
+        return tuple(shape), chunks
+
+    def _readChunk(self, filename, slicelist, fci, result, region):
+        """Read the data for one (filename, slicelist) pair of expertPaths into result[region].
+
+        Parameters
+        ----------
+
+        filename : is the file path, or None if no file holds the data, in which case
+                   the region is masked.
+
+        slicelist : is the list of slices within the file.
+
+        fci : is the index of the forecast axis, or None.
+
+        result, region : are the preallocated output array, and the tuple of slices to fill.
+        """
+        # If the slice is missing, interpose missing data
+        if filename is None:
+            result[region] = numpy.ma.masked
+            return
+
+        # else read the data and close the file
+        f = self.parent.openFile(filename, 'r')
+        try:
+            var = f.variables[self.name_in_file]
+            if fci is None:
+                chunk = var.getitem(*tuple(slicelist))
+            else:
+                # If there's a forecast axis, the file doesn't know about it so
+                # don't use it in slicing data out of the file.
+                chunk = var.getitem(
+                    *tuple(slicelist[0:fci] + slicelist[fci + 1:]))
+                # But the chunk still needs an index in the forecast direction,
+                # which is simple to do because there is only one
+                # forecast per file:
+                chunk.resize(list(map(lenSlice, slicelist)))
+
+        finally:
+            f.close()
+        sh = chunk.shape
+        if 0 in sh:
+            raise CDMSError('Coordinates out of Domain')
+
+        result[region] = self._returnArray(chunk, 0)
+
+    def _readChunks(self, npart, idims, partitionSlices, fci):
+        """Read the files of a partitioned variable into a single preallocated array.
+
+        The files are read by a thread pool if setReadWorkers was called with n > 1. The
+        netCDF reads stay serialized by the Cdunif lock, see setReadWorkers.
+        """
+        shape, chunks = self._chunkRegions(npart, idims, partitionSlices)
+        result = numpy.ma.masked_array(numpy.empty(shape, self._numericType_),
+                                       mask=numpy.zeros(shape, numpy.bool_))
+
+        nworkers = min(_readWorkers, len(chunks))
+        if nworkers <= 1:
+            for filename, slicelist, region in chunks:
+                self._readChunk(filename, slicelist, fci, result, region)
+        else:
+            with ThreadPoolExecutor(max_workers=nworkers) as executor:
+                futures = [executor.submit(self._readChunk, filename, slicelist, fci, result, region)
+                           for filename, slicelist, region in chunks]
+                for future in futures:
+                    future.result()
+
+        # Match numpy.ma.concatenate, which returns nomask if nothing is masked
+        result.shrink_mask()
+        return result
+
     def expertSlice(self, initslist):
 
         # Handle negative slices
@@ -579,106 +739,10 @@ class DatasetVariable(AbstractVariable):
             if 0 in sh:
                 raise CDMSError(IndexError + 'Coordinates out of Domain')
 
-        # If one partitioned axes:
-        elif npart == 1:
-
-            npart1 = idims[0]
-            resultlist = []
-            for filename, slicelist in partitionSlices:
-
-                # If the slice is missing, interpose missing data
-                if filename is None:
-                    shapelist = list(map(lenSlice, slicelist))
-                    chunk = numpy.ma.zeros(
-                        tuple(shapelist), self._numericType_)
-                    chunk[...] = numpy.ma.masked
-
-                # else read the data and close the file
-                else:
-                    f = self.parent.openFile(filename, 'r')
-                    try:
-                        var = f.variables[self.name_in_file]
-                        if fci is None:
-                            chunk = var.getitem(*tuple(slicelist))
-                        else:
-                            # If there's a forecast axis, the file doesn't know about it so
-                            # don't use it in slicing data out of the file.
-                            chunk = var.getitem(
-                                *tuple(slicelist[0:fci] + slicelist[fci + 1:]))
-                            # But the chunk still needs an index in the forecast direction,
-                            # which is simple to do because there is only one
-                            # forecast per file:
-                            chunk.resize(list(map(lenSlice, slicelist)))
-
-                    finally:
-                        f.close()
-                    sh = chunk.shape
-                    if 0 in sh:
-                        raise CDMSError('Coordinates out of Domain')
-
-                resultlist.append(self._returnArray(chunk, 0))
-
-            # Combine the chunks into a single array
-            # Note: This works because slicelist is the same length
-            # as the domain, and var.getitem returns a chunk
-            # with singleton dimensions included. This means that
-            # npart1 corresponds to the correct dimension of chunk.
-            result = numpy.ma.concatenate(resultlist, axis=npart1)
-            for chunk in resultlist:
-                del(chunk)
-
-        # If two partitioned axes, 2-D version of previous case
-        if npart == 2:
-            npart1, npart2 = idims
-
-            resultlist = []
-            for filelist in partitionSlices:
-                chunklist = []
-                for filename, slicelist in filelist:
-
-                    # If the slice is missing, interpose missing data
-                    if filename is None:
-                        shapelist = list(map(lenSlice, slicelist))
-                        chunk = numpy.ma.zeros(
-                            tuple(shapelist), self._numericType_)
-                        chunk[...] = numpy.ma.masked
-
-                    # else read the data and close the file
-                    else:
-                        f = self.parent.openFile(filename, 'r')
-                        try:
-                            var = f.variables[self.name_in_file]
-                            if fci is None:
-                                chunk = var.getitem(*tuple(slicelist))
-                            else:
-                                # If there's a forecast axis, the file doesn't know about it so
-                                # don't use it in slicing data out of the file.
-                                chunk = var.getitem(
-                                    *tuple(slicelist[0:fci] + slicelist[fci + 1:]))
-                                # But the chunk still needs an index in the forecast direction,
-                                # which is simple to do because there is only
-                                # one forecast per file:
-                                chunk.resize(list(map(lenSlice, slicelist)))
-
-                        finally:
-                            f.close()
-                        sh = chunk.shape
-                        if 0 in sh:
-                            raise CDMSError('Coordinates out of Domain')
-                    chunklist.append(self._returnArray(chunk, 0))
-
-                # Note: This works because slicelist is the same length
-                # as the domain, and var.getitem returns a chunk
-                # with singleton dimensions included. This means that
-                # npart1 corresponds to the correct dimension of chunk.
-                bigchunk = numpy.ma.concatenate(chunklist, axis=npart2)
-                for chunk in chunklist:
-                    del(chunk)
-                resultlist.append(bigchunk)
-
-            result = numpy.ma.concatenate(resultlist, axis=npart1)
-            for bigchunk in resultlist:
-                del(bigchunk)
+        # If one or two partitioned axes, read each file directly into
+        # its slot of the result
+        else:
+            result = self._readChunks(npart, idims, partitionSlices, fci)
 
         # If slices with negative strides were input, apply the appropriate
         # reversals.
@@ -2,7 +2,7 @@
 """
 
 __all__ = ["horizontal", "pressure", "crossSection", "scrip",
-           "error", "mvGenericRegrid", ]
+           "error", "mvGenericRegrid", "stencil", ]
 
 from .error import RegridError  # noqa
 from .horizontal import Horizontal, Regridder  # noqa
@@ -10,6 +10,7 @@ from .pressure import PressureRegridder  # noqa
 from .crossSection import CrossSectionRegridder  # noqa
 from .scrip import ConservativeRegridder, BilinearRegridder, BicubicRegridder  # noqa
 from .scrip import DistwgtRegridder, readRegridder  # noqa
+from .stencil import StencilRegridder  # noqa
 from regrid2 import gsRegrid  # noqa
 from .mvGenericRegrid import GenericRegrid  # noqa
 from .mvLibCFRegrid import LibCFRegrid  # noqa
@@ -6,6 +6,7 @@ import copy
 # from . import _regrid
 import regrid2._regrid as _regrid
 from .error import RegridError
+from .pressure import LevelInterpolator
 
 
 class CrossSectionRegridder:
@@ -128,8 +129,9 @@ class CrossSectionRegridder:
         t = _regrid.maplength(self.nlati, self.nlato, bnin, bnout, bsin, bsout)
 
         self.latdx, self.latpt, self.wtlat = t
+        self._levelInterpolators = {}
 
-    def __call__(self, ar, missing=None, order=None, method="log"):
+    def __call__(self, ar, missing=None, order=None, method="log", vectorized=False):
         """
         Call the regridder function.
         ar is the input array.
@@ -137,6 +139,8 @@ class CrossSectionRegridder:
           defined for the input array, if any.
         order is of the form "tzyx", "tyx", etc.
         method is either 'log' to interpolate in the log of pressure, or 'linear' for linear interpolation.
+        vectorized, if true, interpolates the levels with NumPy along the level axis of ar
+          (see regrid2.pressure.LevelInterpolator).
         """
 
         from cdms2.avariable import AbstractVariable
@@ -212,7 +216,8 @@ class CrossSectionRegridder:
             logYes = 'yes'
         else:
             logYes = 'no'
-        outar = self.rgrd(ar, missing, 'greater', logYes, positionIn)
+        outar = self.rgrd(ar, missing, 'greater', logYes, positionIn,
+                          vectorized=vectorized)
 
         # Reconstruct the same class as on input
         # Mask fill_value and return results
@@ -227,7 +232,7 @@ class CrossSectionRegridder:
         return result
 
     def rgrd(self, dataIn, missingValueIn, missingMatch, logYes='yes',
-             positionIn=None, maskIn=None, missingValueOut=None):
+             positionIn=None, maskIn=None, missingValueOut=None, vectorized=False):
         """
         To perform all the tasks required to regrid the input data, dataIn, into the ouput data, dataout in
         the latitude-level plane.
@@ -296,6 +301,9 @@ class CrossSectionRegridder:
             * If left at the default entry, None, the code uses missingValueIn
             * If present or as a last resort 1.0e20
 
+        vectorized : if true, interpolate the levels with NumPy along the level axis, wherever it is in
+            dataIn. The bracketing indices and weights are computed once per regridder.
+
         Returns
         -------
         dataOut : the regridded data
@@ -472,6 +480,10 @@ class CrossSectionRegridder:
 
         #      ------------- call rgdpressure to regrid pressure  -------------
 
+        if vectorized:
+            interpolator = self.getLevelInterpolator(logYes)
+            return interpolator(aout, positionIn[1], missingValueIn, missingMatch)
+
         # allocate memory for ap -- the array with new number of levels and the
         # new number of latitudes
 
@@ -515,6 +527,25 @@ class CrossSectionRegridder:
 
         return ap
 
+    def getLevelInterpolator(self, logYes='yes'):
+        """
+        Get the LevelInterpolator from the input to the output levels.
+
+        Parameters
+        ----------
+        logYes : 'yes' to interpolate linearly in the log of the levels, anything else for linear in level.
+
+        Returns
+        -------
+        The LevelInterpolator, computed on the first call and reused afterwards.
+        """
+        logYes = (logYes == 'yes')
+        interpolator = self._levelInterpolators.get(logYes)
+        if interpolator is None:
+            interpolator = LevelInterpolator(self.levIn[:], self.levOut[:], logYes)
+            self._levelInterpolators[logYes] = interpolator
+        return interpolator
+
 
 def checkdimension(x, name):
     """
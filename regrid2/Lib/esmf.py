@@ -444,9 +444,13 @@ class EsmfStructField:
              staggerloc
                   ESMF.StaggerLoc.CENTER
                   ESMF.StaggerLoc.CORNER
+
+             ndbounds
+                  sizes of the ungridded dimensions, which follow the grid
+                  dimensions in the field data, or None
     """
 
-    def __init__(self, esmfGrid, name, datatype, staggerloc=CENTER):
+    def __init__(self, esmfGrid, name, datatype, staggerloc=CENTER, ndbounds=None):
         """
 
         """
@@ -487,7 +491,8 @@ class EsmfStructField:
             grid=esmfGrid.grid,
             name=name,
             typekind=etype,
-            staggerloc=staggerloc)
+            staggerloc=staggerloc,
+            ndbounds=ndbounds)
         vm = ESMF.ESMP_VMGetGlobal()
         self.pe, self.nprocs = ESMF.ESMP_VMGet(vm)
 
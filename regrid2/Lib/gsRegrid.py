@@ -18,8 +18,10 @@ import copy
 import numpy
 import warnings
 from regrid2 import RegridError
+from regrid2.stencil import StencilRegridder
 from functools import reduce
 import fnmatch
+from concurrent.futures import ThreadPoolExecutor
 
 C_DOUBLE_P = POINTER(c_double)
 
@@ -416,6 +418,16 @@ class Regrid:
         self.verbose = verbose
         self.weightsComputed = False
         self.maskSet = False
+        # index gather used by _extend, built on first use
+        self._extendIndex = None
+        # persistent data objects of applyBatch, by (dtype, missingValue)
+        self._dataObjects = {}
+        # stencils of all destination points, built by getStencils
+        self._stencils = None
+        # stencils on the extended source grid when computed by several workers
+        self._parallelStencils = None
+        # valid mask of the extended source grid, if set
+        self._validMask = None
 
         # Open the shaped library
         dynLibFound = False
@@ -458,6 +470,8 @@ class Regrid:
         if self.rank > 1:
             src_grid, src_dims = makeCurvilinear(src_grid)
             dst_grid, dst_dims = makeCurvilinear(dst_grid)
+            # source grid shape before any cyclic or cut extension
+            self.src_shape = tuple(src_dims)
 
         # Make sure coordinates wrap around if mkCyclic is True
         if mkCyclic:
@@ -583,6 +597,13 @@ class Regrid:
         """
         Destructor, will be called automatically
         """
+        for src_dataid, src_buffer, dst_dataid, dst_buffer in self._dataObjects.values():
+            status = self.lib.nccf_free_data(src_dataid)
+            catchError(status, sys._getframe().f_lineno)
+            status = self.lib.nccf_free_data(dst_dataid)
+            catchError(status, sys._getframe().f_lineno)
+        self._dataObjects = {}
+
         status = self.lib.nccf_free_regrid(self.regridid)
         catchError(status, sys._getframe().f_lineno)
 
@@ -635,6 +656,7 @@ class Regrid:
         status = self.lib.nccf_set_grid_validmask(self.src_gridid,
                                                   c_intmask)
         catchError(status, sys._getframe().f_lineno)
+        self._validMask = newMask
         self.maskSet = True
 
     def setMask(self, inDataOrMask):
@@ -669,7 +691,7 @@ class Regrid:
         # now calling our own mask setter
         self.setValidMask(mask)
 
-    def computeWeights(self, nitermax=100, tolpos=1.e-2):
+    def computeWeights(self, nitermax=100, tolpos=1.e-2, workers=1):
         """
         Compute the the interpolation weights
 
@@ -681,12 +703,68 @@ class Regrid:
 
            tolpos
               max tolerance when locating destination positions in index space
+
+           workers
+              number of threads locating the destination points. If greater
+              than 1, the destination grid is split into blocks of rows and
+              the stencils of the blocks are merged. The regridding is then
+              applied with NumPy (see getStencilRegridder).
         """
-        status = self.lib.nccf_compute_regrid_weights(self.regridid,
-                                                      nitermax,
-                                                      c_double(tolpos))
-        catchError(status, sys._getframe().f_lineno)
+        self._parallelStencils = None
+        if workers > 1 and self.dst_dims[0] > 1:
+            self._computeWeightsParallel(nitermax, tolpos, workers)
+        else:
+            status = self.lib.nccf_compute_regrid_weights(self.regridid,
+                                                          nitermax,
+                                                          c_double(tolpos))
+            catchError(status, sys._getframe().f_lineno)
         self.weightsComputed = True
+        self._stencils = None
+
+    def _computeWeightsParallel(self, nitermax, tolpos, workers):
+        """
+        Compute the interpolation weights by blocks of destination rows
+
+        Parameters
+        ----------
+
+           nitermax
+              max number of iterations
+
+           tolpos
+              max tolerance when locating destination positions in index space
+
+           workers
+              number of threads
+
+        Note:  each block is a Regrid object from the extended source grid to
+               a contiguous block of destination rows. The destination points
+               of a block are located in the same order as in a single run, so
+               that each search is warm started from the solution of the previous
+               point; only the first point of each block starts afresh. libcf objects
+               are created and queried in the calling thread, only the searches
+               run concurrently (ctypes releases the GIL during the calls).
+        """
+        rows = numpy.array_split(numpy.arange(self.dst_dims[0]),
+                                 min(workers, self.dst_dims[0]))
+        blocks = []
+        for row in rows:
+            dst_grid = [coord[row[0]:row[-1] + 1] for coord in self.dst_coords]
+            block = Regrid(list(self.src_coords), dst_grid, verbose=self.verbose)
+            if self._validMask is not None:
+                block.setValidMask(self._validMask)
+            blocks.append(block)
+
+        with ThreadPoolExecutor(max_workers=len(blocks)) as executor:
+            futures = [executor.submit(block.computeWeights, nitermax, tolpos)
+                       for block in blocks]
+            for future in futures:
+                future.result()
+
+        # the block stencils index the extended source grid
+        stencils = [block.getStencils() for block in blocks]
+        self._parallelStencils = tuple([numpy.concatenate([stencil[i] for stencil in stencils])
+                                        for i in range(3)])
 
     def apply(self, src_data_in, dst_data, missingValue=None):
         """
@@ -707,6 +785,8 @@ class Regrid:
         """
         if not self.weightsComputed:
             raise RegridError('Weights must be set before applying the regrid')
+        if self._parallelStencils is not None:
+            return self.getStencilRegridder()(src_data_in, dst_data, missingValue)
         # extend src data if grid was made cyclic and or had a cut accounted
         # for
         src_data = self._extend(src_data_in)
@@ -829,6 +909,134 @@ class Regrid:
         """
         self.apply(src_data, dst_data, missingValue)
 
+    def applyBatch(self, src_data, dst_data, missingValue=None):
+        """
+        Apply interpolation to a stack of source slices
+
+        Parameters
+        ----------
+
+           src_data
+               data on source grid, with any number of leading dimensions
+               in front of the source grid dimensions
+
+           dst_data
+               float32 or float64 data on destination grid, with the same
+               leading dimensions as src_data
+
+           missingValue
+               value that should be set for points falling outside
+               the src domain, pass None if these should not be touched.
+
+        Returns
+        -------
+
+           dst_data
+
+        Note:  the libcf data objects and their buffers are created on the first
+               call for a given data type and missing value, and reused by all the
+               slices of this and later calls. A Regrid object should therefore not
+               be applied from several threads at once.
+        """
+        if not self.weightsComputed:
+            raise RegridError('Weights must be set before applying the regrid')
+        if dst_data.dtype not in (numpy.float32, numpy.float64):
+            raise RegridError("ERROR in %s: invalid dst_data type = %s"
+                              % (__FILE__, dst_data.dtype))
+        src_data = numpy.asarray(src_data, dst_data.dtype)
+        dst_shape = tuple([d for d in self.dst_dims])
+        nextra = src_data.ndim - self.rank
+        if nextra < 0 or dst_data.shape[nextra:] != dst_shape or \
+                dst_data.shape[:nextra] != src_data.shape[:nextra]:
+            raise RegridError(("ERROR in %s: supplied dst_data have wrong shape " +
+                               "%s for src_data of shape %s") % (__FILE__, str(dst_data.shape),
+                                                                 str(src_data.shape)))
+
+        # the source slices are given on the grid before any extension
+        src_shape = tuple([d for d in self.src_dims])
+        if self.handleCut or self.extendedGrid:
+            src_shape = self.src_shape
+        if src_data.shape[nextra:] != src_shape:
+            raise RegridError(("ERROR in %s: supplied src_data have wrong shape " +
+                               "%s != %s") % (__FILE__, str(src_data.shape[nextra:]),
+                                              str(src_shape)))
+
+        if self._parallelStencils is not None:
+            return self.getStencilRegridder()(src_data, dst_data, missingValue)
+
+        src_dataid, src_buffer, dst_dataid, dst_buffer = \
+            self._getDataObjects(dst_data.dtype, missingValue)
+
+        for index in numpy.ndindex(*src_data.shape[:nextra]):
+            self._extend(src_data[index], out=src_buffer)
+            if missingValue is not None:
+                dst_buffer[...] = missingValue
+            else:
+                dst_buffer[...] = dst_data[index]
+            status = self.lib.nccf_apply_regrid(
+                self.regridid, src_dataid, dst_dataid)
+            catchError(status, sys._getframe().f_lineno)
+            dst_data[index] = dst_buffer
+
+        return dst_data
+
+    def _getDataObjects(self, dtype, missingValue):
+        """
+        Get the source and destination data objects of applyBatch, and the
+        buffers they point to
+
+        Parameters
+        ----------
+
+           dtype
+               numpy.float32 or numpy.float64
+
+           missingValue
+               fill value of the data, None for the libcf default
+
+        Returns
+        -------
+
+           src_dataid, src_buffer, dst_dataid, dst_buffer
+        """
+        key = (numpy.dtype(dtype).char, missingValue)
+        if key in self._dataObjects:
+            return self._dataObjects[key]
+
+        save = 0
+        standard_name = ""
+        units = ""
+        time_dimname = ""
+        if numpy.dtype(dtype) == numpy.float64:
+            fill_value = c_double(libCFConfig.NC_FILL_DOUBLE)
+            if missingValue is not None:
+                fill_value = c_double(missingValue)
+            c_type = c_double
+            set_data = self.lib.nccf_set_data_double
+        else:
+            fill_value = c_float(libCFConfig.NC_FILL_FLOAT)
+            if missingValue is not None:
+                fill_value = c_float(missingValue)
+            c_type = c_float
+            set_data = self.lib.nccf_set_data_float
+
+        objects = []
+        for gridid, name, dims in (self.src_gridid, "src_data", self.src_dims), \
+                                  (self.dst_gridid, "dst_data", self.dst_dims):
+            dataid = c_int(-1)
+            status = self.lib.nccf_def_data(gridid, name,
+                                            standard_name, units, time_dimname,
+                                            byref(dataid))
+            catchError(status, sys._getframe().f_lineno)
+            buffer = numpy.zeros(tuple([d for d in dims]), dtype)
+            status = set_data(dataid, buffer.ctypes.data_as(POINTER(c_type)),
+                              save, fill_value)
+            catchError(status, sys._getframe().f_lineno)
+            objects += [dataid, buffer]
+
+        self._dataObjects[key] = tuple(objects)
+        return self._dataObjects[key]
+
     def getNumValid(self):
         """
         Return the number of valid destination points. Destination points
@@ -841,6 +1049,8 @@ class Regrid:
 
              number of points
         """
+        if self._parallelStencils is not None:
+            return int(self._parallelStencils[2].sum())
         res = c_int(-1)
         status = self.lib.nccf_inq_regrid_nvalid(self.regridid,
                                                  byref(res))
@@ -856,6 +1066,8 @@ class Regrid:
 
              number of points
         """
+        if self._parallelStencils is not None:
+            return len(self._parallelStencils[2])
         res = c_int(-1)
         status = self.lib.nccf_inq_regrid_ntargets(self.regridid,
                                                    byref(res))
@@ -901,6 +1113,17 @@ class Regrid:
 
            [index sets on original grid, weights]
         """
+        if self._parallelStencils is not None:
+            extIndices, weights, valid = self._parallelStencils
+            dst_shape = tuple([d for d in self.dst_dims])
+            dstAddr = numpy.ravel_multi_index(tuple(dst_indices), dst_shape)
+            if not valid[dstAddr]:
+                raise RegridError("ERROR in %s: destination point %s was not located"
+                                  % (__FILE__, str(tuple(dst_indices))))
+            src_shape = tuple([d for d in self.src_dims])
+            ori_inds = [numpy.array(numpy.unravel_index(i, src_shape), numpy.int32)
+                        for i in extIndices[dstAddr]]
+            return ori_inds, weights[dstAddr].copy()
         dinds = numpy.array(dst_indices)
         sinds = (c_int * 2**self.rank)()
         weights = numpy.zeros((2**self.rank,), numpy.float64)
@@ -921,7 +1144,80 @@ class Regrid:
 
         return ori_inds, weights
 
-    def _extend(self, src_data):
+    def getStencils(self):
+        """
+        Get the indices and weights of all target locations at once
+
+        Returns
+        -------
+
+           indices, weights, valid
+               indices and weights are arrays of shape (number of destination
+               points, 2**rank). The indices are flat (C order) indices into the
+               source grid passed to the constructor, before any cyclic or cut
+               extension. valid is false for the destination points which could
+               not be located on the source grid, their weights are zero.
+
+        Note:  the stencils are queried from libcf once after computing the weights.
+        """
+        if not self.weightsComputed:
+            raise RegridError('Weights must be set before getting the stencils')
+        if self._stencils is not None:
+            return self._stencils
+
+        src_shape = tuple([d for d in self.src_dims])
+        if self.handleCut or self.extendedGrid:
+            src_shape = self.src_shape
+        dst_shape = tuple([d for d in self.dst_dims])
+        nstencil = 2**self.rank
+
+        # original flat index of each point of the extended source grid
+        srcIndex = self._extend(numpy.arange(numpy.prod(src_shape)).reshape(src_shape)).ravel()
+
+        if self._parallelStencils is not None:
+            extIndices, weights, valid = self._parallelStencils
+            self._stencils = (srcIndex[extIndices], weights, valid)
+            return self._stencils
+
+        ndst = int(numpy.prod(dst_shape))
+        indices = numpy.zeros((ndst, nstencil), numpy.int64)
+        weights = numpy.zeros((ndst, nstencil), numpy.float64)
+        valid = numpy.zeros((ndst,), bool)
+        dinds = numpy.zeros((self.rank,), numpy.int32)
+        dindsPtr = dinds.ctypes.data_as(POINTER(c_int))
+        sinds = (c_int * nstencil)()
+        for dstAddr, dstIndices in enumerate(numpy.ndindex(*dst_shape)):
+            dinds[:] = dstIndices
+            status = self.lib.nccf_inq_regrid_weights(self.regridid, dindsPtr, sinds,
+                                                      weights[dstAddr].ctypes.data_as(POINTER(c_double)))
+            if status != 0:
+                # destination point outside of the source domain
+                weights[dstAddr] = 0.
+                continue
+            indices[dstAddr] = srcIndex[list(sinds)]
+            valid[dstAddr] = True
+
+        self._stencils = (indices, weights, valid)
+        return self._stencils
+
+    def getStencilRegridder(self):
+        """
+        Get a regridder applying the stencils with NumPy only
+
+        Returns
+        -------
+
+           regrid2.stencil.StencilRegridder, taking data on the source grid
+           passed to the constructor
+        """
+        indices, weights, valid = self.getStencils()
+        src_shape = tuple([d for d in self.src_dims])
+        if self.handleCut or self.extendedGrid:
+            src_shape = self.src_shape
+        return StencilRegridder(indices, weights, src_shape,
+                                tuple([d for d in self.dst_dims]), valid)
+
+    def _extend(self, src_data, out=None):
         """
         Extend the data by padding a column and a row, depending on whether the
         grid was made cyclic and a fold was added or not
@@ -931,36 +1227,59 @@ class Regrid:
         src_data :
             input source data
 
+        out :
+            optional array receiving the extended data
+
         Returns
         -------
             extended source data (or source input data of no padding was applied)
         """
 
-        # nlatX, nlonX = self.src_dims[-2], self.src_dims[-1]
-        # original dimensions, before extension
+        # no cut and no cyclic extension
+        if not (self.handleCut or self.extendedGrid):
+            if out is None:
+                return src_data
+            out[...] = src_data
+            return out
+
+        if self._extendIndex is None:
+            self._extendIndex = self._getExtendIndex()
+
+        # gather the extended grid from the flattened lat, lon dimensions
         # assuming ..., lat, lon ordering
+        src_data = numpy.asarray(src_data)
         nlat, nlon = src_data.shape[-2:]
+        src_flat = src_data.reshape(src_data.shape[:-2] + (nlat * nlon,))
+        return numpy.take(src_flat, self._extendIndex, axis=-1, out=out)
 
-        # no cut and no cyclic extension
-        src_dataNew = src_data
+    def _getExtendIndex(self):
+        """
+        Get the flat (lat, lon) index of the original source grid for each
+        (lat, lon) point of the extended source grid
 
-        if self.handleCut or self.extendedGrid:
-            # copy data into new, extended container
-            src_dataNew = numpy.zeros(self.src_dims, src_data.dtype)
-            # start filling in...
-            src_dataNew[..., :nlat, :nlon] = src_data[...]
+        Returns
+        -------
+            integer array of the shape of the last two extended source dimensions
+        """
+        # original dimensions, before extension
+        nlat, nlon = self.src_shape[-2:]
+        index = numpy.arange(nlat * nlon).reshape((nlat, nlon))
+
+        indexNew = numpy.zeros((self.src_dims[self.rank - 2],
+                                self.src_dims[self.rank - 1]), index.dtype)
+        indexNew[:nlat, :nlon] = index
 
         if self.handleCut:
             # fill in polar cut (e.g. tripolar cut), top row
             # self.dst_Index[i] knows how to fold
-            for i in range(nlon):
-                src_dataNew[..., -1, i] = src_data[..., -2, self.dst_Index[i]]
+            dst_Index = numpy.asarray(self.dst_Index)[:nlon]
+            indexNew[-1, :nlon] = index[-2, dst_Index]
 
         if self.extendedGrid:
             # make data periodic in longitudes
-            src_dataNew[..., -1] = src_dataNew[..., 0]
+            indexNew[:, -1] = indexNew[:, 0]
 
-        return src_dataNew
+        return indexNew
 
     def _findIndices(self, targetPos, nitermax, tolpos,
                      dindicesGuess):
@@ -1,7 +1,9 @@
 # Automatically adapted for numpy.oldnumeric Aug 02, 2007 by
 
+import os
 import numpy
 import copy
+from concurrent.futures import ThreadPoolExecutor
 # from . import _regrid
 import regrid2._regrid as _regrid
 from .error import RegridError
@@ -30,7 +32,7 @@ def extractBounds(bounds):
 
 class Horizontal:
 
-    def __init__(self, ingrid, outgrid):
+    def __init__(self, ingrid, outgrid, weightsFile=None):
         """
         Constructor for regridding class
 
@@ -42,6 +44,10 @@ class Horizontal:
 
              outgrid cdms2,
                  ndarray variable
+
+             weightsFile
+                 path of a weights file. If the file exists the weights are read from it,
+                 otherwise they are computed and written to it (see writeWeights).
         """
 
         inlat = ingrid.getLatitude()
@@ -65,6 +71,9 @@ class Horizontal:
             self.outmask = 1. - self.outmask
         self.inshape = ingrid.shape
         self.inorder = ingrid.getOrder()
+        self.outorder = outgrid.getOrder()
+        self.ingrid = ingrid
+        self.outgrid = outgrid
         self.outlat = outgrid.getLatitude().clone()
         self.outlon = outgrid.getLongitude().clone()
 
@@ -85,11 +94,119 @@ class Horizontal:
             print(("bwout = ", numpy.array2string(bwout, precision=3)))
             print(("beout = ", numpy.array2string(beout, precision=3)))
 
-        self.londx, self.lonpt, self.wtlon, self.latdx, self.latpt, self.wtlat = _regrid.maparea(
-            self.nloni, self.nlono, self.nlati, self.nlato, bnin, bnout, bsin, bsout, bein, beout, bwin, bwout)
+        if weightsFile is not None and os.path.isfile(weightsFile):
+            self.readWeights(weightsFile)
+        else:
+            self.londx, self.lonpt, self.wtlon, self.latdx, self.latpt, self.wtlat = _regrid.maparea(
+                self.nloni, self.nlono, self.nlati, self.nlato, bnin, bnout, bsin, bsout, bein, beout, bwin, bwout)
+            if weightsFile is not None:
+                self.writeWeights(weightsFile)
+
+    def getWeights(self):
+        """
+        Get the weights as a sparse matrix.
+
+        Returns
+        -------
+
+        (weights, sourceAddress, destAddress, destFrac) where sourceAddress and destAddress
+        are the 0-based flat cell indices of each link in the input and output grids, and
+        destFrac is the fraction of each output cell which overlaps valid input cells.
+        The weights of each output cell add up to 1, as in the 2-D mask case of __call__.
+        """
+        def links(dx):
+            # output index of each entry of the pt/wt tables, dx holds the
+            # index of the last entry of each output cell
+            counts = numpy.diff(numpy.concatenate(([-1], dx)))
+            return numpy.repeat(numpy.arange(len(dx)), counts)
+
+        lonout = links(self.londx)
+        latout = links(self.latdx)
+        nlonlinks = len(lonout)
+        nlatlinks = len(latout)
+        lonin = numpy.asarray(self.lonpt[:nlonlinks], numpy.int64)
+        latin = numpy.asarray(self.latpt[:nlatlinks], numpy.int64)
+
+        # every (latitude, longitude) pair of entries is a link
+        weights = numpy.outer(numpy.asarray(self.wtlat[:nlatlinks], numpy.float64),
+                              numpy.asarray(self.wtlon[:nlonlinks], numpy.float64))
+        latout, lonout = numpy.meshgrid(latout, lonout, indexing='ij')
+        latin, lonin = numpy.meshgrid(latin, lonin, indexing='ij')
+
+        def address(ilat, ilon, order, nlat, nlon):
+            if order == 'xy':
+                return (ilon * nlat + ilat).ravel()
+            return (ilat * nlon + ilon).ravel()
+
+        src = address(latin, lonin, self.inorder, self.nlati, self.nloni)
+        dst = address(latout, lonout, self.outorder, self.nlato, self.nlono)
+        weights = weights.ravel()
+        nout = self.nlato * self.nlono
+        total = numpy.bincount(dst, weights, minlength=nout)
+
+        if self.inmask is not None:
+            weights = weights * numpy.ravel(self.inmask)[src]
+        keep = weights > 0.
+        weights, src, dst = weights[keep], src[keep], dst[keep]
+        valid = numpy.bincount(dst, weights, minlength=nout)
+        weights /= valid[dst]
+        destFrac = numpy.where(total > 0., valid / numpy.where(total > 0., total, 1.), 0.)
+        return weights, src, dst, destFrac
+
+    def writeWeights(self, path):
+        """
+        Write the weights to a SCRIP mapping file, which regrid2.readRegridder can read as a
+        conservative regridder. The area tables computed by the constructor are saved too,
+        so that a Horizontal regridder can be rebuilt from the file without recomputing them.
+
+        Parameters
+        ----------
+
+        path : path of the file
+        """
+        from .scrip import writeWeights
+
+        weights, src, dst, destFrac = self.getWeights()
+        extra = {}
+        for name, table, dimname in (('londx', self.londx, 'nlono'), ('lonpt', self.lonpt, 'nlonlinks'),
+                                     ('wtlon', self.wtlon, 'nlonlinks'), ('latdx', self.latdx, 'nlato'),
+                                     ('latpt', self.latpt, 'nlatlinks'), ('wtlat', self.wtlat, 'nlatlinks')):
+            extra[name] = (table, (dimname,), 'f' if name[:2] == 'wt' else 'i')
+        writeWeights(path, self.ingrid, self.outgrid, weights, src, dst,
+                     mapMethod="conservative", destFrac=destFrac, extra=extra)
+
+    def readWeights(self, path):
+        """
+        Read the weights written by writeWeights, in place of computing them.
+
+        Parameters
+        ----------
+
+        path : path of the file
+        """
+        import Cdunif
+
+        f = Cdunif.CdunifFile(path, 'r')
+        try:
+            if 'londx' not in f.variables:
+                raise RegridError('%s does not contain Horizontal regridder weights' % path)
+            tables = {}
+            for name in 'londx', 'lonpt', 'wtlon', 'latdx', 'latpt', 'wtlat':
+                dtype = numpy.float32 if name[:2] == 'wt' else numpy.intc
+                tables[name] = numpy.ascontiguousarray(f.variables[name][:], dtype)
+            srcdims = tuple(f.variables['src_grid_dims'][:])
+            dstdims = tuple(f.variables['dst_grid_dims'][:])
+        finally:
+            f.close()
+        if len(tables['londx']) != self.nlono or len(tables['latdx']) != self.nlato or \
+                sorted(srcdims) != sorted((self.nlati, self.nloni)) or \
+                sorted(dstdims) != sorted((self.nlato, self.nlono)):
+            raise RegridError('Weights in %s do not match the grids' % path)
+        self.londx, self.lonpt, self.wtlon = tables['londx'], tables['lonpt'], tables['wtlon']
+        self.latdx, self.latpt, self.wtlat = tables['latdx'], tables['latpt'], tables['wtlat']
 
     def __call__(self, ar, missing=None, order=None,
-                 mask=None, returnTuple=0, **args):
+                 mask=None, returnTuple=0, workers=1, **args):
         """
         Call the regridder function.
 
@@ -112,6 +229,10 @@ class Horizontal:
             If true, return the tuple (outArray, outWeights) where outWeights is
             the fraction of each zone of the output grid which overlaps non-missing
             zones of the input grid; it has the same shape as the output array.
+
+        workers :
+            number of threads regridding blocks of the slowest varying time or level
+            dimension concurrently. The result is identical to the serial one.
         """
 
         from cdms2.avariable import AbstractVariable
@@ -305,28 +426,8 @@ class Horizontal:
         # Perform the regridding. The return array has the same shape
         # as the output array, and is the fraction of the zone which overlaps
         # a non-masked zone of the input grid.
-        amskout = _regrid.rgdarea(
-            ilon,
-            ilat,
-            itim1,
-            itim2,
-            ntim1,
-            ntim2,
-            nloni,
-            self.nlono,
-            nlati,
-            self.nlato,
-            flag2D,
-            missing,
-            self.londx,
-            self.lonpt,
-            self.wtlon,
-            self.latdx,
-            self.latpt,
-            self.wtlat,
-            inmask,
-            ar,
-            outar)
+        amskout = self._rgdarea(ilon, ilat, itim1, itim2, ntim1, ntim2, nloni, nlati,
+                                flag2D, missing, inmask, ar, outar, workers)
 
         # Correct the shape of output weights
         amskout.shape = outar.shape
@@ -366,15 +467,47 @@ class Horizontal:
         else:
             return result, amskout
 
+    def _rgdarea(self, ilon, ilat, itim1, itim2, ntim1, ntim2, nloni, nlati,
+                 flag2D, missing, inmask, ar, outar, workers):
+        """
+        Call _regrid.rgdarea, on blocks of the first (slowest varying) dimension
+        in a thread pool if workers > 1 and that dimension is a time or level one.
+        Each time and level is regridded independently, so the blocks give the same
+        result as a single call.
+        """
+        rank = len(ar.shape)
+        lead = rank - 1                 # dimension index of the first numpy axis
+        nblocks = min(workers, ar.shape[0])
+        splittable = (lead == itim1 and ntim1 > 0) or (lead == itim2 and ntim2 > 0)
+        if nblocks <= 1 or not splittable or not ar.flags.c_contiguous:
+            return _regrid.rgdarea(ilon, ilat, itim1, itim2, ntim1, ntim2, nloni, self.nlono,
+                                   nlati, self.nlato, flag2D, missing, self.londx, self.lonpt,
+                                   self.wtlon, self.latdx, self.latpt, self.wtlat, inmask, ar, outar)
+
+        def block(bounds):
+            lo, hi = bounds
+            n1 = hi - lo if lead == itim1 else ntim1
+            n2 = hi - lo if lead == itim2 else ntim2
+            blockmask = inmask if flag2D else inmask[lo:hi]
+            return _regrid.rgdarea(ilon, ilat, itim1, itim2, n1, n2, nloni, self.nlono,
+                                   nlati, self.nlato, flag2D, missing, self.londx, self.lonpt,
+                                   self.wtlon, self.latdx, self.latpt, self.wtlat,
+                                   blockmask, ar[lo:hi], outar[lo:hi])
+
+        edges = [(i * ar.shape[0]) // nblocks for i in range(nblocks + 1)]
+        with ThreadPoolExecutor(nblocks) as pool:
+            pieces = list(pool.map(block, zip(edges[:-1], edges[1:])))
+        return numpy.concatenate([numpy.ravel(piece) for piece in pieces])
+
 
 class Regridder(Horizontal):
-    def __init__(self, ingrid, outgrid):
+    def __init__(self, ingrid, outgrid, weightsFile=None):
         warnings.warn(
             "While this will work for now, please note that the Regridder class has been " +
             "renamed Horizontal, the name 'Regridder' will be deprecated in future version. " +
             "Please edit your code accordingly",
             Warning)
-        Horizontal.__init__(self, ingrid, outgrid)
+        Horizontal.__init__(self, ingrid, outgrid, weightsFile)
 
 
 def input_mask(ain, type, mask, missing=None):
@@ -222,6 +222,9 @@ dimensions. len(srcGridshape) = %d != len(dstGridshape) = %d""" % \
         self.srcFracField.field.data[:] = 1.0
         self.dstFracField.field.data[:] = 1.0
 
+        # (number of slices, src field, dst field) of the last applyBatch
+        self.batchFields = None
+
     def setCoords(self, srcGrid, dstGrid,
                   srcGridMask=None, srcBounds=None, srcGridAreas=None,
                   dstGridMask=None, dstBounds=None, dstGridAreas=None,
@@ -307,7 +310,7 @@ staggerLoc = %s!""" % self.staggerLoc
         Parameters
         ----------
 
-        args : (not used)
+        args : factors=True keeps the weights, for getWeights
 
         """
         self.regridObj = ESMF.Regrid(srcfield=self.srcFld.field,
@@ -316,7 +319,41 @@ staggerLoc = %s!""" % self.staggerLoc
                                      dst_mask_values=self.dstMaskValues,
                                      regrid_method=self.regridMethod,
                                      unmapped_action=self.unMappedAction,
-                                     ignore_degenerate=True)
+                                     ignore_degenerate=True,
+                                     factors=bool(args.get('factors', False)))
+        self.factors = bool(args.get('factors', False))
+
+    def getWeights(self):
+        """
+        Get the weights as a sparse matrix. The weights must have been computed
+        with factors=True.
+
+        Returns
+        -------
+
+        (weights, srcAddress, dstAddress), the 0-based flat source and destination
+        indices (C order) of each link
+        """
+        if not getattr(self, 'factors', False):
+            raise RegridError("ESMFRegrid.getWeights: the weights were not computed with factors=True")
+        # ESMF grids are transposed, so the sequence indices of ESMF are the
+        # 1-based C order indices of our arrays
+        wd = self.regridObj.get_weights_dict(deep_copy=True)
+        return (numpy.asarray(wd['weights'], numpy.float64),
+                numpy.asarray(wd['col_src'], numpy.int64) - 1,
+                numpy.asarray(wd['row_dst'], numpy.int64) - 1)
+
+    def readWeights(self, path):
+        """
+        Build the regrid object from a weights file in place of computing the weights
+
+        Parameters
+        ----------
+
+        path : SCRIP or ESMF weights file
+        """
+        self.regridObj = ESMF.RegridFromFile(self.srcFld.field, self.dstFld.field, path)
+        self.factors = False
 
     def apply(self, srcData, dstData, rootPe, globalIndexing=False, **args):
         """
@@ -389,6 +426,71 @@ staggerLoc = %s!""" % self.staggerLoc
             else:
                 dstData[:] = tmp
 
+    def applyBatch(self, srcData, dstData, rootPe, globalIndexing=False, **args):
+        """
+        Regrid a stack of source slices to destination in one ESMF call.
+
+        The slices are carried by fields with an ungridded dimension and the
+        route handle of computeWeights is applied to all of them at once.
+        The fields are kept for the next call with the same number of slices.
+
+        Parameters
+        ----------
+
+        srcData : array source data, with leading dimensions in front of the
+                  source grid dimensions
+
+        dstData : array destination data, with the same leading dimensions
+
+        rootPe : if other than None, then data will be MPI gathered on the specified rootPe processor
+
+        globalIndexing : see apply
+
+        args
+
+        Note
+        ----
+        When running on several processors, the slices are regridded one by one with apply.
+        """
+        nGridDims = len(self.srcGridShape)
+        leadShape = srcData.shape[:-nGridDims]
+        if self.nprocs > 1:
+            for index in numpy.ndindex(*leadShape):
+                self.apply(srcData[index], dstData[index], rootPe=rootPe,
+                           globalIndexing=globalIndexing, **args)
+            return
+
+        zero_region = ESMF.Region.SELECT
+        if 'zero_region' in args.keys():
+            zero_region = args.get('zero_region')
+
+        nslices = int(numpy.prod(leadShape))
+        if self.batchFields is None or self.batchFields[0] != nslices:
+            srcFld = esmf.EsmfStructField(self.srcGrid, 'srcFldBatch',
+                                          datatype=self.dtype,
+                                          staggerloc=self.staggerloc,
+                                          ndbounds=[nslices])
+            dstFld = esmf.EsmfStructField(self.dstGrid, 'dstFldBatch',
+                                          datatype=self.dtype,
+                                          staggerloc=self.staggerloc,
+                                          ndbounds=[nslices])
+            if self.batchFields is not None:
+                self.batchFields[1].field.destroy()
+                self.batchFields[2].field.destroy()
+            self.batchFields = (nslices, srcFld, dstFld)
+        nslices, srcFld, dstFld = self.batchFields
+
+        # ESMF data are transposed, with the ungridded dimension last
+        srcFld.field.data[...] = srcData.reshape((nslices,) + srcData.shape[-nGridDims:]).T
+        dstFld.field.data[...] = dstData.reshape((nslices,) + dstData.shape[-nGridDims:]).T
+
+        self.regridObj(
+            srcFld.field,
+            dstFld.field,
+            zero_region=zero_region)
+
+        dstData[...] = dstFld.field.data.T.reshape(dstData.shape)
+
     def getDstGrid(self):
         """
         Get the destination grid on this processor
@@ -188,9 +188,33 @@ valid choices are: 'libcf', 'esmf'""" % regridTool
         """
         self.tool.computeWeights(**args)
 
+    def getWeights(self):
+        """
+        Get the weights as a sparse matrix
+
+        Returns
+        -------
+
+        (weights, srcAddress, dstAddress), the 0-based flat source and destination
+        indices (C order) of each link
+        """
+        return self.tool.getWeights()
+
+    def readWeights(self, path):
+        """
+        Read the weights from a SCRIP file in place of computing them
+
+        Parameters
+        ----------
+
+        path : weights file
+        """
+        self.tool.readWeights(path)
+
     def apply(self, srcData, dstData,
               rootPe=None,
               missingValue=None,
+              batch=False,
               **args):
         """
         Regrid source to destination
@@ -206,6 +230,10 @@ valid choices are: 'libcf', 'esmf'""" % regridTool
 
         missingValue : if not None, then data mask will be interpolated
                        and data value set to missingValue when masked
+
+        batch : if True and the tool supports it (ESMF), the slices along the
+                non horizontal axes are regridded in a single call, reusing
+                the weights of the horizontal grid
         """
 
         # assuming the axes are the slowly varying indices
@@ -269,6 +297,10 @@ valid choices are: 'libcf', 'esmf'""" % regridTool
                                           str(nonHorizShape))
                 raise regrid2.RegridError(msg)
 
+            if batch and hasattr(self.tool, 'applyBatch'):
+                self._applyBatch(srcData, dstData, rootPe, missingValue, **args)
+                return
+
             #
             # iterate over all axes
             #
@@ -334,6 +366,44 @@ valid choices are: 'libcf', 'esmf'""" % regridTool
                 # fill in dstData
                 exec('dstData' + slce + ' = outdata')
 
+    def _applyBatch(self, srcData, dstData, rootPe, missingValue, **args):
+        """
+        Regrid all the slices along the non horizontal axes with one call
+        to the tool, for the data and for the mask
+
+        Parameters
+        ----------
+
+        srcData : array (input)
+
+        dstData : array (output)
+
+        rootPe : if other than None, then results will be MPI gathered
+
+        missingValue : if not None, then data mask will be interpolated
+                       and data value set to missingValue when masked
+        """
+        if missingValue is not None:
+            # interpolate the mask of every slice
+            srcDataMaskFloat = numpy.array(srcData == missingValue, srcData.dtype)
+            dstDataMaskFloat = numpy.zeros(dstData.shape, dstData.dtype)
+            self.tool.applyBatch(srcDataMaskFloat, dstDataMaskFloat,
+                                 rootPe=rootPe, globalIndexing=True, **args)
+            if re.search('conserv', self.regridMethod.lower(), re.I):
+                # cell interpolation
+                dstMask = (dstDataMaskFloat > 1 - EPS)
+            else:
+                # nodal interpolation
+                dstMask = (dstDataMaskFloat > 0)
+
+        # interpolate the data
+        self.tool.applyBatch(srcData, dstData, rootPe=rootPe,
+                             globalIndexing=True, **args)
+
+        if missingValue is not None:
+            # apply missing value contribution
+            dstData[dstMask] = missingValue
+
     def getDstGrid(self):
         """
         Return the destination grid, may be different from the dst grid provided
@@ -9,8 +9,11 @@ LibCF regridding class
 
 """
 
+import numpy
 from regrid2 import gsRegrid
 from regrid2 import GenericRegrid
+from regrid2 import RegridError
+from regrid2 import StencilRegridder
 
 
 class LibCFRegrid(GenericRegrid):
@@ -46,6 +49,10 @@ class LibCFRegrid(GenericRegrid):
                                          handleCut=self.handleCut)
         if srcGridMask is not None:
             self.regridObj.setMask(srcGridMask)
+        self.srcShape = tuple(srcGrid[0].shape)
+        self.dstShape = tuple(dstGrid[0].shape)
+        # set by readWeights, applies the weights read from a file
+        self.stencilRegridder = None
 
         # min resolution, required in order to set the tolerance (tolpos)
         self.delta = float('inf')
@@ -62,12 +69,68 @@ class LibCFRegrid(GenericRegrid):
         Parameters
         ----------
 
-             **args arguments to be passed to gsRegrid, e.g. nitermax, tolpos, ...
+             **args arguments to be passed to gsRegrid, e.g. nitermax, tolpos, workers, ...
         """
         nitermax = args.get('nitermax', 20)
         # make tolpos relative to the min cell size
         tolpos = args.get('tolpos', 0.01) * self.delta
-        self.regridObj.computeWeights(nitermax=nitermax, tolpos=tolpos)
+        workers = args.get('workers', 1)
+        self.regridObj.computeWeights(nitermax=nitermax, tolpos=tolpos, workers=workers)
+        self.stencilRegridder = None
+
+    def getWeights(self):
+        """
+        Get the interpolation weights as a sparse matrix
+
+        Returns
+        -------
+            (weights, srcAddress, dstAddress), the 0-based flat source and destination
+            indices (C order) of each link. Source indices refer to the grid passed to
+            the constructor, before any cyclic or cut extension.
+        """
+        if self.stencilRegridder is not None:
+            indices, weights = self.stencilRegridder.indices, self.stencilRegridder.weights
+        else:
+            indices, weights, valid = self.regridObj.getStencils()
+        dstAddress = numpy.repeat(numpy.arange(len(indices), dtype=numpy.int64), indices.shape[1])
+        links = (weights.ravel() != 0.)
+        return weights.ravel()[links], indices.ravel()[links], dstAddress[links]
+
+    def readWeights(self, path):
+        """
+        Read the weights from a SCRIP file, e.g. written by cdms2.CdmsRegrid.writeWeights,
+        in place of computing them. The weights are then applied with NumPy (see
+        regrid2.StencilRegridder), libcf is not involved.
+
+        Parameters
+        ----------
+
+        path : path of the file
+        """
+        from regrid2.scrip import readRegridder
+
+        nsrc = int(numpy.prod(self.srcShape))
+        ndst = int(numpy.prod(self.dstShape))
+        regridf = readRegridder(path, checkGrid=0)
+        if regridf.getOutputGrid().size() != ndst:
+            raise RegridError("LibCFRegrid: weights in %s do not match the grids" % path)
+        remap = regridf.getSparseRemap(nsrc)
+        if len(remap.indices) and remap.indices.max() >= nsrc:
+            raise RegridError("LibCFRegrid: weights in %s do not match the grids" % path)
+
+        # one row of the sparse matrix per stencil
+        counts = numpy.diff(remap.indptr)
+        nstencil = 2**len(self.srcShape)
+        if counts.max(initial=0) > nstencil:
+            raise RegridError("LibCFRegrid: weights in %s are not linear interpolation weights" % path)
+        rows = numpy.repeat(numpy.arange(ndst), counts)
+        cols = numpy.arange(len(remap.indices)) - numpy.repeat(remap.indptr[:-1], counts)
+        indices = numpy.zeros((ndst, nstencil), numpy.int64)
+        weights = numpy.zeros((ndst, nstencil), numpy.float64)
+        indices[rows, cols] = remap.indices
+        weights[rows, cols] = remap.data
+        self.stencilRegridder = StencilRegridder(indices, weights, self.srcShape, self.dstShape,
+                                                 valid=(counts > 0))
 
     def apply(self, srcData, dstData, missingValue=None, **args):
         """
@@ -82,9 +145,14 @@ class LibCFRegrid(GenericRegrid):
         missingValue :
             value that should be set for points falling outside
             the src domain, pass None if these should not be touched.
+            srcData and dstData can have leading dimensions in front of the
+            grid dimensions, all the slices are then regridded in one call.
         """
 
-        self.regridObj.apply(srcData, dstData, missingValue)
+        if self.stencilRegridder is not None:
+            self.stencilRegridder(srcData, dstData, missingValue)
+            return
+        self.regridObj.applyBatch(srcData, dstData, missingValue)
 
     def getSrcGrid(self):
         """
@@ -120,7 +188,10 @@ class LibCFRegrid(GenericRegrid):
                 not used
         """
         for entry in 'numDstPoints', 'numValid':
-            if entry in diag:
+            if entry in diag and self.stencilRegridder is not None:
+                valid = self.stencilRegridder.valid
+                diag[entry] = len(valid) if entry == 'numDstPoints' else int(valid.sum())
+            elif entry in diag:
                 meth = 'get' + entry[0].upper() + entry[1:]
                 diag[entry] = eval('self.regridObj.' + meth + '()')
         diag['regridTool'] = 'libcf'
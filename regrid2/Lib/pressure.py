@@ -53,8 +53,9 @@ class PressureRegridder:
         self.axisOut = axisOut
         self.nlevi = len(axisIn)
         self.nlevo = len(axisOut)
+        self._levelInterpolators = {}
 
-    def __call__(self, ar, missing=None, order=None, method="log"):
+    def __call__(self, ar, missing=None, order=None, method="log", vectorized=False):
         """
         Call the pressure regridder function.
         ar is the input array, a variable, masked array, or numpy array.
@@ -62,6 +63,8 @@ class PressureRegridder:
           defined for the input array, if any.
         order is of the form "tzyx", "tyx", etc.
         method is either 'log' to interpolate in the log of pressure, or 'linear' for linear interpolation.
+        vectorized, if true, interpolates with NumPy along the level axis of ar
+          without transposing it (see LevelInterpolator).
         """
 
         from cdms2.avariable import AbstractVariable
@@ -136,7 +139,8 @@ class PressureRegridder:
             logYes = 'yes'
         else:
             logYes = 'no'
-        outar = self.rgrd(ar, missing, 'greater', logYes, positionIn)
+        outar = self.rgrd(ar, missing, 'greater', logYes, positionIn,
+                          vectorized=vectorized)
 
         # Reconstruct the same class as on input
         if inputIsVariable == 1:
@@ -148,7 +152,7 @@ class PressureRegridder:
         return result
 
     def rgrd(self, dataIn, missingValueIn, missingMatch,
-             logYes='yes', positionIn=None, missingValueOut=None):
+             logYes='yes', positionIn=None, missingValueOut=None, vectorized=False):
         """
         To perform all the tasks required to regrid the input data, dataIn, into the ouput data,
         dataout along the level dimension only.
@@ -204,6 +208,10 @@ class PressureRegridder:
             * If left at the default entry, None, the code uses missingValueIn
             * If present or as a last resort 1.0e20
 
+        vectorized : if true, interpolate along the level axis of dataIn with NumPy, without transposing
+            the data. The level axis can then be anywhere in dataIn and the other dimensions can have any
+            size. The bracketing indices and weights are computed once per regridder.
+
         Returns
         -------
         dataOut : the regridded data
@@ -291,7 +299,7 @@ class PressureRegridder:
             raise TypeError
 
         # transpose data to the standard order (t,z,y,x)
-        if standardPosition == 0:
+        if standardPosition == 0 and not vectorized:
 
             newOrder, inverseOrder = checkorder(positionIn)
 
@@ -322,52 +330,60 @@ class PressureRegridder:
         else:
             self.ntime = 0
 
-        # allocate memory for dataOut -- the array with new number of levels
-
-        outList = list(dataIn.shape)
-
-        for i in range(len(outList)):
-            if outList[i] == self.nlevi:
-                outList[i] = self.nlevo
-                break
-
-        dataOut = numpy.zeros(
-            tuple(outList),
-            numpy.float32)                      # memory for aout
-
-        if missingMatch is None:                                                # if no missing do not pass None
-            missingMatch = 'none'
-
-        # if no missing do not pass None
-        if missingValueIn is None:
-            missingValueIn = 1.333e33
-
-        if logYes != 'yes':
-            logYes = 'no'
-
-        levIn = self.axisIn[:].astype(numpy.float64)
-        levOut = self.axisOut[:].astype(numpy.float64)
-        _regrid.rgdpressure(
-            self.nlevi,
-            self.nlevo,
-            self.nlat,
-            self.nlon,
-            self.ntime,
-            missingValueIn,
-            missingMatch,
-            logYes,
-            levIn,
-            levOut,
-            dataIn,
-            dataOut)
-
-        # if no missing do not pass None
-        if missingMatch == 'none':
-            missingMatch = None
-        if missingValueIn == 1.333e33:
-            missingValueIn = None
-
-        if standardPosition == 0:
+        if vectorized:
+            if positionIn[2] is None:
+                msg = 'Error in call to rgrd -- the vectorized interpolation requires the level position'
+                sendmsg(msg)
+                raise TypeError
+            interpolator = self.getLevelInterpolator(logYes)
+            dataOut = interpolator(dataIn, positionIn[2], missingValueIn, missingMatch)
+        else:
+            # allocate memory for dataOut -- the array with new number of levels
+
+            outList = list(dataIn.shape)
+
+            for i in range(len(outList)):
+                if outList[i] == self.nlevi:
+                    outList[i] = self.nlevo
+                    break
+
+            dataOut = numpy.zeros(
+                tuple(outList),
+                numpy.float32)                      # memory for aout
+
+            if missingMatch is None:                                                # if no missing do not pass None
+                missingMatch = 'none'
+
+            # if no missing do not pass None
+            if missingValueIn is None:
+                missingValueIn = 1.333e33
+
+            if logYes != 'yes':
+                logYes = 'no'
+
+            levIn = self.axisIn[:].astype(numpy.float64)
+            levOut = self.axisOut[:].astype(numpy.float64)
+            _regrid.rgdpressure(
+                self.nlevi,
+                self.nlevo,
+                self.nlat,
+                self.nlon,
+                self.ntime,
+                missingValueIn,
+                missingMatch,
+                logYes,
+                levIn,
+                levOut,
+                dataIn,
+                dataOut)
+
+            # if no missing do not pass None
+            if missingMatch == 'none':
+                missingMatch = None
+            if missingValueIn == 1.333e33:
+                missingValueIn = None
+
+        if standardPosition == 0 and not vectorized:
             # transpose data to original order
             dataOut = numpy.transpose(dataOut, inverseOrder)
             dataOut = numpy.array(
@@ -414,6 +430,114 @@ class PressureRegridder:
 
         return dataOut
 
+    def getLevelInterpolator(self, logYes='yes'):
+        """
+        Get the LevelInterpolator from the input to the output levels.
+
+        Parameters
+        ----------
+        logYes : 'yes' to interpolate linearly in the log of the levels, anything else for linear in level.
+
+        Returns
+        -------
+        The LevelInterpolator, computed on the first call and reused afterwards.
+        """
+        logYes = (logYes == 'yes')
+        interpolator = self._levelInterpolators.get(logYes)
+        if interpolator is None:
+            interpolator = LevelInterpolator(self.axisIn[:], self.axisOut[:], logYes)
+            self._levelInterpolators[logYes] = interpolator
+        return interpolator
+
+
+class LevelInterpolator:
+    """
+    Vectorized linear interpolation of data from one set of levels to another.
+
+    Parameters
+    ----------
+    levIn : input levels, increasing or decreasing.
+
+    levOut : output levels.
+
+    logYes : if true, interpolate linearly in the log of the levels.
+
+    Notes
+    -----
+    The bracketing input levels and the weight of the upper one are computed once
+    for each output level. Applying the interpolator is then a gather and a
+    multiply-add along the level axis, for any number of other dimensions.
+    The results match the rgdpressure C routine: output levels outside the input
+    range take the nearest end value, and an output level bracketed by a missing
+    input value is missing.
+    """
+
+    def __init__(self, levIn, levOut, logYes=True):
+        levIn = numpy.asarray(levIn, numpy.float64)
+        levOut = numpy.asarray(levOut, numpy.float64)
+        if logYes:
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                levIn = numpy.log(levIn)
+                levOut = numpy.log(levOut)
+        nlevi = len(levIn)
+
+        # index of the input level below each output level, as in cd_locate
+        if nlevi > 1 and levIn[-1] > levIn[0]:
+            below = numpy.searchsorted(levIn, levOut, side='left') - 1
+        else:
+            below = nlevi - numpy.searchsorted(levIn[::-1], levOut, side='left') - 1
+        self.inside = (below >= 0) & (below < nlevi - 1)
+        self.lower = numpy.where(below < 0, 0, numpy.minimum(below, nlevi - 1))
+        self.upper = numpy.where(self.inside, self.lower + 1, self.lower)
+        self.weight = numpy.zeros(len(levOut), numpy.float64)
+        lower = self.lower[self.inside]
+        upper = self.upper[self.inside]
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            self.weight[self.inside] = (levOut[self.inside] - levIn[lower]) / (levIn[upper] - levIn[lower])
+
+    def __call__(self, dataIn, axis, missingValueIn=None, missingMatch=None):
+        """
+        Interpolate the data along an axis.
+
+        Parameters
+        ----------
+        dataIn : numpy array with the input levels along axis.
+
+        axis : position of the level axis in dataIn.
+
+        missingValueIn : the missing data value, or None.
+
+        missingMatch : 'greater', 'equal', 'less', or None, as in PressureRegridder.rgrd.
+
+        Returns
+        -------
+        float32 array with the output levels along axis.
+        """
+        dataIn = numpy.asarray(dataIn, numpy.float32)
+        shape = [1] * dataIn.ndim
+        shape[axis] = len(self.weight)
+        weight = self.weight.reshape(shape)
+        inside = self.inside.reshape(shape)
+        lower = numpy.take(dataIn, self.lower, axis=axis)
+        upper = numpy.take(dataIn, self.upper, axis=axis)
+        with numpy.errstate(invalid='ignore', over='ignore'):
+            dataOut = (lower + (upper - lower) * weight).astype(numpy.float32)
+        if not self.inside.all():
+            dataOut = numpy.where(inside, dataOut, lower)
+
+        if missingValueIn is not None and missingMatch is not None:
+            missing = numpy.float32(missingValueIn)
+            if missingMatch == 'greater':
+                threshold = numpy.float32(0.99 * missingValueIn if missingValueIn > 0.0 else 1.01 * missingValueIn)
+                bad = (lower > threshold) | (upper > threshold)
+            elif missingMatch == 'equal':
+                bad = (lower == missing) | (upper == missing)
+            else:
+                threshold = numpy.float32(0.99 * missingValueIn if missingValueIn < 0.0 else 1.01 * missingValueIn)
+                bad = (lower < threshold) | (upper < threshold)
+            dataOut = numpy.where(bad & inside, missing, dataOut)
+        return dataOut
+
 
 def checkorder(positionIn):
     """
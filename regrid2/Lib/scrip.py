@@ -9,6 +9,91 @@ from functools import reduce
 
 """Regrid support for nonrectangular grids, based on the SCRIP package."""
 
+try:
+    import scipy.sparse
+    _hasScipy = True
+except ImportError:
+    _hasScipy = False
+
+_blockSize = 1 << 22                    # Max elements gathered per block without scipy
+
+
+class SparseRemap:
+    """Remapping weights as a compressed sparse row (CSR) matrix, destination x source.
+
+       Applying it to an array of shape (nextra, nsource) regrids all the leading
+       slices at once. The product uses scipy.sparse if available, otherwise a
+       blocked NumPy gather and sum.
+
+       Parameters
+       ----------
+
+       weights : first order weight of each link
+
+       sourceAddress, destAddress : 1-based source and destination cell of each link (SCRIP convention)
+
+       nsource, ndest : number of source and destination cells
+
+       normal : optional normalization of each destination cell, the weights are divided by it
+    """
+
+    def __init__(self, weights, sourceAddress, destAddress, nsource, ndest, normal=None):
+        src = numpy.asarray(sourceAddress).ravel().astype(numpy.int64) - 1
+        dst = numpy.asarray(destAddress).ravel().astype(numpy.int64) - 1
+        weights = numpy.asarray(weights, numpy.float64).ravel()
+        if normal is not None:
+            weights = weights / numpy.asarray(normal, numpy.float64).ravel()[dst]
+        order = numpy.argsort(dst, kind='stable')
+        self.shape = (ndest, nsource)
+        self.indices = src[order]
+        self.data = weights[order]
+        counts = numpy.bincount(dst, minlength=ndest)
+        self.indptr = numpy.concatenate(([0], numpy.cumsum(counts)))
+        self._starts = self.indptr[:-1][counts > 0]
+        self._nonempty = counts > 0
+        self._matrix = None
+        if _hasScipy:
+            self._matrix = scipy.sparse.csr_matrix((self.data, self.indices, self.indptr),
+                                                   shape=self.shape)
+        self._rowsum = None
+
+    def apply(self, input):
+        """Regrid input, of shape (nextra, nsource), return an array of shape (nextra, ndest)."""
+        input = numpy.asarray(input, numpy.float64)
+        if input.shape[-1] != self.shape[1]:
+            raise RegridError("Last dimension of input must be the number of source cells: %d" %
+                              self.shape[1])
+        if self._matrix is not None:
+            return numpy.ascontiguousarray((self._matrix @ input.T).T)
+        output = numpy.zeros((input.shape[0], self.shape[0]), numpy.float64)
+        if len(self.data) == 0:
+            return output
+        step = max(1, _blockSize // len(self.data))
+        for i in range(0, input.shape[0], step):
+            gathered = input[i:i + step, self.indices] * self.data
+            output[i:i + step, self._nonempty] = numpy.add.reduceat(gathered, self._starts, axis=1)
+        return output
+
+    def __call__(self, input, mask=None):
+        """Regrid input, of shape (nextra, nsource).
+
+           If mask (True where invalid, same shape as input) is given, invalid values
+           are left out and the weights of each destination cell are rescaled by
+           (sum of all its weights) / (sum of its valid weights), so that cells without
+           invalid sources are unchanged. Destination cells without valid sources are
+           masked in the returned masked array.
+        """
+        if mask is None or mask is numpy.ma.nomask or not numpy.any(mask):
+            return self.apply(input)
+        if self._rowsum is None:
+            self._rowsum = self.apply(numpy.ones((1, self.shape[1]), numpy.float64))
+        valid = numpy.logical_not(mask)
+        output = self.apply(numpy.where(valid, input, 0.))
+        wtsum = self.apply(valid.astype(numpy.float64))
+        outmask = (wtsum <= 0.)
+        output *= numpy.where(outmask, 0., self._rowsum / numpy.where(outmask, 1., wtsum))
+        return numpy.ma.masked_array(output, mask=outmask)
+
 
 class ScripRegridder:
 
@@ -22,7 +107,13 @@ class ScripRegridder:
         self.sourceFrac = sourceFrac
         self.destFrac = destFrac
 
-    def __call__(self, input):
+    def __call__(self, input, sparse=False):
+        """Regrid input, the last dimension(s) of which are the input grid.
+
+           If sparse is True the weights are applied as a sparse matrix to all the leading
+           slices at once (see getSparseRemap), and masked input values are left out with
+           renormalization of the weights.
+        """
 
         import numpy.ma
         from cdms2 import isVariable
@@ -69,7 +160,9 @@ class ScripRegridder:
             )
 
         # If input is an numpy.ma, make it Numeric
+        mask = None
         if numpy.ma.isMaskedArray(input):
+            mask = numpy.ma.getmask(input)
             input = input.filled()
 
         restoreShape = input.shape[:-rank]
@@ -79,7 +172,12 @@ class ScripRegridder:
         input.shape = newshape
 
         # Regrid
-        output = self.regrid(input)
+        if sparse:
+            if mask is not None and mask is not numpy.ma.nomask:
+                mask = mask.reshape(newshape)
+            output = self.getSparseRemap(gridsize)(input, mask)
+        else:
+            output = self.regrid(input)
 
         # Reshape output and restore input shape
         input.shape = oldshape
@@ -93,6 +191,22 @@ class ScripRegridder:
 
         return output
 
+    def getSparseRemap(self, nsource=None):
+        """Get the weights as a SparseRemap, built on first use.
+
+           nsource is the number of input cells, by default the size of the input grid.
+        """
+        if nsource is None:
+            nsource = self.inputGrid.size()
+        remap = getattr(self, '_sparseRemap', None)
+        if remap is None or remap.shape[1] != nsource:
+            weights = numpy.asarray(self.remapMatrix).reshape((len(self.sourceAddress), -1))[:, 0]
+            remap = SparseRemap(weights, self.sourceAddress, self.destAddress,
+                                nsource, self.outputGrid.size(),
+                                normal=getattr(self, 'normal', None))
+            self._sparseRemap = remap
+        return remap
+
     def getOutputGrid(self):
         return self.outputGrid
 
@@ -399,6 +513,9 @@ def readRegridder(fileobj, mapMethod=None, checkGrid=1):
             mapMethod = "bicubic"
         elif mapString[0:8] == "distance" or mapString[0:7] == "distwgt":
             mapMethod = "distwgt"
+        elif mapString[0:5] == "patch":
+            # Patch weights are applied like bilinear ones
+            mapMethod = "bilinear"
         else:
             raise RegridError("Unrecognized map method: %s" % mapString)
 
@@ -435,8 +552,16 @@ def readRegridder(fileobj, mapMethod=None, checkGrid=1):
                     S = fileobj("S").filled()
                     S.shape = sh
                     remapMatrix = numpy.concatenate((S, remapMatrix), axis=1)
-            srcarea = fileobj('area_a')
-            dstarea = fileobj('area_b')
+            elif len(remapMatrix.shape) == 1:
+                # First order weights only
+                S = remapMatrix
+                remapMatrix = numpy.zeros((len(S), 3), numpy.float64)
+                remapMatrix[:, 0] = S
+            srcarea = dstarea = None
+            if 'area_a' in list(fileobj.variables.keys()):
+                srcarea = fileobj('area_a')
+            if 'area_b' in list(fileobj.variables.keys()):
+                dstarea = fileobj('area_b')
         regridder = ConservativeRegridder(
             outgrid,
             remapMatrix,
@@ -478,3 +603,135 @@ def readRegridder(fileobj, mapMethod=None, checkGrid=1):
         raise RegridError("Unrecognized map method: %s" % mapMethod)
 
     return regridder
+
+
+def _scripGrid(grid):
+    """Get the SCRIP description of a CDMS grid.
+
+       Returns (dims, centerLat, centerLon, cornerLat, cornerLon, imask), with the
+       cells flattened in the order of the grid and dims in SCRIP (reversed) order.
+    """
+    if isinstance(grid, cdms2.grid.AbstractRectGrid):
+        grid = grid.toCurveGrid()
+    centerLat = numpy.ma.filled(grid.getLatitude()[:]).astype(numpy.float64)
+    centerLon = numpy.ma.filled(grid.getLongitude()[:]).astype(numpy.float64)
+    shape = centerLat.shape
+    ncell = centerLat.size
+    centerLat.shape = centerLon.shape = (ncell,)
+    blat, blon = grid.getBounds()
+    if blat is None or blon is None:
+        # No cell information, the corners collapse on the centers
+        cornerLat = centerLat.reshape((ncell, 1))
+        cornerLon = centerLon.reshape((ncell, 1))
+    else:
+        cornerLat = numpy.ma.filled(blat).astype(numpy.float64).reshape((ncell, -1))
+        cornerLon = numpy.ma.filled(blon).astype(numpy.float64).reshape((ncell, -1))
+    mask = grid.getMask()
+    if mask is None:
+        imask = numpy.ones((ncell,), numpy.int32)
+    else:
+        # SCRIP convention: 0 for invalid data
+        imask = (1 - numpy.ma.filled(mask, 1).reshape((ncell,))).astype(numpy.int32)
+    dims = numpy.array(shape[::-1], numpy.int32)
+    return dims, centerLat, centerLon, cornerLat, cornerLon, imask
+
+
+def writeWeights(path, ingrid, outgrid, weights, sourceAddress, destAddress,
+                 mapMethod="conservative", sourceFrac=None, destFrac=None,
+                 sourceArea=None, destArea=None, extra=None, attributes=None):
+    """Write regridding weights to a mapping file, in the ESMF/NCAR flavor of the SCRIP format.
+
+       The file can be read back with readRegridder, and by ESMF.
+
+       Parameters
+       ----------
+
+       path : path of the file to write. The file is written atomically.
+
+       ingrid, outgrid : source and destination CDMS grids.
+
+       weights : weight of each link.
+
+       sourceAddress, destAddress : 0-based flat source and destination cell index of each link,
+           in the order of the grids.
+
+       mapMethod : "conservative", "bilinear", "patch" or "distwgt".
+
+       sourceFrac, destFrac : fraction of each cell taking part in the remapping, default 1.
+
+       sourceArea, destArea : cell areas, if known.
+
+       extra : dictionary {name: (array, dimension names, typecode)} of additional,
+           method specific variables. Dimensions which are not part of the format are created.
+
+       attributes : dictionary of additional global attributes.
+    """
+    import os
+    import tempfile
+    import Cdunif
+
+    methodNames = {"conservative": "Conservative remapping",
+                   "bilinear": "Bilinear remapping",
+                   "patch": "Patch remapping",
+                   "distwgt": "Distance weighted remapping"}
+    if mapMethod not in methodNames:
+        raise RegridError("Unrecognized map method: %s" % mapMethod)
+
+    weights = numpy.asarray(weights, numpy.float64)
+    sourceAddress = numpy.asarray(sourceAddress)
+    destAddress = numpy.asarray(destAddress)
+    grids = {'a': _scripGrid(ingrid), 'b': _scripGrid(outgrid)}
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temppath = tempfile.mkstemp(dir=directory, suffix='.nc')
+    os.close(fd)
+    try:
+        f = Cdunif.CdunifFile(temppath, 'w')
+        f.title = "%s %s" % (getattr(ingrid, 'id', ''), methodNames[mapMethod])
+        f.conventions = "NCAR-CSM"
+        f.map_method = methodNames[mapMethod]
+        f.normalization = "fracarea"
+        f.source_grid = str(getattr(ingrid, 'id', ''))
+        f.dest_grid = str(getattr(outgrid, 'id', ''))
+        for name, value in (attributes or {}).items():
+            setattr(f, name, value)
+
+        f.createDimension("n_s", len(weights))
+        for x, src in ('a', 'src'), ('b', 'dst'):
+            dims, centerLat, centerLon, cornerLat, cornerLon, imask = grids[x]
+            f.createDimension("n_" + x, len(centerLat))
+            f.createDimension("nv_" + x, cornerLat.shape[1])
+            f.createDimension(src + "_grid_rank", len(dims))
+            f.createVariable(src + "_grid_dims", 'i', (src + "_grid_rank",))[:] = dims
+            for name, value, shape in (("yc_", centerLat, ("n_" + x,)),
+                                       ("xc_", centerLon, ("n_" + x,)),
+                                       ("yv_", cornerLat, ("n_" + x, "nv_" + x)),
+                                       ("xv_", cornerLon, ("n_" + x, "nv_" + x))):
+                var = f.createVariable(name + x, 'd', shape)
+                var.units = "degrees"
+                var[:] = value
+            f.createVariable("mask_" + x, 'i', ("n_" + x,))[:] = imask
+            frac, area = (sourceFrac, sourceArea) if x == 'a' else (destFrac, destArea)
+            if frac is None:
+                frac = numpy.ones(len(centerLat), numpy.float64)
+            f.createVariable("frac_" + x, 'd', ("n_" + x,))[:] = numpy.ma.filled(frac).ravel()
+            if area is not None:
+                f.createVariable("area_" + x, 'd', ("n_" + x,))[:] = numpy.ma.filled(area).ravel()
+
+        # SCRIP addresses are 1-based
+        f.createVariable("S", 'd', ("n_s",))[:] = weights
+        f.createVariable("col", 'i', ("n_s",))[:] = (sourceAddress + 1).astype(numpy.int32)
+        f.createVariable("row", 'i', ("n_s",))[:] = (destAddress + 1).astype(numpy.int32)
+
+        for name, (value, dimnames, typecode) in (extra or {}).items():
+            value = numpy.asarray(value)
+            for dimname, n in zip(dimnames, value.shape):
+                if dimname not in f.dimensions:
+                    f.createDimension(dimname, n)
+            f.createVariable(name, typecode, tuple(dimnames))[:] = value
+        f.close()
+        os.replace(temppath, path)
+    except BaseException:
+        if os.path.isfile(temppath):
+            os.unlink(temppath)
+        raise
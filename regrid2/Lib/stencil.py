@@ -0,0 +1,89 @@
+"""
+Interpolation with precomputed stencils, using NumPy only
+"""
+import numpy
+from .error import RegridError
+
+
+class StencilRegridder:
+    """
+    Apply precomputed interpolation stencils.
+
+    Each destination point is a weighted sum of a fixed number of source
+    points, its stencil, e.g. the 2**rank corners of the source cell holding
+    it for the libcf (gsRegrid) linear interpolation.
+
+    Parameters
+    ----------
+    indices : integer array of shape (ndst, nstencil), flat (C order) source indices of each stencil.
+
+    weights : array of shape (ndst, nstencil), the matching weights.
+
+    srcShape : shape of the source grid.
+
+    dstShape : shape of the destination grid, with ndst points.
+
+    valid : boolean array of shape (ndst,), false for the destination points which could not
+            be located on the source grid. None if all points are valid.
+
+    Notes
+    -----
+    The object only holds NumPy arrays. It can be pickled and applied where the library
+    which computed the stencils is not available.
+    """
+
+    def __init__(self, indices, weights, srcShape, dstShape, valid=None):
+        self.indices = numpy.asarray(indices, numpy.int64)
+        self.weights = numpy.asarray(weights, numpy.float64)
+        self.srcShape = tuple(srcShape)
+        self.dstShape = tuple(dstShape)
+        ndst = int(numpy.prod(self.dstShape))
+        if self.indices.shape != self.weights.shape or self.indices.shape[0] != ndst:
+            raise RegridError("StencilRegridder: indices %s and weights %s do not match %d destination points"
+                              % (str(self.indices.shape), str(self.weights.shape), ndst))
+        if valid is None:
+            valid = numpy.ones(ndst, bool)
+        self.valid = numpy.asarray(valid, bool)
+
+    def __call__(self, src_data, dst_data=None, missingValue=None):
+        """
+        Interpolate the data.
+
+        Parameters
+        ----------
+        src_data : data on the source grid, with any number of leading dimensions.
+
+        dst_data : optional output array on the destination grid, with the same leading dimensions.
+
+        missingValue : value set at the invalid destination points. If None, these points
+                       are not touched in dst_data.
+
+        Returns
+        -------
+        The data on the destination grid, dst_data if given.
+        """
+        src_data = numpy.asarray(src_data)
+        rank = len(self.srcShape)
+        lead = src_data.shape[:src_data.ndim - rank]
+        if src_data.shape[src_data.ndim - rank:] != self.srcShape:
+            raise RegridError("StencilRegridder: source data of shape %s, expected %s"
+                              % (str(src_data.shape), str(self.srcShape)))
+        src_flat = src_data.reshape(lead + (-1,))
+
+        # one gather and multiply-add per stencil point
+        result = src_flat[..., self.indices[:, 0]] * self.weights[:, 0]
+        for k in range(1, self.indices.shape[1]):
+            result += src_flat[..., self.indices[:, k]] * self.weights[:, k]
+        if src_data.dtype.kind == 'f':
+            result = result.astype(src_data.dtype)
+        result = result.reshape(lead + self.dstShape)
+
+        invalid = ~self.valid.reshape(self.dstShape)
+        if missingValue is not None:
+            result[..., invalid] = missingValue
+        elif dst_data is not None:
+            result[..., invalid] = dst_data[..., invalid]
+        if dst_data is None:
+            return result
+        dst_data[...] = result
+        return dst_data
@@ -1303,6 +1303,9 @@ static PyObject *rgd_rgdarea(PyObject *self, PyObject *args)
 	exit(1);
     }
 
+    /* the loops only use C data, let other Python threads run meanwhile */
+    Py_BEGIN_ALLOW_THREADS
+
     /* branch to special version of the loops for 2D case */
 
     if (flag2D) {
@@ -1507,6 +1510,8 @@ static PyObject *rgd_rgdarea(PyObject *self, PyObject *args)
     free(accum);
     free(wtmsk);
 
+    Py_END_ALLOW_THREADS
+
     /* ------------------------------------------------------- */
 
     /* NB! Don't use Py_BuildValue here, since it increments the reference count!
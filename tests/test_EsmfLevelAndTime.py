@@ -53,6 +53,13 @@ class TestLevelRegridLibCfAndESMF(unittest.TestCase):
         # avgdiff.toVisit('soAvgDiff.vsh5')
         self.assertLess(abs(avgdiff), 2e18)
 
+    def test_ESMFBatchTimeLevel2D(self):
+        soInterp = self.so.regrid(self.clt.getGrid(), regridTool='ESMF')
+        soInterpBatch = self.so.regrid(self.clt.getGrid(), regridTool='ESMF', batch=True)
+        self.assertTrue(numpy.ma.allclose(soInterpBatch, soInterp))
+        self.assertTrue(numpy.array_equal(numpy.ma.getmaskarray(soInterpBatch),
+                                          numpy.ma.getmaskarray(soInterp)))
+
 
 if __name__ == "__main__":
     ESMF.Manager(debug=True)
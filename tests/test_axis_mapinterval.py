@@ -0,0 +1,87 @@
+import unittest
+import numpy
+import cdms2
+from cdms2 import cdmsNode
+from cdms2.axis import Axis
+
+
+class TestAxisMapInterval(unittest.TestCase):
+
+    def intervals(self):
+        rng = numpy.random.RandomState(1)
+        for x, y in rng.uniform(-180., 540., (200, 2)):
+            for indicator in ('ccn', 'cob', 'ooe', 'ccs'):
+                yield (x, y, indicator)
+
+    def testMapIntervalCache(self):
+        lon = cdms2.createAxis(numpy.arange(0., 360., 2.5), id='longitude')
+        lon.designateLongitude()
+        lat = cdms2.createAxis(numpy.linspace(90., -90., 73), id='latitude')
+        size = cdms2.getMapIntervalCacheSize()
+        try:
+            for ax in (lon, lat):
+                cdms2.setMapIntervalCacheSize(0)
+                expected = [ax.mapIntervalExt(interval) for interval in self.intervals()]
+                cdms2.setMapIntervalCacheSize(size)
+                for repeat in range(2):
+                    self.assertEqual([ax.mapIntervalExt(interval) for interval in self.intervals()], expected)
+        finally:
+            cdms2.setMapIntervalCacheSize(size)
+
+    def testMapIntervalInvalidation(self):
+        ax = cdms2.createAxis(numpy.arange(10.), id='x')
+        self.assertEqual(ax.mapIntervalExt((2., 4.)), (2, 5, 1))
+        ax[:] = numpy.arange(10.) * 2.
+        self.assertEqual(ax.mapIntervalExt((2., 4.)), (1, 3, 1))
+        self.assertEqual(ax.mapIntervalExt((2.5, 3., 'ccb')), (1, 3, 1))
+        ax.setBounds(numpy.array([numpy.arange(10.) * 2. - 0.1, numpy.arange(10.) * 2. + 0.1]).T)
+        self.assertEqual(ax.mapIntervalExt((2.5, 3., 'ccb')), None)
+        self.assertEqual(ax.clone().mapIntervalExt((2., 4.)), (1, 3, 1))
+
+    def testMapIntervals(self):
+        lon = cdms2.createAxis(numpy.arange(0., 360., 2.5), id='longitude')
+        lon.designateLongitude()
+        lat = cdms2.createAxis(numpy.linspace(90., -90., 73), id='latitude')
+        lev = cdms2.createAxis(numpy.array([1000., 850., 700., 500., 300., 200., 100., 10.]), id='level')
+        for ax in (lon, lat, lev):
+            intervals = numpy.array([interval[:2] for interval in self.intervals()][::4])
+            intervals[::3] = ax[:][numpy.arange(len(intervals[::3]) * 2).reshape((-1, 2)) % len(ax)]
+            for indicator in ('ccn', 'con', 'ocb', 'oob', 'ccs', 'cce'):
+                i, j, k = ax.mapIntervals(intervals, indicator)
+                for m, interval in enumerate(intervals):
+                    expected = ax.mapIntervalExt(tuple(interval), indicator)
+                    if expected is None:
+                        self.assertEqual(k[m], 0)
+                    else:
+                        self.assertEqual((i[m], None if (j[m] == -1 and k[m] == -1) else j[m], k[m]), expected)
+
+    def testLinearAxis(self):
+        for start, delta, length, datatype in ((0., 2.5, 144, cdmsNode.CdDouble),
+                                               (358.75, -1.25, 288, cdmsNode.CdFloat)):
+            node = cdmsNode.AxisNode('longitude', length, datatype)
+            node.setLinearData(cdmsNode.LinearDataNode(start, delta, length))
+            ax = Axis(None, node)
+            ax.units = 'degrees_east'
+            ax.designateLongitude()
+            values = ax.getData()
+            vector = cdms2.createAxis(values, id='longitude')
+            vector.units = 'degrees_east'
+            vector.designateLongitude()
+
+            self.assertTrue(ax.isLinear())
+            self.assertTrue(numpy.array_equal(ax[:], values))
+            self.assertTrue(numpy.array_equal(ax[3:-5:4], values[3:-5:4]))
+            self.assertTrue(numpy.array_equal(ax.genGenericBounds(), vector.genGenericBounds()))
+            for interval in self.intervals():
+                self.assertEqual(ax.mapIntervalExt(interval), vector.mapIntervalExt(interval))
+            for i, j, k in ((5, 40, 3), (length - 10, length + 20, 1)):
+                sub = ax.subaxis(i, j, k)
+                subvector = vector.subaxis(i, j, k)
+                self.assertTrue(numpy.array_equal(sub[:], subvector[:]))
+                self.assertTrue(numpy.array_equal(sub.getBounds(), subvector.getBounds()))
+            # the values were never held by the axis
+            self.assertTrue(ax._data_ is None)
+
+
+if __name__ == '__main__':
+    unittest.main()
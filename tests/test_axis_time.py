@@ -0,0 +1,72 @@
+import unittest
+import numpy
+import cdtime
+import cdms2
+from cdms2 import timearray
+
+
+class TestAxisTime(unittest.TestCase):
+
+    calendars = [cdtime.StandardCalendar, cdtime.MixedCalendar, cdtime.JulianCalendar,
+                 cdtime.NoLeapCalendar, cdtime.Calendar360]
+
+    def makeAxis(self, values, units, calendar):
+        ax = cdms2.createAxis(numpy.array(values, numpy.float64), id='time')
+        ax.units = units
+        ax.designateTime(calendar=calendar)
+        return ax
+
+    def testComponentTime(self):
+        values = numpy.arange(0, 600000, 997) * 0.25
+        for units in ("hours since 1850-1-1", "days since 1582-10-1 6:00:00", "minutes since 1-1-1"):
+            for calendar in self.calendars:
+                ax = self.makeAxis(values, units, calendar)
+                comp = ax.asComponentTimeArray()
+                for value, c in zip(values, comp):
+                    expected = cdtime.reltime(value, units).tocomp(calendar)
+                    self.assertEqual((c['year'], c['month'], c['day'], c['hour'], c['minute']),
+                                     (expected.year, expected.month, expected.day,
+                                      expected.hour, expected.minute))
+                    self.assertAlmostEqual(c['second'], expected.second, places=3)
+                result = ax.asComponentTime()
+                self.assertEqual([c.cmp(e) for c, e in zip(result, timearray.tocomptimes(comp))],
+                                 [0] * len(values))
+                relative = timearray.comptorel(comp, units, calendar)
+                self.assertTrue(numpy.allclose(relative, values))
+
+    def testRelativeTime(self):
+        values = numpy.arange(0, 2000, 7.5)
+        ax = self.makeAxis(values, "days since 1979-1-1", cdtime.NoLeapCalendar)
+        for units in ("hours since 1900-1-1", "months since 1979-1-1"):
+            result = ax.asRelativeTime(units)
+            for value, r in zip(values, result):
+                expected = cdtime.reltime(value, ax.units).torel(units, cdtime.NoLeapCalendar)
+                self.assertAlmostEqual(r.value, expected.value, places=5)
+                self.assertEqual(r.units, units)
+        dtg = ax.asDTGTime()
+        self.assertEqual(dtg[1], "1979010812")
+        self.assertEqual(ax.asdatetime()[1].hour, 12)
+
+    def testToRelativeTime(self):
+        values = numpy.arange(0, 5000, 7.5)
+        for calendar in self.calendars:
+            for units in ("hours since 1582-10-1", "days since 1900-1-1 6:00:00", "months since 1979-1-1"):
+                ax = self.makeAxis(values, "days since 1979-1-1", calendar)
+                ax.setBounds(numpy.array([values - 3.75, values + 3.75]).T)
+                bounds = ax.getBounds()
+                ax.toRelativeTime(units)
+                self.assertEqual(ax.units, units)
+                expected = [cdtime.reltime(v, "days since 1979-1-1").torel(units, calendar).value for v in values]
+                self.assertTrue(numpy.allclose(ax[:], expected))
+                expected = [cdtime.reltime(v, "days since 1979-1-1").torel(units, calendar).value
+                            for v in bounds.ravel()]
+                self.assertTrue(numpy.allclose(ax.getBounds().ravel(), expected))
+        converted = timearray.reltorel(values, "days since 1979-1-1", "hours since 1979-1-1",
+                                       cdtime.NoLeapCalendar, cdtime.StandardCalendar)
+        expected = [cdtime.reltime(v, "days since 1979-1-1").tocomp(cdtime.NoLeapCalendar).torel(
+                    "hours since 1979-1-1", cdtime.StandardCalendar).value for v in values]
+        self.assertTrue(numpy.allclose(converted, expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import time
+import basetest
+from cdms2 import cache
+
+
+class TestCache(basetest.CDMSBaseTest):
+
+    def setUp(self):
+        super(TestCache, self).setUp()
+        self.cacheTempdir = cache._cache_tempdir
+        cache._cache_tempdir = self.tempdir
+        self.cache = cache.Cache()
+
+    def tearDown(self):
+        self.cache.delete()
+        cache._cache_tempdir = self.cacheTempdir
+        super(TestCache, self).tearDown()
+
+    def makeFile(self, name, nbytes):
+        path = os.path.join(self.tempdir, name)
+        with open(path, 'wb') as f:
+            f.write(b'x' * nbytes)
+        return path
+
+    def register(self, key, nbytes):
+        path = self.makeFile(key + '.nc', nbytes)
+        self.cache.put(key, path)
+        # distinct access times
+        time.sleep(0.01)
+        return path
+
+    def fetch(self, key, nbytes):
+        # stand-in for the transfer of the remote file
+        def copyFile(fromURL, toURL, **args):
+            with open(toURL, 'wb') as f:
+                f.write(b'y' * nbytes)
+
+        transfer = cache.copyFile
+        cache.copyFile = copyFile
+        try:
+            return self.cache.getFile('ftp://host/' + key, key)
+        finally:
+            cache.copyFile = transfer
+
+    def testCache(self):
+        self.assertEqual(self.cache.indexpath, os.path.join(self.tempdir, '.index.db'))
+        a = self.register('a', 100)
+        b = self.register('b', 200)
+        c = self.register('c', 300)
+        self.assertEqual(self.cache.get('a'), a)
+        self.assertEqual(self.cache.get('d'), None)
+        self.assertEqual(self.cache.getStats(),
+                         {'hits': 0, 'misses': 0, 'bytes_transferred': 0, 'evictions': 0, 'size': 600})
+
+        # the index is shared by the cache objects, and survives a new connection
+        other = cache.Cache()
+        self.assertEqual(other.get('b'), b)
+        self.cache._connpid = None
+        self.assertEqual(self.cache.get('b'), b)
+
+        # pending reads are cleaned
+        self.cache.put('pending', '__READ_PENDING__')
+        self.cache.clean()
+        self.assertEqual(self.cache.get('pending'), None)
+
+        # the least recently used entries are evicted, except the kept one
+        self.cache.evict(300, keep='c')
+        self.assertEqual(self.cache.get('a'), None)
+        self.assertEqual(self.cache.get('b'), None)
+        self.assertEqual(self.cache.get('c'), c)
+        self.assertFalse(os.path.exists(a))
+        self.assertFalse(os.path.exists(b))
+        stats = self.cache.getStats()
+        self.assertEqual((stats['evictions'], stats['size']), (2, 300))
+
+        # an evicted entry is fetched again, the others are hits
+        path = self.fetch('a', 50)
+        self.assertNotEqual(path, a)
+        self.assertEqual(os.path.dirname(path), self.tempdir)
+        self.assertEqual(self.cache.get('a'), path)
+        self.assertEqual(self.fetch('c', 50), c)
+        self.assertEqual(self.cache.getStats(),
+                         {'hits': 1, 'misses': 1, 'bytes_transferred': 50, 'evictions': 2, 'size': 350})
+
+    def testEvictOrder(self):
+        paths = {}
+        for key in 'abcd':
+            paths[key] = self.register(key, 100)
+        # a becomes the most recently used entry
+        self.cache.get('a')
+
+        # nothing to do within the budget
+        self.cache.evict(400)
+        self.assertEqual(self.cache.getStats()['evictions'], 0)
+
+        # b is kept, c and d are the least recently used, pending reads are not counted
+        self.cache.put('pending', '__READ_PENDING__')
+        self.cache.evict(200, keep='b')
+        for key, exists in zip('abcd', (True, True, False, False)):
+            self.assertEqual(self.cache.get(key) is not None, exists)
+            self.assertEqual(os.path.exists(paths[key]), exists)
+        self.assertEqual(self.cache.get('pending'), '__READ_PENDING__')
+        stats = self.cache.getStats()
+        self.assertEqual((stats['evictions'], stats['size']), (2, 200))
+
+        # a fetch keeps the cache within maxbytes, without evicting the fetched file
+        self.cache.maxbytes = 250
+        time.sleep(0.01)
+        self.cache.get('a')
+        path = self.fetch('e', 150)
+        self.assertEqual(self.cache.get('b'), None)
+        self.assertEqual(self.cache.get('e'), path)
+        stats = self.cache.getStats()
+        self.assertEqual((stats['evictions'], stats['size'], stats['bytes_transferred']), (3, 250, 150))
+
+        # a kept entry survives even when it alone exceeds the budget
+        self.cache.evict(0, keep='e')
+        self.assertEqual(self.cache.get('a'), None)
+        self.assertEqual(self.cache.get('e'), path)
+        self.assertEqual(self.cache.getStats()['size'], 150)
+        self.cache.clean(maxbytes=0)
+        self.assertEqual(self.cache.get('e'), None)
+        self.assertEqual(self.cache.get('pending'), None)
+        self.assertEqual(self.cache.getStats()['size'], 0)
+
+
+if __name__ == '__main__':
+    basetest.run()
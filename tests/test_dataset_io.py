@@ -8,7 +8,9 @@ cdms2.setNetcdfUseParallelFlag(0)
 
 from cdms2.variable import WriteNotImplemented
 from cdms2.avariable import NotImplemented
+from cdms2.cdscan import main as cdscan
 import basetest
+import cdat_info
 
 
 class TestDatasetIO(basetest.CDMSBaseTest):
@@ -82,6 +84,87 @@ class TestDatasetIO(basetest.CDMSBaseTest):
     def testStridePartitioned(self):
         strided = self.u[0:3:2, 0:16:2, 0:32:2]
 
+    def testParallelRead(self):
+        serial = self.u[:]
+        cdms2.setReadWorkers(4)
+        try:
+            self.assertEqual(cdms2.getReadWorkers(), 4)
+            parallel = self.u[:]
+            strided = self.u[0:3:2, 0:16:2, 0:32:2]
+        finally:
+            cdms2.setReadWorkers(1)
+        self.assertTrue(numpy.ma.allequal(parallel, serial))
+        self.assertTrue(numpy.ma.allequal(strided, serial[0:3:2, 0:16:2, 0:32:2]))
+        with self.assertRaises(cdms2.CDMSError):
+            cdms2.setReadWorkers(0)
+
+    def testParallelReadMasked(self):
+        u = self.u[:]
+        masked = cdms2.MV2.masked_where(numpy.ma.remainder(u, 7.) == 0., u)
+        names = []
+        for i in range(len(u)):
+            names.append('masked_%d.nc' % i)
+            out = self.getTempFile(names[-1], 'w')
+            out.write(masked.subSlice(i), id='um')
+            out.close()
+        os.chdir(self.tempdir)
+        cdscan(['cdscan', '-q', '-x', 'masked.xml'] + names)
+        um = self.getTempFile('masked.xml')['um']
+
+        keys = [slice(None), (slice(0, 3, 2), slice(0, 16, 2), slice(0, 32, 2)),
+                (slice(None, None, -1), slice(2, 9)), (slice(1, 3), slice(None), slice(5, 20))]
+        cdms2.setReadWorkers(1)
+        serial = [um[key] for key in keys] + [self.u[:]]
+        cdms2.setReadWorkers(3)
+        try:
+            parallel = [um[key] for key in keys] + [self.u[:]]
+        finally:
+            cdms2.setReadWorkers(1)
+        self.assertTrue(numpy.array_equal(numpy.ma.getmaskarray(serial[0]), numpy.ma.getmaskarray(masked)))
+        for s, p in zip(serial, parallel):
+            self.assertEqual(p.shape, s.shape)
+            self.assertTrue(numpy.array_equal(numpy.ma.filled(p, 0.), numpy.ma.filled(s, 0.)))
+            self.assertTrue(numpy.array_equal(numpy.ma.getmaskarray(p), numpy.ma.getmaskarray(s)))
+            # nomask when nothing is masked, as with the serial read
+            self.assertEqual(numpy.ma.getmask(p) is numpy.ma.nomask, numpy.ma.getmask(s) is numpy.ma.nomask)
+
+    def testProbeGlobalAttribute(self):
+        path = os.path.join(self.tempdir, 'probe.nc')
+        out = cdms2.open(path, 'w')
+        out.write(self.u[0])
+        out.comment = 'probed'
+        out.close()
+        clt = os.path.join(cdat_info.get_sampledata_path(), 'clt.nc')
+        for name in (path, clt):
+            f = self.getFile(name)
+            self.assertTrue(len(f.attributes) > 0)
+            for attname, value in f.attributes.items():
+                self.assertTrue(numpy.array_equal(cdms2.dataset._probeGlobalAttribute(name, attname), value))
+            self.assertIsNone(cdms2.dataset._probeGlobalAttribute(name, 'not_an_attribute'))
+        self.assertEqual(cdms2.dataset._probeGlobalAttribute(path, 'comment'), 'probed')
+        # unreadable files
+        text = os.path.join(self.tempdir, 'probe.txt')
+        with open(text, 'w') as f:
+            f.write('comment = probed\n')
+        self.assertIsNone(cdms2.dataset._probeGlobalAttribute(text, 'comment'))
+        self.assertIsNone(cdms2.dataset._probeGlobalAttribute(os.path.join(self.tempdir, 'missing.nc'), 'comment'))
+
+    def testFileHandlePool(self):
+        serial = self.u[:]
+        cdms2.setFileHandlePoolSize(8)
+        try:
+            self.assertEqual(cdms2.getFileHandlePoolSize(), 8)
+            first = self.u[:]
+            npooled = len(cdms2.dataset._filePool._idle)
+            self.assertTrue(0 < npooled <= 8)
+            second = self.u[:]
+            self.assertEqual(len(cdms2.dataset._filePool._idle), npooled)
+        finally:
+            cdms2.setFileHandlePoolSize(0)
+        self.assertEqual(len(cdms2.dataset._filePool._idle), 0)
+        self.assertTrue(numpy.ma.allequal(first, serial))
+        self.assertTrue(numpy.ma.allequal(second, serial))
+
     def testClosedOperations(self):
         u = self.u
         transient_u = self.u[:]
@@ -1,9 +1,115 @@
 import basetest
 import cdms2
+import numpy
+import os
+
 
 class TestOpenFile(basetest.CDMSBaseTest):
     def test_write_to_file(self):
         f = cdms2.open("bad.nc", "w")
 
+    def test_lazy_open(self):
+        eager = self.getDataFile("clt.nc")
+        cdms2.setLazyOpenFlag(1)
+        try:
+            self.assertTrue(cdms2.getLazyOpenFlag())
+            lazy = self.getDataFile("clt.nc")
+        finally:
+            cdms2.setLazyOpenFlag(0)
+        self.assertEqual(sorted(lazy.variables.keys()), sorted(eager.variables.keys()))
+        self.assertEqual(sorted(lazy.axes.keys()), sorted(eager.axes.keys()))
+        self.assertEqual(lazy.variables.loaded(), {})
+        clt = lazy['clt']
+        self.assertEqual(list(lazy.variables.loaded().keys()), ['clt'])
+        self.assertEqual(clt.getGrid().shape, eager['clt'].getGrid().shape)
+        self.assertTrue(numpy.ma.allequal(clt[0], eager['clt'][0]))
+        self.assertEqual(sorted(lazy.grids.keys()), sorted(eager.grids.keys()))
+
+    def countDiscovery(self):
+        """Count the calls of the structure discovery done when a file is opened
+        without a metadata cache entry. Returns the counts and a function restoring
+        the methods."""
+        counts = {'getAxisIds': 0, 'generateGridkey': 0}
+        convention = cdms2.convention.CF1
+        getAxisIds = convention.getAxisIds
+        generateGridkey = cdms2.fvariable.FileVariable.generateGridkey
+
+        def countedAxisIds(vardict):
+            counts['getAxisIds'] += 1
+            return getAxisIds(vardict)
+
+        def countedGridkey(var, *args, **kwargs):
+            counts['generateGridkey'] += 1
+            return generateGridkey(var, *args, **kwargs)
+
+        convention.getAxisIds = countedAxisIds
+        cdms2.fvariable.FileVariable.generateGridkey = countedGridkey
+
+        def restore():
+            del convention.getAxisIds
+            del cdms2.fvariable.FileVariable.generateGridkey
+        return counts, restore
+
+    def test_metadata_cache(self):
+        cachedir = os.path.join(self.tempdir, "metacache")
+        cdms2.setMetadataCache(cachedir, maxentries=10)
+        counts, restore = self.countDiscovery()
+        try:
+            first = self.getDataFile("clt.nc")
+            self.assertEqual(len(os.listdir(cachedir)), 1)
+            self.assertEqual(counts['getAxisIds'], 1)
+            self.assertTrue(counts['generateGridkey'] > 0)
+            counts.update(getAxisIds=0, generateGridkey=0)
+            # the second open uses the cache entry, without discovery
+            second = self.getDataFile("clt.nc")
+            self.assertEqual(len(os.listdir(cachedir)), 1)
+            self.assertEqual(counts, {'getAxisIds': 0, 'generateGridkey': 0})
+        finally:
+            restore()
+            cdms2.setMetadataCache(None)
+        self.assertIsNone(cdms2.getMetadataCache())
+        self.assertEqual(sorted(second.variables.keys()), sorted(first.variables.keys()))
+        self.assertEqual(sorted(second.grids.keys()), sorted(first.grids.keys()))
+        self.assertEqual(second['clt'].getGrid().id, first['clt'].getGrid().id)
+        self.assertTrue(numpy.ma.allequal(second['clt'][0], first['clt'][0]))
+
+    def test_metadata_cache_invalidation(self):
+        cachedir = os.path.join(self.tempdir, "metacache")
+        path = os.path.join(self.tempdir, "changed.nc")
+        u = self.getDataFile("clt.nc")("u")
+        f = cdms2.open(path, "w")
+        f.write(u[0])
+        f.close()
+        cdms2.setMetadataCache(cachedir, maxentries=10)
+        counts, restore = self.countDiscovery()
+        try:
+            cdms2.open(path).close()
+            self.assertEqual(counts['getAxisIds'], 1)
+
+            # a changed modification time invalidates the entry
+            st = os.stat(path)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+            cdms2.open(path).close()
+            self.assertEqual(counts['getAxisIds'], 2)
+            self.assertEqual(len(os.listdir(cachedir)), 2)
+
+            # so does a changed size, with the same modification time
+            st = os.stat(path)
+            f = cdms2.open(path, "w")
+            f.write(u[0])
+            f.write(u[0] * 2., id='u2')
+            f.close()
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            self.assertNotEqual(os.stat(path).st_size, st.st_size)
+            changed = self.getFile(path)
+            self.assertEqual(counts['getAxisIds'], 3)
+            self.assertEqual(len(os.listdir(cachedir)), 3)
+            self.assertTrue('u2' in changed.variables)
+            self.assertEqual(changed['u2'].getGrid().shape, changed['u'].getGrid().shape)
+        finally:
+            restore()
+            cdms2.setMetadataCache(None)
+
+
 if __name__ == "__main__":
     basetest.run()
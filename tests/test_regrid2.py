@@ -141,5 +141,260 @@ class TestRegridding(basetest.CDMSBaseTest):
         # fails
         s2 =  s.regrid(g, regridTool=u"esmf", regridMethod=u"linear")
 
+    def testRegridderCache(self):
+        f = cdms2.open(cdat_info.get_sampledata_path()+"/clt.nc")
+        s = f("clt")
+        outgrid = cdms2.createGaussianGrid(32)
+        expected = s.regrid(outgrid, regridTool='regrid2')
+        cdms2.setRegridderCacheSize(2)
+        try:
+            first = s.regrid(outgrid, regridTool='regrid2')
+            self.assertEqual(len(cdms2.avariable._regridderCache), 1)
+            second = s[0].regrid(outgrid, regridTool='regrid2')
+            self.assertEqual(len(cdms2.avariable._regridderCache), 1)
+            s.regrid(cdms2.createGaussianGrid(16), regridTool='regrid2')
+            s.regrid(cdms2.createGaussianGrid(24), regridTool='regrid2')
+            self.assertEqual(len(cdms2.avariable._regridderCache), 2)
+        finally:
+            cdms2.setRegridderCacheSize(0)
+        self.assertEqual(len(cdms2.avariable._regridderCache), 0)
+        self.assertTrue(numpy.ma.allclose(first, expected))
+        self.assertTrue(numpy.ma.allclose(second, expected[0]))
+        f.close()
+
+    def testRegridWeightsFile(self):
+        f = self.getDataFile("clt.nc")
+        s = f("clt")
+        outgrid = cdms2.createGaussianGrid(32)
+        expected = s.regrid(outgrid, regridTool='regrid2')
+        cdms2.setRegridWeightsDirectory(self.tempdir)
+        try:
+            first = s.regrid(outgrid, regridTool='regrid2')
+            files = [x for x in os.listdir(self.tempdir) if x.endswith('.nc')]
+            self.assertEqual(len(files), 1)
+            second = s.regrid(outgrid, regridTool='regrid2')
+        finally:
+            cdms2.setRegridWeightsDirectory(None)
+        self.assertTrue(numpy.ma.allclose(first, expected))
+        self.assertTrue(numpy.ma.allclose(second, expected))
+
+        # The weights file is a SCRIP mapping file
+        path = os.path.join(self.tempdir, files[0])
+        regridf = regrid.readRegridder(path, checkGrid=0)
+        self.assertEqual(regridf.getInputGrid().shape, s.getGrid().shape)
+        scripped = regridf(s)
+        self.assertTrue(numpy.allclose(numpy.ma.filled(scripped), numpy.ma.filled(expected), atol=1.e-3))
+
+        # and can be read back by Horizontal
+        regridf = Horizontal(s.getGrid(), outgrid, weightsFile=path)
+        self.assertTrue(numpy.ma.allclose(regridf(s), expected))
+
+    def testRegridWeightsReuse(self):
+        f = self.getDataFile("clt.nc")
+        s = f("clt")
+        outgrid = cdms2.createGaussianGrid(32)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("the weights were recomputed")
+
+        # libcf
+        path = os.path.join(self.tempdir, "libcf.nc")
+        first = cdms2.CdmsRegrid(s.getGrid(), outgrid, s.dtype, regridTool='libcf', weightsFile=path)
+        self.assertTrue(os.path.isfile(path))
+        expected = first(s)
+        computeWeights = regrid.LibCFRegrid.computeWeights
+        regrid.LibCFRegrid.computeWeights = fail
+        try:
+            second = cdms2.CdmsRegrid(s.getGrid(), outgrid, s.dtype, regridTool='libcf', weightsFile=path)
+            result = second(s)
+        finally:
+            regrid.LibCFRegrid.computeWeights = computeWeights
+        self.assertTrue(numpy.allclose(numpy.ma.filled(result), numpy.ma.filled(expected)))
+        self.assertTrue(numpy.array_equal(numpy.ma.getmaskarray(result), numpy.ma.getmaskarray(expected)))
+
+        # regrid2
+        path = os.path.join(self.tempdir, "regrid2.nc")
+        expected = Horizontal(s.getGrid(), outgrid, weightsFile=path)(s)
+        self.assertTrue(os.path.isfile(path))
+        maparea = regrid.horizontal._regrid.maparea
+        regrid.horizontal._regrid.maparea = fail
+        try:
+            result = Horizontal(s.getGrid(), outgrid, weightsFile=path)(s)
+        finally:
+            regrid.horizontal._regrid.maparea = maparea
+        self.assertTrue(numpy.ma.allclose(result, expected))
+
+    def testScripSparse(self):
+        f = self.getDataFile("clt.nc")
+        s = f("clt")
+        outgrid = cdms2.createGaussianGrid(32)
+        path = os.path.join(self.tempdir, "weights.nc")
+        horizontal = Horizontal(s.getGrid(), outgrid)
+        horizontal.writeWeights(path)
+        regridf = regrid.readRegridder(path, checkGrid=0)
+        expected = regridf(s)
+        result = regridf(s, sparse=True)
+        self.assertTrue(numpy.allclose(numpy.ma.filled(result), numpy.ma.filled(expected)))
+
+        # masked values are left out, as by Horizontal
+        masked = numpy.ma.masked_greater(s, 90.)
+        masked = cdms2.createVariable(masked, axes=s.getAxisList())
+        result = regridf(masked, sparse=True)
+        expected = horizontal(masked)
+        self.assertTrue(numpy.ma.allclose(result, expected, atol=1.e-3))
+        self.assertTrue(numpy.array_equal(numpy.ma.getmaskarray(result), numpy.ma.getmaskarray(expected)))
+
+    def testScripSparseNormalization(self):
+        from regrid2.scrip import SparseRemap
+        # partial overlap weights: the rows do not sum to 1
+        weights = numpy.array([0.5, 0.25, 0.3, 0.1, 0.6, 0.2])
+        sourceAddress = numpy.array([1, 2, 2, 3, 4, 5])
+        destAddress = numpy.array([1, 1, 2, 2, 3, 3])
+        remap = SparseRemap(weights, sourceAddress, destAddress, 5, 3)
+        data = numpy.array([[1., 2., 3., 4., 5.]])
+        full = remap(data)
+        self.assertTrue(numpy.allclose(full, [[1., 0.9, 3.4]]))
+
+        # masking source cell 1 only rescales destination cell 1
+        mask = numpy.array([[True, False, False, False, False]])
+        result = remap(data, mask=mask)
+        self.assertFalse(numpy.ma.is_masked(result))
+        self.assertTrue(numpy.allclose(result[0, 0], 2. * 0.75))
+        self.assertTrue(numpy.array_equal(result[0, 1:], full[0, 1:]))
+
+        # destination cells without valid sources are masked
+        mask = numpy.array([[True, True, False, False, False]])
+        result = remap(data, mask=mask)
+        self.assertEqual(list(numpy.ma.getmaskarray(result)[0]), [True, False, False])
+        self.assertTrue(numpy.allclose(result[0, 1], 3. * 0.4))
+        self.assertTrue(numpy.array_equal(result[0, 2], full[0, 2]))
+
+    def testRegridVariables(self):
+        f = self.getDataFile("clt.nc")
+        s = f("clt")
+        t = cdms2.MV2.masked_less(s * 2., 20.)
+        outgrid = cdms2.createGaussianGrid(32)
+        results = cdms2.regridVariables([s, t, s[0], f["clt"]], outgrid, regridTool='regrid2')
+        self.assertEqual(len(results), 4)
+        for var, result in zip([s, t, s[0], s], results):
+            expected = var.regrid(outgrid, regridTool='regrid2')
+            self.assertEqual(result.shape, expected.shape)
+            self.assertEqual(result.getOrder(), expected.getOrder())
+            self.assertTrue(numpy.ma.allclose(result, expected))
+            self.assertTrue(numpy.array_equal(numpy.ma.getmaskarray(result), numpy.ma.getmaskarray(expected)))
+        self.assertEqual(results[0].id, "clt")
+
+    def testRegridVariablesMissing(self):
+        f = self.getDataFile("clt.nc")
+        t = cdms2.MV2.masked_less(f("clt") * 2., 20.)
+        t.setMissing(-999.)
+        outgrid = cdms2.createGaussianGrid(32)
+        result = cdms2.regridVariables([t], outgrid, regridTool='regrid2')[0]
+        expected = t.regrid(outgrid, regridTool='regrid2')
+        self.assertTrue(numpy.allclose(result.filled(), expected.filled()))
+        self.assertTrue(numpy.array_equal(numpy.ma.getmaskarray(result), numpy.ma.getmaskarray(expected)))
+        self.assertEqual(result.getMissing(), expected.getMissing())
+        self.assertEqual(result.getMissing(), -999.)
+        self.assertEqual(result.fill_value, result.missing_value)
+
+    def testHorizontalWorkers(self):
+        f = self.getDataFile("clt.nc")
+        s = cdms2.MV2.masked_less(f("clt"), 10.)
+        regridf = Horizontal(s.getGrid(), cdms2.createGaussianGrid(32))
+        expected, expectedWeights = regridf(s, returnTuple=1)
+        result, weights = regridf(s, returnTuple=1, workers=4)
+        self.assertTrue(numpy.array_equal(result.filled(), expected.filled()))
+        self.assertTrue(numpy.array_equal(result.mask, expected.mask))
+        self.assertTrue(numpy.array_equal(weights, expectedWeights))
+
+    def testPressureVectorized(self):
+        levIn = cdms2.createAxis(numpy.array([1000., 850., 700., 500., 300.]))
+        levIn.designateLevel()
+        levOut = cdms2.createAxis(numpy.array([1100., 925., 600., 400., 300., 200.]))
+        levOut.designateLevel()
+        data = numpy.random.random((3, 5, 4, 6)).astype(numpy.float32)
+        data[1, 2, 3, 4] = 1.e20
+        data = numpy.ma.masked_greater(data, 1.)
+        data.set_fill_value(1.e20)
+        regridf = regrid.PressureRegridder(levIn, levOut)
+        for method in ("log", "linear"):
+            expected = regridf(data, method=method)
+            result = regridf(data, method=method, vectorized=True)
+            self.assertEqual(result.shape, (3, 6, 4, 6))
+            self.assertTrue(numpy.allclose(result.filled(), expected.filled()))
+            result = regridf(numpy.ma.transpose(data, (1, 2, 3, 0)), order="zyxt", method=method, vectorized=True)
+            self.assertTrue(numpy.allclose(result.filled(), numpy.transpose(expected.filled(), (1, 2, 3, 0))))
+        lat = cdms2.createAxis(numpy.arange(-5, 5, 2))
+        lat.designateLatitude()
+        section = cdms2.MV2.reshape(numpy.arange(25, dtype=numpy.float32), (5, 5))
+        section.setAxis(0, levIn)
+        section.setAxis(1, lat)
+        regridf = regrid.CrossSectionRegridder(lat, lat, levIn, levOut)
+        expected = regridf(section)
+        result = regridf(section, vectorized=True)
+        self.assertTrue(numpy.ma.allclose(result, expected))
+
+    def testLibCFApplyBatch(self):
+        from regrid2 import gsRegrid
+        f = self.getDataFile("clt.nc")
+        s = f("clt")[:3]
+        srcGrid = [s.getLatitude()[:], s.getLongitude()[:]]
+        outgrid = cdms2.createGaussianGrid(32)
+        dstGrid = [outgrid.getLatitude()[:], outgrid.getLongitude()[:]]
+        regridf = gsRegrid.Regrid(srcGrid, dstGrid, mkCyclic=True)
+        regridf.computeWeights()
+        data = numpy.array(s.filled(), numpy.float64)
+        expected = numpy.zeros((3, 32, 64), numpy.float64)
+        for i in range(3):
+            regridf.apply(data[i], expected[i], missingValue=1.e20)
+        result = numpy.zeros((3, 32, 64), numpy.float64)
+        regridf.applyBatch(data, result, missingValue=1.e20)
+        self.assertTrue(numpy.array_equal(result, expected))
+        # the data objects are reused by later calls
+        result[:] = 0.
+        regridf.applyBatch(data, result, missingValue=1.e20)
+        self.assertTrue(numpy.array_equal(result, expected))
+
+    def testLibCFStencils(self):
+        import pickle
+        from regrid2 import gsRegrid
+        f = self.getDataFile("clt.nc")
+        s = f("clt")[:3]
+        srcGrid = [s.getLatitude()[:], s.getLongitude()[:]]
+        outgrid = cdms2.createGaussianGrid(32)
+        dstGrid = [outgrid.getLatitude()[:], outgrid.getLongitude()[:]]
+        regridf = gsRegrid.Regrid(srcGrid, dstGrid, mkCyclic=True)
+        regridf.computeWeights()
+        data = numpy.array(s.filled(), numpy.float64)
+        expected = numpy.zeros((3, 32, 64), numpy.float64)
+        regridf.applyBatch(data, expected, missingValue=1.e20)
+        indices, weights, valid = regridf.getStencils()
+        self.assertEqual(indices.shape, (32 * 64, 4))
+        self.assertTrue(numpy.all(indices < data[0].size))
+        stencilf = pickle.loads(pickle.dumps(regridf.getStencilRegridder()))
+        result = stencilf(data, missingValue=1.e20)
+        self.assertTrue(numpy.allclose(result, expected))
+
+    def testLibCFParallelWeights(self):
+        from regrid2 import gsRegrid
+        f = self.getDataFile("clt.nc")
+        s = f("clt")[:3]
+        srcGrid = [s.getLatitude()[:], s.getLongitude()[:]]
+        outgrid = cdms2.createGaussianGrid(32)
+        dstGrid = [outgrid.getLatitude()[:], outgrid.getLongitude()[:]]
+        serial = gsRegrid.Regrid(srcGrid, dstGrid, mkCyclic=True)
+        serial.computeWeights()
+        parallel = gsRegrid.Regrid(srcGrid, dstGrid, mkCyclic=True)
+        parallel.computeWeights(workers=3)
+        self.assertEqual(parallel.getNumValid(), serial.getNumValid())
+        for expected, result in zip(serial.getStencils(), parallel.getStencils()):
+            self.assertTrue(numpy.allclose(result, expected))
+        data = numpy.array(s.filled(), numpy.float64)
+        expected = numpy.zeros((3, 32, 64), numpy.float64)
+        serial.applyBatch(data, expected, missingValue=1.e20)
+        result = numpy.zeros((3, 32, 64), numpy.float64)
+        parallel.applyBatch(data, result, missingValue=1.e20)
+        self.assertTrue(numpy.allclose(result, expected))
+
 if __name__ == "__main__":
     basetest.run()
@@ -8,6 +8,7 @@ from distributed.utils_test import gen_cluster
 # import dask.array.ma as dam
 import dask.array as da
 import pickle
+import numpy
 from nose.plugins.attrib import attr
 
 @attr("cdms_dask")
@@ -48,6 +49,36 @@ class TestDask(basetest.CDMSBaseTest):
         newvar=cdms2.fromJSON(TVstate)
         self.assertTrue(MV2.allclose(self.dataTV, newvar))
 
+    def testTVdumpsBinary(self):
+        masked = MV2.masked_greater(self.dataTV, 50.)
+        blob = masked.dumps_binary()
+        newvar = cdms2.loads_binary(blob)
+        self.assertTrue(MV2.allclose(masked, newvar))
+        self.assertTrue(MV2.allequal(MV2.getmaskarray(newvar), MV2.getmaskarray(masked)))
+        self.assertEqual(newvar.id, masked.id)
+        self.assertEqual(newvar.units, masked.units)
+        self.assertEqual(newvar.getTime().units, masked.getTime().units)
+        self.assertTrue(MV2.allclose(newvar.getLatitude().getBounds(),
+                                     masked.getLatitude().getBounds()))
+        # Read-only blobs are copied
+        newvar = cdms2.loads_binary(bytes(blob))
+        self.assertTrue(MV2.allclose(masked, newvar))
+
+    def testTVdumpsBinaryAttributes(self):
+        tv = self.dataTV[0]
+        tv.levels = [numpy.float32(0.5), numpy.float64(1.5)]
+        tv.nested = {'scale': numpy.float64(2.), 'range': (numpy.int32(0), numpy.int32(100))}
+        for newvar in (cdms2.loads_binary(tv.dumps_binary()), pickle.loads(pickle.dumps(tv))):
+            self.assertEqual(newvar.levels, [0.5, 1.5])
+            self.assertTrue(all(isinstance(x, float) for x in newvar.levels))
+            self.assertEqual(newvar.nested, {'scale': 2., 'range': [0, 100]})
+        # attributes which cannot be serialized raise, instead of being converted to strings
+        tv.bad = object()
+        with self.assertRaises(TypeError):
+            tv.dumps_binary()
+        with self.assertRaises(TypeError):
+            pickle.dumps(tv)
+
     @attr("cdms_dask")
     def testTVSerializeDeserialize(self):
         #
@@ -65,6 +96,19 @@ class TestDask(basetest.CDMSBaseTest):
         result = deserialize(*serialize(self.dataTV))
         self.assertTrue(MV2.allclose(result, self.dataTV))
 
+    @attr("cdms_dask")
+    def testSerializeFrames(self):
+        masked = MV2.masked_greater(self.dataTV, 50.)
+        header, frames = serialize(masked)
+        result = deserialize(header, frames)
+        self.assertTrue(MV2.allclose(result, masked))
+        self.assertTrue(MV2.allequal(MV2.getmaskarray(result), MV2.getmaskarray(masked)))
+        self.assertEqual(result.id, masked.id)
+        self.assertEqual(result.units, masked.units)
+        self.assertTrue(MV2.allclose(result.getLatitude().getBounds(),
+                                     masked.getLatitude().getBounds()))
+        self.assertEqual(result.getTime().units, masked.getTime().units)
+
         
     def tearDown(self):
         self.f.close()